@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 import sys
 import os
-import gi
-import re
-import base64
-import mimetypes
-import json
 import datetime
+import functools
+import html
+import json
+import logging
+import re
+import threading
+from contextlib import contextmanager
+import gi
+
+# base64 and mmap are imported lazily inside the handlers that need
+# them, keeping them off the cold-start path
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
@@ -14,572 +20,592 @@ gi.require_version('WebKit', '6.0')
 
 from gi.repository import Gtk, Adw, GLib, Gio, WebKit, GObject, Gdk, Pango
 
-class Writer(Adw.Application):
-    def __init__(self):
-        super().__init__(application_id="io.github.fastrizwaan.Writer",
-                         flags=Gio.ApplicationFlags.FLAGS_NONE)
-        self.connect('activate', self.on_activate)
-        self.current_file = None
-        self.modified = False
-        self.recent_files = []
-        self.max_recent_files = 5
-        self.zoom_level = 1.0
+# lxml parses HTML in C; the regex fallback below keeps plain installs
+# working since the app has no hard dependency beyond GTK/WebKit
+try:
+    from lxml import html as _lxml_html
+except ImportError:
+    _lxml_html = None
 
-    def on_activate(self, app):
-        # Create the main window
-        self.win = Adw.ApplicationWindow(application=app)
-        self.win.set_default_size(900, 700)
-        self.win.set_title("Writer")
-        
-        # Create main layout
-        self.main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        self.win.set_content(self.main_box)
-        
-        # Create header bar
-        self.create_header_bar()
-        
-        # Create toolbar
-        self.create_toolbar()
-        
-        # Create editor area
-        self.create_editor()
-        
-        # Create status bar (but don't add it yet - we'll add it after all other elements)
-        self.create_status_bar()
-        
-        # Set up keyboard shortcuts
-        self.setup_keyboard_shortcuts()
-        
-        # Initialize extra features
-        self.initialize_extras()
-        
-        # Now add the status bar last to ensure it's at the bottom
-        self.main_box.append(self.status_bar)
-        
-        # Load recent file list
-        self.load_recent_files()
-        
-        # Show all
-        self.win.present()
-        
-    def create_header_bar(self):
-        """Create the header bar with file operations"""
-        self.header = Adw.HeaderBar()
-        self.main_box.append(self.header)
-        
-        # File menu
-        file_menu = Gio.Menu.new()
-        file_menu.append("New", "app.new")
-        file_menu.append("Open", "app.open")
-        file_menu.append("Save", "app.save")
-        file_menu.append("Save As", "app.save_as")
-        
-        # Add separator
-        file_menu.append("───────────", None)
-        
-        # Recent files submenu
-        self.recent_menu = Gio.Menu.new()
-        recent_section = Gio.Menu.new()
-        recent_section.append_submenu("Recent Files", self.recent_menu)
-        file_menu.append_section(None, recent_section)
-        
-        # Add Print and Exit options
-        file_menu.append("───────────", None)
-        file_menu.append("Print", "app.print")
-        file_menu.append("Exit", "app.exit")
-        
-        # Create the menu button
-        self.menu_button = Gtk.MenuButton()
-        self.menu_button.set_icon_name("open-menu-symbolic")
-        self.menu_button.set_menu_model(file_menu)
-        self.header.pack_end(self.menu_button)
-        
-        # Add actions
-        self.create_action("new", self.on_new_clicked)
-        self.create_action("open", self.on_open_clicked)
-        self.create_action("save", self.on_save_clicked)
-        self.create_action("save_as", self.on_save_as_clicked)
-        self.create_action("print", self.on_print_clicked)
-        self.create_action("exit", self.on_exit_clicked)
-        
-        # Document title label
-        self.title_label = Gtk.Label(label="Untitled")
-        self.header.set_title_widget(self.title_label)
-        
-        # Create Edit menu
-        self.edit_menu = Gio.Menu.new()
-        self.edit_menu.append("Undo", "app.undo")
-        self.edit_menu.append("Redo", "app.redo")
-        self.edit_menu.append("───────────", None)
-        self.edit_menu.append("Cut", "app.cut")
-        self.edit_menu.append("Copy", "app.copy")
-        self.edit_menu.append("Paste", "app.paste")
-        self.edit_menu.append("───────────", None)
-        self.edit_menu.append("Find", "app.find")
-        self.edit_menu.append("Select All", "app.select_all")
-        
-        # Add Edit menu button to header bar
-        edit_button = Gtk.MenuButton()
-        edit_button.set_label("Edit")
-        edit_button.set_menu_model(self.edit_menu)
-        self.header.pack_start(edit_button)
-        
-        # Create Insert menu
-        self.insert_menu = Gio.Menu.new()
-        self.insert_menu.append("Table...", "app.insert_table")
-        self.insert_menu.append("Image...", "app.insert_image")
-        self.insert_menu.append("Date/Time", "app.insert_datetime")
-        
-        # Add Insert menu button to header bar
-        insert_button = Gtk.MenuButton()
-        insert_button.set_label("Insert")
-        insert_button.set_menu_model(self.insert_menu)
-        self.header.pack_start(insert_button)
-        
-        # Create View menu
-        view_menu = Gio.Menu.new()
-        view_menu.append("Zoom In", "app.zoom_in")
-        view_menu.append("Zoom Out", "app.zoom_out")
-        view_menu.append("Reset Zoom", "app.zoom_reset")
-        view_menu.append("───────────", None)
-        view_menu.append("Toggle RTL Mode", "app.toggle_rtl")
-        
-        # Add View menu button
-        view_button = Gtk.MenuButton()
-        view_button.set_label("View")
-        view_button.set_menu_model(view_menu)
-        self.header.pack_start(view_button)
-        
-        # Create Format menu
-        format_menu = Gio.Menu.new()
-        format_menu.append("Paragraph Spacing...", "app.paragraph_spacing")
-        format_menu.append("Line Spacing...", "app.line_spacing")
-        
-        # Add Format menu button
-        format_button = Gtk.MenuButton()
-        format_button.set_label("Format")
-        format_button.set_menu_model(format_menu)
-        self.header.pack_start(format_button)
-        
-    def create_toolbar(self):
-        """Create the formatting toolbar"""
-        toolbar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=2)
-        toolbar.add_css_class("toolbar")
-        self.main_box.append(toolbar)
-        
-        # Font family - using FontDialogButton for GTK4
-        self.font_button = Gtk.FontDialogButton()
-        self.font_button.set_dialog(Gtk.FontDialog.new())
-        self.font_button.connect("notify::font-desc", self.on_font_changed)
-        toolbar.append(self.font_button)
-        
-        # Separator
-        separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        toolbar.append(separator)
-        
-        # Bold
-        self.bold_button = Gtk.ToggleButton()
-        self.bold_button.set_icon_name("format-text-bold-symbolic")
-        self.bold_button.set_tooltip_text("Bold")
-        self.bold_button.connect("toggled", self.on_bold_toggled)
-        toolbar.append(self.bold_button)
-        
-        # Italic
-        self.italic_button = Gtk.ToggleButton()
-        self.italic_button.set_icon_name("format-text-italic-symbolic")
-        self.italic_button.set_tooltip_text("Italic")
-        self.italic_button.connect("toggled", self.on_italic_toggled)
-        toolbar.append(self.italic_button)
-        
-        # Underline
-        self.underline_button = Gtk.ToggleButton()
-        self.underline_button.set_icon_name("format-text-underline-symbolic")
-        self.underline_button.set_tooltip_text("Underline")
-        self.underline_button.connect("toggled", self.on_underline_toggled)
-        toolbar.append(self.underline_button)
-        
-        # Strikethrough
-        self.strikethrough_button = Gtk.ToggleButton()
-        self.strikethrough_button.set_icon_name("format-text-strikethrough-symbolic")
-        self.strikethrough_button.set_tooltip_text("Strikethrough")
-        self.strikethrough_button.connect("toggled", self.on_strikethrough_toggled)
-        toolbar.append(self.strikethrough_button)
-        
-        # Separator
-        separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        toolbar.append(separator)
-        
-        # Superscript
-        self.superscript_button = Gtk.ToggleButton()
-        self.superscript_button.set_icon_name("format-text-superscript-symbolic")
-        self.superscript_button.set_tooltip_text("Superscript")
-        self.superscript_button.connect("toggled", self.on_superscript_toggled)
-        toolbar.append(self.superscript_button)
-        
-        # Subscript
-        self.subscript_button = Gtk.ToggleButton()
-        self.subscript_button.set_icon_name("format-text-subscript-symbolic")
-        self.subscript_button.set_tooltip_text("Subscript")
-        self.subscript_button.connect("toggled", self.on_subscript_toggled)
-        toolbar.append(self.subscript_button)
-        
-        # Separator
-        separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        toolbar.append(separator)
-        
-        # Alignment
-        self.align_left_button = Gtk.ToggleButton()
-        self.align_left_button.set_icon_name("format-justify-left-symbolic")
-        self.align_left_button.set_tooltip_text("Align Left")
-        self.align_left_button.connect("toggled", self.on_align_left_toggled)
-        toolbar.append(self.align_left_button)
-        
-        self.align_center_button = Gtk.ToggleButton()
-        self.align_center_button.set_icon_name("format-justify-center-symbolic")
-        self.align_center_button.set_tooltip_text("Align Center")
-        self.align_center_button.connect("toggled", self.on_align_center_toggled)
-        toolbar.append(self.align_center_button)
-        
-        self.align_right_button = Gtk.ToggleButton()
-        self.align_right_button.set_icon_name("format-justify-right-symbolic")
-        self.align_right_button.set_tooltip_text("Align Right")
-        self.align_right_button.connect("toggled", self.on_align_right_toggled)
-        toolbar.append(self.align_right_button)
-        
-        self.align_justify_button = Gtk.ToggleButton()
-        self.align_justify_button.set_icon_name("format-justify-fill-symbolic")
-        self.align_justify_button.set_tooltip_text("Justify")
-        self.align_justify_button.connect("toggled", self.on_align_justify_toggled)
-        toolbar.append(self.align_justify_button)
-        
-        # Separator
-        separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        toolbar.append(separator)
-        
-        # Text color
-        self.text_color_button = Gtk.ColorButton()
-        self.text_color_button.set_tooltip_text("Text Color")
-        self.text_color_button.connect("color-set", self.on_text_color_changed)
-        toolbar.append(self.text_color_button)
-        
-        # Background color
-        self.bg_color_button = Gtk.ColorButton()
-        self.bg_color_button.set_tooltip_text("Background Color")
-        self.bg_color_button.connect("color-set", self.on_bg_color_changed)
-        toolbar.append(self.bg_color_button)
-        
-        # Separator
-        separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        toolbar.append(separator)
-        
-        # Bullet list
-        self.bullet_list_button = Gtk.ToggleButton()
-        self.bullet_list_button.set_icon_name("view-list-bullet-symbolic")
-        self.bullet_list_button.set_tooltip_text("Bullet List")
-        self.bullet_list_button.connect("toggled", self.on_bullet_list_toggled)
-        toolbar.append(self.bullet_list_button)
-        
-        # Numbered list
-        self.numbered_list_button = Gtk.ToggleButton()
-        self.numbered_list_button.set_icon_name("view-list-ordered-symbolic")
-        self.numbered_list_button.set_tooltip_text("Numbered List")
-        self.numbered_list_button.connect("toggled", self.on_numbered_list_toggled)
-        toolbar.append(self.numbered_list_button)
-        
-        # Separator
-        separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        toolbar.append(separator)
-        
-        # Indent
-        self.indent_button = Gtk.Button()
-        self.indent_button.set_icon_name("format-indent-more-symbolic")
-        self.indent_button.set_tooltip_text("Increase Indent")
-        self.indent_button.connect("clicked", self.on_indent_clicked)
-        toolbar.append(self.indent_button)
-        
-        # Outdent
-        self.outdent_button = Gtk.Button()
-        self.outdent_button.set_icon_name("format-indent-less-symbolic")
-        self.outdent_button.set_tooltip_text("Decrease Indent")
-        self.outdent_button.connect("clicked", self.on_outdent_clicked)
-        toolbar.append(self.outdent_button)
-        
-        # Separator
-        separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        toolbar.append(separator)
-        
-        # RTL mode toggle
-        self.rtl_button = Gtk.ToggleButton()
-        self.rtl_button.set_icon_name("format-text-direction-rtl-symbolic")
-        self.rtl_button.set_tooltip_text("Right to Left Text")
-        self.rtl_button.connect("toggled", self.on_rtl_toggled)
-        toolbar.append(self.rtl_button)
-        
-        # Make the toolbar look nice
-        toolbar.add_css_class("toolbar")
-        toolbar.set_margin_start(6)
-        toolbar.set_margin_end(6)
-        toolbar.set_margin_top(6)
-        toolbar.set_margin_bottom(6)
-        
-        # Add a separator before the zoom button
-        separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        toolbar.append(separator)
-        
-        # Insert Table button
-        self.insert_table_button = Gtk.Button()
-        self.insert_table_button.set_icon_name("insert-table-symbolic")
-        self.insert_table_button.set_tooltip_text("Insert Table")
-        self.insert_table_button.connect("clicked", lambda btn: self.on_insert_table_clicked(None, None))
-        toolbar.append(self.insert_table_button)
-        
-        # Insert Image button
-        self.insert_image_button = Gtk.Button()
-        self.insert_image_button.set_icon_name("insert-image-symbolic")
-        self.insert_image_button.set_tooltip_text("Insert Image")
-        self.insert_image_button.connect("clicked", lambda btn: self.on_insert_image_clicked(None, None))
-        toolbar.append(self.insert_image_button)
-        
-        # Insert Date/Time button
-        self.insert_datetime_button = Gtk.Button()
-        self.insert_datetime_button.set_icon_name("insert-datetime-symbolic")
-        self.insert_datetime_button.set_tooltip_text("Insert Date/Time")
-        self.insert_datetime_button.connect("clicked", lambda btn: self.on_insert_datetime_clicked(None, None))
-        toolbar.append(self.insert_datetime_button)  
-              
-        # Zoom button with accessibility icon
-        self.zoom_button = Gtk.MenuButton()
-        self.zoom_button.set_icon_name("org.gnome.Settings-accessibility-zoom-symbolic")
-        self.zoom_button.set_tooltip_text("Zoom")
-        toolbar.append(self.zoom_button)
-        
-        # Create a popover for the zoom slider
-        self.zoom_popover = Gtk.Popover()
-        self.zoom_button.set_popover(self.zoom_popover)
-        
-        # Create a vertical box for the popover content
-        zoom_popover_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
-        zoom_popover_box.set_margin_top(0)
-        zoom_popover_box.set_margin_bottom(0)
-        zoom_popover_box.set_margin_start(0)
-        zoom_popover_box.set_margin_end(0)
-        
-        # Add zoom percentage label
-        self.zoom_label = Gtk.Label(label="100%")
-        self.zoom_label.set_margin_bottom(6)
-        zoom_popover_box.append(self.zoom_label)
-        
-        # Add vertical zoom slider
-        zoom_adjustment = Gtk.Adjustment.new(
-            value=1.0,             # Initial value (100%)
-            lower=0.5,             # Minimum (20%)
-            upper=7.0,             # Maximum (500%)
-            step_increment=0.1,    # Small step
-            page_increment=0.5,    # Page step
-            page_size=0            # Not a scrollbar
-        )
-        
-        self.zoom_slider = Gtk.Scale(orientation=Gtk.Orientation.VERTICAL, adjustment=zoom_adjustment)
-        self.zoom_slider.set_draw_value(False)  # Don't draw value on slider
-        self.zoom_slider.set_inverted(True)     # 500% at top, 20% at bottom
-        self.zoom_slider.set_size_request(-1, 150)  # Height of 150px
-        
-        # Connect value-changed signal and store handler ID for later blocking
-        self.zoom_slider_handler_id = self.zoom_slider.connect("value-changed", self.on_zoom_slider_changed)
-        zoom_popover_box.append(self.zoom_slider)
-        
-        # Add reset button (100%)
-        reset_button = Gtk.Button.new_with_label("1:1")
-        reset_button.connect("clicked", self.on_zoom_reset_button_clicked)
-        reset_button.set_margin_top(6)
-        zoom_popover_box.append(reset_button)
-        
-        # Set the popover content
-        self.zoom_popover.set_child(zoom_popover_box)
-        
-        # Make the toolbar look nice
-        toolbar.add_css_class("toolbar")
-        toolbar.set_margin_start(6)
-        toolbar.set_margin_end(6)
-        toolbar.set_margin_top(6)
-        toolbar.set_margin_bottom(6)
+log = logging.getLogger("writer")
 
+# Escape plain text for the editor in a single translate pass; the map
+# folds the newline conversion in as well, instead of four full
+# str.replace copies of the file
+_HTML_ESCAPE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    "\n": "<br>",
+})
 
-    def on_zoom_slider_changed(self, slider):
-        """Handle zoom slider value change"""
-        self.zoom_level = slider.get_value()
-        js_code = f"setZoom({self.zoom_level});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        
-        # Update zoom label
-        self.zoom_label.set_text(f"{int(self.zoom_level * 100)}%")
-        
-        # Update status
-        self.status_label.set_text(f"Zoom: {int(self.zoom_level * 100)}%")
+# Compiled once: both run on every document open/save
+_BODY_RE = re.compile(r'<body[^>]*>(.*?)</body>', re.DOTALL | re.IGNORECASE)
+_STRIP_TAGS_RE = re.compile(r'<[^>]+>')
 
-    # 3. Update the zoom reset button handler
-    def on_zoom_reset_button_clicked(self, button):
-        """Handle zoom reset button click"""
-        self.zoom_level = 1.0
-        js_code = f"setZoom({self.zoom_level});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        
-        # Update zoom label in popover
-        self.zoom_label.set_text("100%")
-        
-        # Update status
-        self.status_label.set_text("Zoom: 100%")
-        
-        # Update slider without triggering its callback
-        self.zoom_slider.handler_block(self.zoom_slider_handler_id)
-        self.zoom_slider.set_value(self.zoom_level)
-        self.zoom_slider.handler_unblock(self.zoom_slider_handler_id)
-        
-        # Close the popover
-        self.zoom_popover.popdown()
+# Detects markup without building a lowercased copy of the whole file
+_HTML_HINT_RE = re.compile(rb'<html|<body|<div', re.IGNORECASE)
 
 
-    # Also, update the create_toolbar method to ensure the zoom percentage label is correctly styled
-    def create_toolbar_zoom_button(self, toolbar):
-        """Create the zoom button and its popover in the toolbar"""
-        # Add a separator before the zoom button
-        separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        toolbar.append(separator)
-        
-        # Zoom button with accessibility icon
-        self.zoom_button = Gtk.MenuButton()
-        self.zoom_button.set_icon_name("org.gnome.Settings-accessibility-zoom-symbolic")
-        self.zoom_button.set_tooltip_text("Zoom")
-        toolbar.append(self.zoom_button)
-        
-        # Create a popover for the zoom slider
-        self.zoom_popover = Gtk.Popover()
-        self.zoom_button.set_popover(self.zoom_popover)
-        
-        # Create a vertical box for the popover content
-        zoom_popover_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
-        zoom_popover_box.set_margin_top(12)
-        zoom_popover_box.set_margin_bottom(12)
-        zoom_popover_box.set_margin_start(12)
-        zoom_popover_box.set_margin_end(12)
-        
-        # Add zoom percentage label with proper styling
-        self.zoom_label = Gtk.Label(label=f"{int(self.zoom_level * 100)}%")
-        self.zoom_label.set_margin_bottom(6)
-        self.zoom_label.add_css_class("title-4")  # Make it stand out with a title style
-        self.zoom_label.set_halign(Gtk.Align.CENTER)
-        zoom_popover_box.append(self.zoom_label)
-        
-        # Add vertical zoom slider
-        zoom_adjustment = Gtk.Adjustment.new(
-            value=self.zoom_level,  # Use current zoom level
-            lower=0.2,             # Minimum (20%)
-            upper=5.0,             # Maximum (500%)
-            step_increment=0.1,    # Small step
-            page_increment=0.5,    # Page step
-            page_size=0            # Not a scrollbar
-        )
-        
-        self.zoom_slider = Gtk.Scale(orientation=Gtk.Orientation.VERTICAL, adjustment=zoom_adjustment)
-        self.zoom_slider.set_draw_value(False)  # Don't draw value on slider
-        self.zoom_slider.set_inverted(True)     # 500% at top, 20% at bottom
-        self.zoom_slider.set_size_request(-1, 150)  # Height of 150px
-        self.zoom_slider.set_halign(Gtk.Align.CENTER)
-        
-        # Connect value-changed signal and store handler ID for later blocking
-        self.zoom_slider_handler_id = self.zoom_slider.connect("value-changed", self.on_zoom_slider_changed)
-        zoom_popover_box.append(self.zoom_slider)
-        
-        # Add reset button (100%)
-        reset_button = Gtk.Button.new_with_label("Reset to 100%")
-        reset_button.connect("clicked", self.on_zoom_reset_button_clicked)
-        reset_button.set_margin_top(6)
-        reset_button.set_halign(Gtk.Align.CENTER)
-        zoom_popover_box.append(reset_button)
-        
-        # Set the popover content
-        self.zoom_popover.set_child(zoom_popover_box)
+@functools.lru_cache(maxsize=64)
+def _basename(path):
+    """os.path.basename memoized for the stable recent-files paths"""
+    return os.path.basename(path)
 
-    # 4. Update the zoom keyboard shortcuts to work with the new zoom control
-    def on_zoom_in(self, action, param):
-        """Handle Zoom In command (keyboard shortcut)"""
-        self.zoom_level = min(5.0, self.zoom_level + 0.1)
-        js_code = f"setZoom({self.zoom_level});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        
-        # Update zoom label in popover
-        self.zoom_label.set_text(f"{int(self.zoom_level * 100)}%")
-        
-        # Update status
-        self.status_label.set_text(f"Zoom: {int(self.zoom_level * 100)}%")
-        
-        # Update slider without triggering its callback
-        self.zoom_slider.handler_block(self.zoom_slider_handler_id)
-        self.zoom_slider.set_value(self.zoom_level)
-        self.zoom_slider.handler_unblock(self.zoom_slider_handler_id)
+# The image file dialog only offers these formats, so a five-entry dict
+# resolves the MIME type without importing mimetypes and walking its
+# type map on the encode worker
+_IMG_MIME = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.svg': 'image/svg+xml',
+}
 
+# English month/weekday names for the datetime preview labels; indexing
+# these beats 15 strftime walks per dialog open and pins the previews
+# to the formats the insert actions actually produce, regardless of
+# locale
+_MONTH_ABBR = (None, 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_MONTH_FULL = (None, 'January', 'February', 'March', 'April', 'May',
+               'June', 'July', 'August', 'September', 'October',
+               'November', 'December')
+_WDAY_ABBR = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_WDAY_FULL = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday',
+              'Saturday', 'Sunday')
 
-    def on_zoom_out(self, action, param):
-        """Handle Zoom Out command (keyboard shortcut)"""
-        self.zoom_level = max(0.2, self.zoom_level - 0.1)
-        js_code = f"setZoom({self.zoom_level});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        
-        # Update zoom label in popover
-        self.zoom_label.set_text(f"{int(self.zoom_level * 100)}%")
-        
-        # Update status
-        self.status_label.set_text(f"Zoom: {int(self.zoom_level * 100)}%")
-        
-        # Update slider without triggering its callback
-        self.zoom_slider.handler_block(self.zoom_slider_handler_id)
-        self.zoom_slider.set_value(self.zoom_level)
-        self.zoom_slider.handler_unblock(self.zoom_slider_handler_id)
+# Static undo/redo scripts; the verbose variants with console/history
+# dumps only run when debugging is requested, so a normal undo does not
+# pay for debugHistory's serialization in the page
+if os.environ.get('WRITER_DEBUG'):
+    _JS_UNDO = ('(function() {'
+                ' console.log("Python-triggered undo",'
+                ' editorHistory.length, historyIndex);'
+                ' debugHistory(); return customUndo(); })();')
+    _JS_REDO = ('(function() {'
+                ' console.log("Python-triggered redo",'
+                ' editorHistory.length, historyIndex);'
+                ' debugHistory(); return customRedo(); })();')
+else:
+    _JS_UNDO = "customUndo();"
+    _JS_REDO = "customRedo();"
 
-    def on_zoom_reset(self, action, param):
-        """Handle Reset Zoom command (keyboard shortcut)"""
-        self.zoom_level = 1.0
-        js_code = f"setZoom({self.zoom_level});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        
-        # Update zoom label if popover is visible
-        self.zoom_label.set_text("100%")
-        
-        # Update status
-        self.status_label.set_text("Zoom: 100%")
-        
-        # Update slider without triggering its callback
-        self.zoom_slider.handler_block(self.zoom_slider_handler_id)
-        self.zoom_slider.set_value(self.zoom_level)
-        self.zoom_slider.handler_unblock(self.zoom_slider_handler_id)
 
-    def create_editor(self):
-        """Create the WebKit-based rich text editor with improved initialization"""
-        # Scrolled window for the editor
-        scrolled = Gtk.ScrolledWindow()
-        scrolled.set_vexpand(True)
-        self.main_box.append(scrolled)
-        
-        # WebKit WebView for rich text editing
-        self.webview = WebKit.WebView()
-        scrolled.set_child(self.webview)
-        
-        # Enable developer tools for debugging
-        settings = self.webview.get_settings()
-        if hasattr(settings, 'set_enable_developer_extras'):
-            settings.set_enable_developer_extras(True)
-        
-        # Set up the WebView for rich text editing
-        self.webview.load_html(self.get_editor_html(), None)
-        
-        # Connect selection change signals
-        self.webview.connect("load-changed", self.on_load_changed)
-        
-        # Handle content changes
-        self.webview.connect("notify::estimated-load-progress", self.on_progress_change)
-    def get_editor_html(self):
-        """Return the HTML for the editor using a raw string to avoid escape sequence issues"""
-        return r"""
+def _table_align_js(css_class, width):
+    """One invocation shape covers all four table alignment handlers"""
+    return "setTableAlign('%s', '%s');" % (css_class, width)
+
+
+_JS_TABLE_ALIGN_LEFT = _table_align_js('left-align', 'auto')
+_JS_TABLE_ALIGN_CENTER = _table_align_js('center-align', 'auto')
+_JS_TABLE_ALIGN_RIGHT = _table_align_js('right-align', 'auto')
+_JS_TABLE_FULL_WIDTH = _table_align_js('no-wrap', '100%')
+
+# Formatting toolbar definition. Building the whole widget tree from one
+# GtkBuilder XML string keeps startup to a single C-side parse instead of
+# ~40 per-widget constructor/property/connect calls across the FFI boundary.
+_TOOLBAR_UI = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<interface>
+  <object class="GtkAdjustment" id="zoom_adjustment">
+    <property name="value">1.0</property>
+    <property name="lower">0.5</property>
+    <property name="upper">7.0</property>
+    <property name="step-increment">0.1</property>
+    <property name="page-increment">0.5</property>
+  </object>
+  <object class="GtkBox" id="toolbar">
+    <property name="orientation">horizontal</property>
+    <property name="spacing">2</property>
+    <property name="margin-start">6</property>
+    <property name="margin-end">6</property>
+    <property name="margin-top">6</property>
+    <property name="margin-bottom">6</property>
+    <style>
+      <class name="toolbar"/>
+    </style>
+    <child>
+      <object class="GtkFontDialogButton" id="font_button">
+        <signal name="notify::font-desc" handler="on_font_changed"/>
+        <style>
+          <class name="toolbar-group-end"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="bold_button">
+        <property name="icon-name">format-text-bold-symbolic</property>
+        <property name="tooltip-text">Bold</property>
+        <property name="action-name">fmt.bold</property>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="italic_button">
+        <property name="icon-name">format-text-italic-symbolic</property>
+        <property name="tooltip-text">Italic</property>
+        <property name="action-name">fmt.italic</property>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="underline_button">
+        <property name="icon-name">format-text-underline-symbolic</property>
+        <property name="tooltip-text">Underline</property>
+        <property name="action-name">fmt.underline</property>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="strikethrough_button">
+        <property name="icon-name">format-text-strikethrough-symbolic</property>
+        <property name="tooltip-text">Strikethrough</property>
+        <property name="action-name">fmt.strikethrough</property>
+        <style>
+          <class name="toolbar-group-end"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="superscript_button">
+        <property name="icon-name">format-text-superscript-symbolic</property>
+        <property name="tooltip-text">Superscript</property>
+        <property name="action-name">fmt.superscript</property>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="subscript_button">
+        <property name="icon-name">format-text-subscript-symbolic</property>
+        <property name="tooltip-text">Subscript</property>
+        <property name="action-name">fmt.subscript</property>
+        <style>
+          <class name="toolbar-group-end"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="align_left_button">
+        <property name="icon-name">format-justify-left-symbolic</property>
+        <property name="tooltip-text">Align Left</property>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="align_center_button">
+        <property name="icon-name">format-justify-center-symbolic</property>
+        <property name="tooltip-text">Align Center</property>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="align_right_button">
+        <property name="icon-name">format-justify-right-symbolic</property>
+        <property name="tooltip-text">Align Right</property>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="align_justify_button">
+        <property name="icon-name">format-justify-fill-symbolic</property>
+        <property name="tooltip-text">Justify</property>
+        <style>
+          <class name="toolbar-group-end"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkColorDialogButton" id="text_color_button">
+        <property name="tooltip-text">Text Color</property>
+        <signal name="notify::rgba" handler="on_text_color_changed"/>
+      </object>
+    </child>
+    <child>
+      <object class="GtkColorDialogButton" id="bg_color_button">
+        <property name="tooltip-text">Background Color</property>
+        <signal name="notify::rgba" handler="on_bg_color_changed"/>
+        <style>
+          <class name="toolbar-group-end"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="bullet_list_button">
+        <property name="icon-name">view-list-bullet-symbolic</property>
+        <property name="tooltip-text">Bullet List</property>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="numbered_list_button">
+        <property name="icon-name">view-list-ordered-symbolic</property>
+        <property name="tooltip-text">Numbered List</property>
+        <style>
+          <class name="toolbar-group-end"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkButton" id="indent_button">
+        <property name="icon-name">format-indent-more-symbolic</property>
+        <property name="tooltip-text">Increase Indent</property>
+        <signal name="clicked" handler="on_indent_clicked"/>
+      </object>
+    </child>
+    <child>
+      <object class="GtkButton" id="outdent_button">
+        <property name="icon-name">format-indent-less-symbolic</property>
+        <property name="tooltip-text">Decrease Indent</property>
+        <signal name="clicked" handler="on_outdent_clicked"/>
+        <style>
+          <class name="toolbar-group-end"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkToggleButton" id="rtl_button">
+        <property name="icon-name">format-text-direction-rtl-symbolic</property>
+        <property name="tooltip-text">Right to Left Text</property>
+        <signal name="toggled" handler="on_rtl_toggled"/>
+        <style>
+          <class name="toolbar-group-end"/>
+        </style>
+      </object>
+    </child>
+    <child>
+      <object class="GtkButton" id="insert_table_button">
+        <property name="icon-name">insert-table-symbolic</property>
+        <property name="tooltip-text">Insert Table</property>
+        <signal name="clicked" handler="on_insert_table_clicked"/>
+      </object>
+    </child>
+    <child>
+      <object class="GtkButton" id="insert_image_button">
+        <property name="icon-name">insert-image-symbolic</property>
+        <property name="tooltip-text">Insert Image</property>
+        <signal name="clicked" handler="on_insert_image_clicked"/>
+      </object>
+    </child>
+    <child>
+      <object class="GtkButton" id="insert_datetime_button">
+        <property name="icon-name">insert-datetime-symbolic</property>
+        <property name="tooltip-text">Insert Date/Time</property>
+        <signal name="clicked" handler="on_insert_datetime_clicked"/>
+      </object>
+    </child>
+    <child>
+      <object class="GtkMenuButton" id="zoom_button">
+        <property name="icon-name">org.gnome.Settings-accessibility-zoom-symbolic</property>
+        <property name="tooltip-text">Zoom</property>
+        <property name="popover">
+          <object class="GtkPopover" id="zoom_popover">
+            <property name="child">
+              <object class="GtkBox">
+                <property name="orientation">vertical</property>
+                <property name="spacing">6</property>
+                <child>
+                  <object class="GtkLabel" id="zoom_label">
+                    <property name="label">100%</property>
+                    <property name="margin-bottom">6</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkScale" id="zoom_slider">
+                    <property name="orientation">vertical</property>
+                    <property name="adjustment">zoom_adjustment</property>
+                    <property name="draw-value">False</property>
+                    <property name="inverted">True</property>
+                    <property name="height-request">150</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkButton">
+                    <property name="label">1:1</property>
+                    <property name="margin-top">6</property>
+                    <signal name="clicked" handler="on_zoom_reset_button_clicked"/>
+                  </object>
+                </child>
+              </object>
+            </property>
+          </object>
+        </property>
+      </object>
+    </child>
+  </object>
+</interface>
+"""
+
+# Spacing dialog bodies, parsed in one C-side builder pass per open
+# instead of ~20 Python constructor calls each; handlers are connected
+# by id after parsing
+_PARA_SPACING_UI = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<interface>
+  <object class="GtkBox" id="dialog_content">
+    <property name="orientation">vertical</property>
+    <child>
+      <object class="AdwClamp">
+        <property name="child">
+          <object class="GtkBox">
+            <property name="orientation">vertical</property>
+            <property name="spacing">20</property>
+            <property name="margin-top">24</property>
+            <property name="margin-bottom">24</property>
+            <property name="margin-start">24</property>
+            <property name="margin-end">24</property>
+            <child>
+              <object class="GtkLabel">
+                <property name="label">&lt;b&gt;Paragraph Spacing Options:&lt;/b&gt;</property>
+                <property name="use-markup">true</property>
+                <property name="halign">start</property>
+              </object>
+            </child>
+            <child>
+              <object class="GtkBox">
+                <property name="orientation">vertical</property>
+                <property name="spacing">8</property>
+                <property name="margin-top">12</property>
+                <property name="margin-bottom">12</property>
+                <child>
+                  <object class="GtkLabel">
+                    <property name="label">Apply to:</property>
+                    <property name="halign">start</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkCheckButton" id="current_radio">
+                    <property name="label">Current paragraph only</property>
+                    <property name="active">true</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkCheckButton">
+                    <property name="label">All paragraphs</property>
+                    <property name="group">current_radio</property>
+                  </object>
+                </child>
+              </object>
+            </child>
+            <child>
+              <object class="GtkLabel">
+                <property name="label">Spacing value:</property>
+                <property name="halign">start</property>
+              </object>
+            </child>
+            <child>
+              <object class="GtkScale" id="spacing_scale">
+                <property name="hexpand">true</property>
+                <property name="digits">0</property>
+                <property name="draw-value">true</property>
+                <property name="adjustment">
+                  <object class="GtkAdjustment">
+                    <property name="value">10</property>
+                    <property name="lower">0</property>
+                    <property name="upper">50</property>
+                    <property name="step-increment">1</property>
+                    <property name="page-increment">5</property>
+                  </object>
+                </property>
+                <marks>
+                  <mark value="0" position="bottom">None</mark>
+                  <mark value="10" position="bottom">Default</mark>
+                  <mark value="30" position="bottom">Wide</mark>
+                </marks>
+              </object>
+            </child>
+            <child>
+              <object class="GtkBox">
+                <property name="spacing">8</property>
+                <property name="homogeneous">true</property>
+                <property name="margin-top">12</property>
+                <child>
+                  <object class="GtkButton" id="preset_none">
+                    <property name="label">None</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkButton" id="preset_small">
+                    <property name="label">Small</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkButton" id="preset_medium">
+                    <property name="label">Medium</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkButton" id="preset_large">
+                    <property name="label">Large</property>
+                  </object>
+                </child>
+              </object>
+            </child>
+            <child>
+              <object class="GtkBox">
+                <property name="spacing">8</property>
+                <property name="halign">end</property>
+                <property name="margin-top">24</property>
+                <child>
+                  <object class="GtkButton" id="cancel_button">
+                    <property name="label">Cancel</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkButton" id="apply_button">
+                    <property name="label">Apply</property>
+                    <style>
+                      <class name="suggested-action"/>
+                    </style>
+                  </object>
+                </child>
+              </object>
+            </child>
+          </object>
+        </property>
+      </object>
+    </child>
+  </object>
+</interface>
+"""
+
+_LINE_SPACING_UI = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<interface>
+  <object class="GtkBox" id="dialog_content">
+    <property name="orientation">vertical</property>
+    <child>
+      <object class="AdwClamp">
+        <property name="child">
+          <object class="GtkBox">
+            <property name="orientation">vertical</property>
+            <property name="spacing">20</property>
+            <property name="margin-top">24</property>
+            <property name="margin-bottom">24</property>
+            <property name="margin-start">24</property>
+            <property name="margin-end">24</property>
+            <child>
+              <object class="GtkLabel">
+                <property name="label">&lt;b&gt;Line Spacing Options:&lt;/b&gt;</property>
+                <property name="use-markup">true</property>
+                <property name="halign">start</property>
+              </object>
+            </child>
+            <child>
+              <object class="GtkBox">
+                <property name="orientation">vertical</property>
+                <property name="spacing">8</property>
+                <property name="margin-top">12</property>
+                <property name="margin-bottom">12</property>
+                <child>
+                  <object class="GtkLabel">
+                    <property name="label">Apply to:</property>
+                    <property name="halign">start</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkCheckButton" id="current_radio">
+                    <property name="label">Current paragraph only</property>
+                    <property name="active">true</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkCheckButton">
+                    <property name="label">All paragraphs</property>
+                    <property name="group">current_radio</property>
+                  </object>
+                </child>
+              </object>
+            </child>
+            <child>
+              <object class="GtkBox">
+                <property name="orientation">vertical</property>
+                <property name="spacing">12</property>
+                <child>
+                  <object class="GtkLabel">
+                    <property name="label">Common spacing:</property>
+                    <property name="halign">start</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkBox">
+                    <property name="spacing">8</property>
+                    <property name="homogeneous">true</property>
+                    <child>
+                      <object class="GtkButton" id="preset_single">
+                        <property name="label">Single (1.0)</property>
+                      </object>
+                    </child>
+                    <child>
+                      <object class="GtkButton" id="preset_one_half">
+                        <property name="label">1.5 lines</property>
+                      </object>
+                    </child>
+                    <child>
+                      <object class="GtkButton" id="preset_double">
+                        <property name="label">Double (2.0)</property>
+                      </object>
+                    </child>
+                  </object>
+                </child>
+              </object>
+            </child>
+            <child>
+              <object class="GtkBox">
+                <property name="orientation">vertical</property>
+                <property name="spacing">12</property>
+                <property name="margin-top">8</property>
+                <child>
+                  <object class="GtkLabel">
+                    <property name="label">Custom spacing:</property>
+                    <property name="halign">start</property>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkScale" id="spacing_scale">
+                    <property name="hexpand">true</property>
+                    <property name="digits">1</property>
+                    <property name="draw-value">true</property>
+                    <property name="adjustment">
+                      <object class="GtkAdjustment">
+                        <property name="value">1.0</property>
+                        <property name="lower">0.8</property>
+                        <property name="upper">3.0</property>
+                        <property name="step-increment">0.1</property>
+                        <property name="page-increment">0.2</property>
+                      </object>
+                    </property>
+                    <marks>
+                      <mark value="1.0" position="bottom">1.0</mark>
+                      <mark value="1.5" position="bottom">1.5</mark>
+                      <mark value="2.0" position="bottom">2.0</mark>
+                    </marks>
+                  </object>
+                </child>
+                <child>
+                  <object class="GtkButton" id="custom_apply_button">
+                    <property name="label">Apply Custom Value</property>
+                    <property name="margin-top">8</property>
+                  </object>
+                </child>
+              </object>
+            </child>
+            <child>
+              <object class="GtkBox">
+                <property name="spacing">8</property>
+                <property name="halign">end</property>
+                <property name="margin-top">24</property>
+                <child>
+                  <object class="GtkButton" id="cancel_button">
+                    <property name="label">Cancel</property>
+                  </object>
+                </child>
+              </object>
+            </child>
+          </object>
+        </property>
+      </object>
+    </child>
+  </object>
+</interface>
+"""
+
+# Editor page served to the WebView. Hoisted to a module-level constant so
+# the multi-KB literal is built once at import time instead of on call.
+_EDITOR_HTML = r"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -680,9 +706,25 @@ class Writer(Adw.Application):
                 }
             </style>
             <script>
+                // The editor element never changes; look it up once
+                var editorEl = null;
+                function getEditor() {
+                    return editorEl || (editorEl = document.getElementById('editor'));
+                }
+
+                // The window's Selection object is a singleton; grab it once
+                const domSelection = window.getSelection();
+
                 var searchResults = [];
                 var searchIndex = -1;
                 var currentSearchText = "";
+                var searchRegexCache = new Map();
+                // Flat-text match cache; lets a narrowed query re-test only
+                // the previous match positions (see searchAndHighlight)
+                var lastSearchFlat = null;
+                var lastSearchQuery = "";
+                var lastSearchPositions = null;
+                var lastSearchTruncated = false;
                 var activeTable = null;
                 var isDragging = false;
                 var dragStartX = 0;
@@ -690,69 +732,313 @@ class Writer(Adw.Application):
                 var tableStartX = 0;
                 var tableStartY = 0;
                 var isResizing = false;
-                
-            // Initialize history variables 
+
+                // Notify the app of a content change with a compact
+                // "words:chars" payload so Python never has to issue a
+                // follow-up getWordCount round trip or parse JSON. The word
+                // count scales with the document, so bursts (typing, paste
+                // cleanup, table edits) coalesce behind a trailing timer and
+                // Python hears once per quiet period
+                var contentChangedTimer = null;
+                // Seeded pushes (initial load, setContent) refresh the
+                // counters without dirtying the document; a real edit
+                // arriving while the timer pends upgrades the message
+                var contentChangedIsEdit = false;
+
+                function notifyContentChanged(seed) {
+                    if (!seed) contentChangedIsEdit = true;
+                    if (contentChangedTimer) return;
+                    contentChangedTimer = setTimeout(() => {
+                        contentChangedTimer = null;
+                        const isEdit = contentChangedIsEdit;
+                        contentChangedIsEdit = false;
+                        postContentChanged(isEdit);
+                    }, 150);
+                }
+
+                // Single-pass whitespace-delimited word counter over
+                // textContent: no layout-dependent innerText read, no regex
+                // split array
+                function countWords(text) {
+                    let words = 0;
+                    let inWord = false;
+                    for (let i = 0; i < text.length; i++) {
+                        const c = text.charCodeAt(i);
+                        const ws = (c === 32 || c === 9 || c === 10 || c === 13 ||
+                                    c === 12 || c === 0xA0);
+                        if (!ws) {
+                            if (!inWord) {
+                                words++;
+                                inWord = true;
+                            }
+                        } else {
+                            inWord = false;
+                        }
+                    }
+                    return words;
+                }
+
+                function postContentChanged(isEdit) {
+                    let text = getEditor().textContent;
+                    window.webkit.messageHandlers.contentChanged.postMessage(
+                        countWords(text) + ':' + text.length +
+                        (isEdit ? '' : ':seed'));
+                }
+
+            // Initialize history variables
                 var editorHistory = [];
                 var historyIndex = -1;
                 var isPerformingUndoRedo = false;
+                // Content as of the last history entry, used to diff new entries against
+                var lastHistoryContent = null;
+                // Store a full snapshot every N entries so undo cost stays bounded;
+                // entries in between only hold a small diff against their predecessor
+                var HISTORY_SNAPSHOT_INTERVAL = 50;
+                // Oldest entries are evicted past this point, at a snapshot
+                // boundary so the remaining chain still replays from a snapshot
+                var HISTORY_MAX_ENTRIES = 100;
+                var historyDebounceTimer = null;
+                var HISTORY_DEBOUNCE_MS = 300;
+                // Flat text-node index for selection save/restore, rebuilt lazily
+                // whenever contentVersion moves past the version it was built at
+                var contentVersion = 0;
+                var selectionIndex = null;
+                var selectionIndexVersion = -1;
+
+                // Compute a minimal {offset, removed, inserted} diff between two strings
+                // by trimming the common prefix and suffix
+                function computeDiff(oldContent, newContent) {
+                    let prefix = 0;
+                    let maxPrefix = Math.min(oldContent.length, newContent.length);
+                    while (prefix < maxPrefix && oldContent[prefix] === newContent[prefix]) {
+                        prefix++;
+                    }
+                    let suffix = 0;
+                    let maxSuffix = Math.min(oldContent.length, newContent.length) - prefix;
+                    while (suffix < maxSuffix &&
+                           oldContent[oldContent.length - 1 - suffix] === newContent[newContent.length - 1 - suffix]) {
+                        suffix++;
+                    }
+                    return {
+                        offset: prefix,
+                        removed: oldContent.slice(prefix, oldContent.length - suffix),
+                        inserted: newContent.slice(prefix, newContent.length - suffix)
+                    };
+                }
+
+                // Apply a diff forward (old -> new content)
+                function applyDiff(content, diff) {
+                    return content.slice(0, diff.offset) + diff.inserted +
+                           content.slice(diff.offset + diff.removed.length);
+                }
+
+                // Rebuild the content at a given history index by starting from the
+                // nearest snapshot at or before it and replaying diffs forward
+                function contentAtHistoryIndex(index) {
+                    let base = index;
+                    while (base > 0 && editorHistory[base].snapshot === undefined) {
+                        base--;
+                    }
+                    let content = editorHistory[base].snapshot;
+                    for (let i = base + 1; i <= index; i++) {
+                        content = applyDiff(content, editorHistory[i].diff);
+                    }
+                    return content;
+                }
 
                 // Create a better history entry creation function
                 function createHistoryEntry() {
                     // Don't create entry if we're in the middle of an undo/redo operation
                     if (isPerformingUndoRedo) return;
-                    
+
                     // Get editor content
-                    let editorContent = document.getElementById('editor').innerHTML;
-                    
+                    let editorContent = getEditor().innerHTML;
+
+                    // Skip no-op entries: lastHistoryContent always mirrors the
+                    // content at the current history index (undo/redo update it),
+                    // so equality means nothing changed — even mid-history, where
+                    // pushing would needlessly trim the redo branch. The native
+                    // string comparison already short-circuits on length, so a
+                    // hash prefilter would buy nothing here
+                    if (lastHistoryContent !== null && editorContent === lastHistoryContent) {
+                        return;
+                    }
+
                     // Save selection as a range of character offsets within the editor
                     let selectionInfo = saveSelection();
-                    
+
                     let historyEntry = {
-                        content: editorContent,
                         selection: selectionInfo,
                         timestamp: Date.now()
                     };
-                    
+
+                    // First entry and every Nth entry keep a full snapshot; the rest
+                    // store only the diff against the previous content
+                    if (lastHistoryContent === null ||
+                        editorHistory.length % HISTORY_SNAPSHOT_INTERVAL === 0) {
+                        historyEntry.snapshot = editorContent;
+                    } else {
+                        historyEntry.diff = computeDiff(lastHistoryContent, editorContent);
+                    }
+
                     // Trim history if navigating from middle point
                     if (historyIndex >= 0 && historyIndex < editorHistory.length - 1) {
                         editorHistory = editorHistory.slice(0, historyIndex + 1);
+                        // The next entry after a trim must re-anchor on a snapshot
+                        if (historyEntry.diff !== undefined) {
+                            delete historyEntry.diff;
+                            historyEntry.snapshot = editorContent;
+                        }
                     }
-                    
+
                     // Add current state to history
-                    editorHistory.push(historyEntry);
-                    historyIndex = editorHistory.length - 1;
-                    
+                    pushHistoryEntry(historyEntry);
+                    lastHistoryContent = editorContent;
+
                     // Debug
                     console.log("History entry created. Total:", editorHistory.length, "Current:", historyIndex);
                 }
 
+                // Drop state belonging to the previous document so a new one
+                // does not inherit its undo stack or search highlights
+                function resetDocumentState() {
+                    if (historyDebounceTimer) {
+                        clearTimeout(historyDebounceTimer);
+                        historyDebounceTimer = null;
+                    }
+                    editorHistory = [];
+                    historyIndex = -1;
+                    lastHistoryContent = null;
+                    contentVersion++;
+                    clearSearch();
+                }
+
+                // Coalesce rapid typing into one history entry instead of one per keystroke
+                function scheduleHistoryEntry() {
+                    if (isPerformingUndoRedo) return;
+                    if (historyDebounceTimer) {
+                        clearTimeout(historyDebounceTimer);
+                    }
+                    historyDebounceTimer = setTimeout(() => {
+                        historyDebounceTimer = null;
+                        createHistoryEntry();
+                    }, HISTORY_DEBOUNCE_MS);
+                }
+
+                // Single entry point for growing the history: pushes, then
+                // enforces the memory cap. Eviction cuts at a snapshot boundary
+                // so the surviving chain still replays from a full snapshot,
+                // and it fires at most once per HISTORY_SNAPSHOT_INTERVAL
+                // pushes, so the occasional O(n) splice amortizes to O(1) —
+                // no ring-buffer indexing needed through the rest of the code
+                function pushHistoryEntry(historyEntry) {
+                    editorHistory.push(historyEntry);
+                    historyIndex = editorHistory.length - 1;
+
+                    if (editorHistory.length > HISTORY_MAX_ENTRIES) {
+                        let evict = editorHistory.length - HISTORY_MAX_ENTRIES;
+                        while (evict < editorHistory.length &&
+                               editorHistory[evict].snapshot === undefined) {
+                            evict++;
+                        }
+                        if (evict > 0 && evict < editorHistory.length) {
+                            editorHistory.splice(0, evict);
+                            historyIndex -= evict;
+                        }
+                    }
+                }
+
+                // Record a pending debounced entry immediately, e.g. before
+                // undo/redo, programmatic edits, or when focus leaves the editor
+                function flushPendingHistoryEntry() {
+                    if (historyDebounceTimer) {
+                        clearTimeout(historyDebounceTimer);
+                        historyDebounceTimer = null;
+                        createHistoryEntry();
+                    }
+                }
+
+                // Build the flat text-node index: parallel node/start arrays for
+                // binary search plus a Map for O(1) node-to-offset lookup
+                function buildSelectionIndex() {
+                    const editor = getEditor();
+                    const nodes = [];
+                    const starts = [];
+                    const byNode = new Map();
+                    let offset = 0;
+
+                    // TreeWalker iterates in engine code rather than per-child
+                    // JS recursion, and the filter drops text under elements
+                    // that never hold visible content (pasted markup can carry
+                    // style or script tags)
+                    const walker = document.createTreeWalker(
+                        editor, NodeFilter.SHOW_TEXT, {
+                            acceptNode: function(n) {
+                                const tag = n.parentNode.nodeName;
+                                return (tag === 'SCRIPT' || tag === 'STYLE' ||
+                                        tag === 'NOSCRIPT' || tag === 'IFRAME')
+                                    ? NodeFilter.FILTER_REJECT
+                                    : NodeFilter.FILTER_ACCEPT;
+                            }
+                        });
+                    let child;
+                    while ((child = walker.nextNode()) !== null) {
+                        byNode.set(child, nodes.length);
+                        nodes.push(child);
+                        starts.push(offset);
+                        offset += child.nodeValue.length;
+                    }
+                    return { nodes: nodes, starts: starts, byNode: byNode, totalLength: offset };
+                }
+
+                function getSelectionIndex() {
+                    if (selectionIndex === null || selectionIndexVersion !== contentVersion) {
+                        selectionIndex = buildSelectionIndex();
+                        selectionIndexVersion = contentVersion;
+                    }
+                    return selectionIndex;
+                }
+
+                // Character offset of a range boundary, or null if the container
+                // is not an indexed text node (e.g. a caret between blocks)
+                function boundaryCharOffset(index, container, offset) {
+                    const idx = index.byNode.get(container);
+                    if (idx === undefined) return null;
+                    return index.starts[idx] + offset;
+                }
+
                 // Save selection as character offsets
                 function saveSelection() {
-                    const editor = document.getElementById('editor');
-                    const selection = window.getSelection();
-                    
+                    const editor = getEditor();
+                    const selection = domSelection;
+
                     if (!selection.rangeCount) return null;
-                    
+
                     const range = selection.getRangeAt(0);
-                    
-                    // Get total text content
-                    const editorText = editor.textContent;
-                    
-                    // Use a temporary range to measure character offsets
-                    const tempRange = document.createRange();
-                    tempRange.setStart(editor, 0);
-                    tempRange.setEnd(range.startContainer, range.startOffset);
-                    const startOffset = tempRange.toString().length;
-                    
-                    // If selection is collapsed (just cursor), end offset is same as start
-                    let endOffset;
-                    if (range.collapsed) {
-                        endOffset = startOffset;
-                    } else {
-                        tempRange.setEnd(range.endContainer, range.endOffset);
-                        endOffset = tempRange.toString().length;
+
+                    // Fast path: both boundaries sit in indexed text nodes, so the
+                    // offsets come straight from the index without any DOM walk
+                    const index = getSelectionIndex();
+                    let startOffset = boundaryCharOffset(index, range.startContainer, range.startOffset);
+                    let endOffset = range.collapsed ? startOffset
+                        : boundaryCharOffset(index, range.endContainer, range.endOffset);
+
+                    if (startOffset === null || endOffset === null) {
+                        // Boundary in an element node: fall back to measuring with
+                        // a temporary range
+                        const tempRange = document.createRange();
+                        tempRange.setStart(editor, 0);
+                        tempRange.setEnd(range.startContainer, range.startOffset);
+                        startOffset = tempRange.toString().length;
+
+                        if (range.collapsed) {
+                            endOffset = startOffset;
+                        } else {
+                            tempRange.setEnd(range.endContainer, range.endOffset);
+                            endOffset = tempRange.toString().length;
+                        }
                     }
-                    
+
                     return {
                         start: startOffset,
                         end: endOffset,
@@ -764,15 +1050,14 @@ class Writer(Adw.Application):
                 function restoreSelection(selectionInfo) {
                 if (!selectionInfo) return false;
                 
-                const editor = document.getElementById('editor');
+                const editor = getEditor();
                 
                 // Handle empty editor case
                 if (editor.innerHTML.trim() === '' || 
                     editor.innerHTML.trim() === '<br>' || 
                     editor.innerHTML.trim() === '<div><br></div>') {
                     
-                    const range = document.createRange();
-                    const selection = window.getSelection();
+                    const selection = domSelection;
                     
                     // Find the first element
                     let firstNode = editor.firstChild;
@@ -781,20 +1066,14 @@ class Writer(Adw.Application):
                         firstNode = editor.firstChild;
                     }
                     
-                    range.setStart(firstNode, 0);
-                    range.setEnd(firstNode, 0);
-                    
-                    selection.removeAllRanges();
-                    selection.addRange(range);
+                    selection.setBaseAndExtent(firstNode, 0, firstNode, 0);
                     return true;
                 }
                 
                 // For non-empty content
                 try {
-                    const editorText = editor.textContent;
-                    
                     // Validate offsets against current content length
-                    const maxOffset = editorText.length;
+                    const maxOffset = getSelectionIndex().totalLength;
                     const startOffset = Math.min(selectionInfo.start, maxOffset);
                     const endOffset = Math.min(selectionInfo.end, maxOffset);
                     
@@ -807,14 +1086,10 @@ class Writer(Adw.Application):
                         return false;
                     }
                     
-                    // Create a range and set it as the current selection
-                    const range = document.createRange();
-                    range.setStart(startPosition.node, startPosition.offset);
-                    range.setEnd(endPosition.node, endPosition.offset);
-                    
-                    const selection = window.getSelection();
-                    selection.removeAllRanges();
-                    selection.addRange(range);
+                    // Apply the selection in one call
+                    domSelection.setBaseAndExtent(
+                        startPosition.node, startPosition.offset,
+                        endPosition.node, endPosition.offset);
                     
                     return true;
                 } catch (e) {
@@ -824,31 +1099,41 @@ class Writer(Adw.Application):
             }
 
                 // Find node and offset at a given character position in the editor
+                // by binary-searching the cached text-node index
                 function getNodeAndOffsetAtCharacterOffset(root, charOffset) {
-                    const walker = document.createTreeWalker(
-                        root,
-                        NodeFilter.SHOW_TEXT,
-                        null,
-                        false
-                    );
-                    
-                    let currentOffset = 0;
-                    let node = walker.nextNode();
-                    
-                    while (node) {
-                        const nodeLength = node.nodeValue.length;
-                        
-                        if (currentOffset + nodeLength >= charOffset) {
-                            return {
-                                node: node,
-                                offset: charOffset - currentOffset
-                            };
+                    const index = getSelectionIndex();
+                    const starts = index.starts;
+                    const nodes = index.nodes;
+
+                    if (nodes.length > 0) {
+                        // Undo/redo mostly restores carets at the start or end;
+                        // both resolve from the index ends without a search
+                        if (charOffset <= 0) {
+                            return { node: nodes[0], offset: 0 };
+                        }
+                        if (charOffset >= index.totalLength) {
+                            const last = nodes[nodes.length - 1];
+                            return { node: last, offset: last.nodeValue.length };
+                        }
+
+                        // Last node whose start offset is <= charOffset
+                        let lo = 0;
+                        let hi = nodes.length - 1;
+                        while (lo < hi) {
+                            const mid = (lo + hi + 1) >> 1;
+                            if (starts[mid] <= charOffset) {
+                                lo = mid;
+                            } else {
+                                hi = mid - 1;
+                            }
+                        }
+                        const node = nodes[lo];
+                        const offset = charOffset - starts[lo];
+                        if (offset <= node.nodeValue.length) {
+                            return { node: node, offset: offset };
                         }
-                        
-                        currentOffset += nodeLength;
-                        node = walker.nextNode();
                     }
-                    
+
                     // If we couldn't find the exact position, return the last position
                     if (root.lastChild) {
                         const lastNode = root.lastChild;
@@ -868,7 +1153,10 @@ class Writer(Adw.Application):
                 // Improved undo function
                 function customUndo() {
                     console.log("Custom Undo called. Current index:", historyIndex, "History length:", editorHistory.length);
-                    
+
+                    // Flush any pending debounced entry so it isn't lost
+                    flushPendingHistoryEntry();
+
                     if (editorHistory.length === 0 || historyIndex <= 0) {
                         console.log("Nothing to undo - at beginning of history or no history");
                         return false;
@@ -881,9 +1169,10 @@ class Writer(Adw.Application):
                         // Go back one step in history
                         historyIndex--;
                         let historyEntry = editorHistory[historyIndex];
-                        
+                        let historyContent = contentAtHistoryIndex(historyIndex);
+
                         // Get the editor
-                        const editor = document.getElementById('editor');
+                        const editor = getEditor();
                         
                         // Save the current scroll position
                         const scrollTop = editor.scrollTop;
@@ -895,13 +1184,15 @@ class Writer(Adw.Application):
                         tempDiv.style.position = 'absolute';
                         tempDiv.style.left = '-9999px';
                         tempDiv.style.top = '-9999px';
-                        tempDiv.innerHTML = historyEntry.content;
+                        tempDiv.innerHTML = historyContent;
                         document.body.appendChild(tempDiv);
                         
                         // Apply to the real editor in a single operation
                         requestAnimationFrame(() => {
                             // Update content
-                            editor.innerHTML = historyEntry.content;
+                            editor.innerHTML = historyContent;
+                            lastHistoryContent = historyContent;
+                            contentVersion++;
                             
                             // Restore scroll position
                             editor.scrollTop = scrollTop;
@@ -916,26 +1207,30 @@ class Writer(Adw.Application):
                             }
                             
                             // Notify content changed
-                            window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                            notifyContentChanged();
+
+                            // The guard must hold until this deferred content
+                            // swap has finished, so reset it here rather than
+                            // on a timer racing the animation frame
+                            isPerformingUndoRedo = false;
                         });
                         
                         console.log("Undo complete. Now at index:", historyIndex);
                         return true;
                     } catch (e) {
                         console.error("Error during undo:", e);
+                        isPerformingUndoRedo = false;
                         return false;
-                    } finally {
-                        // Reset the flag
-                        setTimeout(() => {
-                            isPerformingUndoRedo = false;
-                        }, 10);
                     }
                 }
 
                 // Improved redo function
                 function customRedo() {
                     console.log("Custom Redo called. Current index:", historyIndex, "History length:", editorHistory.length);
-                    
+
+                    // Flush any pending debounced entry so it isn't lost
+                    flushPendingHistoryEntry();
+
                     if (editorHistory.length === 0 || historyIndex >= editorHistory.length - 1) {
                         console.log("Nothing to redo - at end of history or no history");
                         return false;
@@ -948,9 +1243,10 @@ class Writer(Adw.Application):
                         // Go forward one step in history
                         historyIndex++;
                         let historyEntry = editorHistory[historyIndex];
-                        
+                        let historyContent = contentAtHistoryIndex(historyIndex);
+
                         // Get the editor
-                        const editor = document.getElementById('editor');
+                        const editor = getEditor();
                         
                         // Save the current scroll position
                         const scrollTop = editor.scrollTop;
@@ -962,13 +1258,15 @@ class Writer(Adw.Application):
                         tempDiv.style.position = 'absolute';
                         tempDiv.style.left = '-9999px';
                         tempDiv.style.top = '-9999px';
-                        tempDiv.innerHTML = historyEntry.content;
+                        tempDiv.innerHTML = historyContent;
                         document.body.appendChild(tempDiv);
                         
                         // Apply to the real editor in a single operation
                         requestAnimationFrame(() => {
                             // Update content
-                            editor.innerHTML = historyEntry.content;
+                            editor.innerHTML = historyContent;
+                            lastHistoryContent = historyContent;
+                            contentVersion++;
                             
                             // Restore scroll position
                             editor.scrollTop = scrollTop;
@@ -983,19 +1281,20 @@ class Writer(Adw.Application):
                             }
                             
                             // Notify content changed
-                            window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                            notifyContentChanged();
+
+                            // The guard must hold until this deferred content
+                            // swap has finished, so reset it here rather than
+                            // on a timer racing the animation frame
+                            isPerformingUndoRedo = false;
                         });
                         
                         console.log("Redo complete. Now at index:", historyIndex);
                         return true;
                     } catch (e) {
                         console.error("Error during redo:", e);
+                        isPerformingUndoRedo = false;
                         return false;
-                    } finally {
-                        // Reset the flag
-                        setTimeout(() => {
-                            isPerformingUndoRedo = false;
-                        }, 10);
                     }
                 }
 
@@ -1006,25 +1305,34 @@ class Writer(Adw.Application):
                     // Create history entry before change
                     createHistoryEntry();
                     
-                    // Now perform the replacement
+                    // Now perform the replacement by mutating the range directly:
+                    // no beforeinput/command-manager round trip, and with the
+                    // guard set the input listener stays quiet so only the
+                    // explicit entries here record state
                     let span = searchResults[searchIndex];
-                    let range = document.createRange();
-                    range.selectNodeContents(span);
-                    
-                    let selection = window.getSelection();
-                    selection.removeAllRanges();
-                    selection.addRange(range);
-                    
-                    // Replace the text
-                    document.execCommand('insertText', false, replaceText);
-                    
-                    // Create another history entry after the change
-                    setTimeout(() => {
-                        createHistoryEntry();
-                    }, 0);
+                    isPerformingUndoRedo = true;
+                    try {
+                        let range = document.createRange();
+                        range.selectNodeContents(span);
+                        range.deleteContents();
+                        const replacementNode = document.createTextNode(replaceText);
+                        range.insertNode(replacementNode);
+
+                        // Collapse the caret to the end of the inserted text in
+                        // one selection call
+                        domSelection.collapse(replacementNode, replacementNode.length);
+                    } finally {
+                        isPerformingUndoRedo = false;
+                    }
+                    contentVersion++;
+
+                    // Create another history entry after the change; a
+                    // microtask runs before the next paint, without the ~4ms
+                    // setTimeout clamp
+                    queueMicrotask(createHistoryEntry);
                     
                     // Mark document as modified
-                    window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                    notifyContentChanged();
                     
                     // Need to rebuild the search results
                     let searchText = currentSearchText;
@@ -1037,6 +1345,8 @@ class Writer(Adw.Application):
 
                 // Update replaceAll function to create history entries
                 function replaceAll(searchText, replaceText) {
+                    // Capture any pending typing burst before the programmatic edit
+                    flushPendingHistoryEntry();
                     if (!searchText) return 0;
                     
                     // Create history entry before change
@@ -1045,51 +1355,72 @@ class Writer(Adw.Application):
                     // First clear any existing search
                     clearSearch();
                     
-                    let editor = document.getElementById('editor');
-                    let content = editor.innerHTML;
-                    
-                    // Escape special characters for regex
-                    let escapedSearch = searchText.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
-                    let regexSearch = new RegExp(escapedSearch, 'g');
-                    
-                    // Replace all occurrences
-                    let newContent = content.replace(regexSearch, replaceText);
-                    
-                    // Count how many replacements were made
+                    // Reuse the compiled search regex and count inside the
+                    // replacer, so each text node is scanned once
+                    let regexSearch = getSearchRegex(searchText, 'g');
                     let count = 0;
-                    let tempCount = (content.match(regexSearch) || []).length;
-                    count = tempCount;
-                    
-                    // Update editor content
-                    editor.innerHTML = newContent;
-                    
-                    // Create another history entry after the change
-                    setTimeout(() => {
-                        createHistoryEntry();
-                    }, 0);
-                    
-                    // Mark document as modified
-                    window.webkit.messageHandlers.contentChanged.postMessage('changed');
-                    
+
+                    // Mutate matching text nodes in place: no innerHTML
+                    // serialize/reparse, no matches inside tag or attribute
+                    // syntax, and the DOM (selection, table handlers) survives.
+                    // Collect first, then mutate, so the index stays coherent
+                    const nodes = getSelectionIndex().nodes;
+                    const affected = [];
+                    for (let i = 0; i < nodes.length; i++) {
+                        regexSearch.lastIndex = 0;
+                        if (regexSearch.test(nodes[i].nodeValue)) {
+                            affected.push(nodes[i]);
+                        }
+                    }
+                    for (let i = 0; i < affected.length; i++) {
+                        regexSearch.lastIndex = 0;
+                        affected[i].nodeValue = affected[i].nodeValue.replace(regexSearch, () => {
+                            count++;
+                            return replaceText;
+                        });
+                    }
+                    // One message for the whole pass, and none at all when
+                    // nothing matched: no modified-flag flip, no history
+                    // snapshot for a no-op
+                    if (count > 0) {
+                        contentVersion++;
+                        // Create another history entry after the change; a
+                        // microtask runs before the next paint, without the
+                        // ~4ms setTimeout clamp
+                        queueMicrotask(createHistoryEntry);
+                        notifyContentChanged();
+                    }
+
                     return count;
                 }
 
                 // Make sure to add this to your document ready function
                 document.addEventListener('DOMContentLoaded', function() {
-                    const editor = document.getElementById('editor');
+                    const editor = getEditor();
                     
                     if (editor.innerHTML.trim() === '') {
                         editor.innerHTML = '<div><br></div>';
                     }
                     
-                    // Add input listener to capture regular edits
+                    // Add input listener to capture regular edits, debounced so
+                    // rapid typing coalesces into a single history entry
                     editor.addEventListener('input', function(e) {
+                        contentVersion++;
                         // Don't create history for programmatic changes during undo/redo
                         if (!isPerformingUndoRedo) {
-                            createHistoryEntry();
+                            scheduleHistoryEntry();
                         }
                     });
                     
+                    // A typing burst should not straddle a focus change or a
+                    // new block, so flush the pending entry at those boundaries
+                    editor.addEventListener('blur', flushPendingHistoryEntry);
+                    editor.addEventListener('keydown', function(e) {
+                        if (e.key === 'Enter') {
+                            flushPendingHistoryEntry();
+                        }
+                    });
+
                     // Create initial history entry
                     setTimeout(() => {
                         createHistoryEntry();
@@ -1118,66 +1449,103 @@ class Writer(Adw.Application):
                         historyLength: editorHistory.length,
                         currentIndex: historyIndex,
                         isPerformingUndoRedo: isPerformingUndoRedo,
-                        currentContent: document.getElementById('editor').innerHTML.substring(0, 100) + '...'
+                        currentContent: getEditor().innerHTML.substring(0, 100) + '...'
                     });
                     return true;
                 }
                 document.addEventListener('DOMContentLoaded', function() {
-                    const editor = document.getElementById('editor');
+                    const editor = getEditor();
                     if (editor.innerHTML.trim() === '') {
                         editor.innerHTML = '<div><br></div>';
                     }
+                    // Seed the counters once the editor exists; this replaces
+                    // the Python-side poll on load completion
+                    notifyContentChanged(true);
                     
                     editor.addEventListener('input', function() {
-                        window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                        notifyContentChanged();
                     });
                     
-                    editor.addEventListener('selectionchange', function() {
+                    // selectionchange fires many times a second while typing or
+                    // dragging a selection; probe the command states at most once
+                    // per frame and only post to Python when the answer changed
+                    let selectionProbeScheduled = false;
+                    let lastSelectionState = null;
+
+                    function probeSelectionState() {
+                        // The inline toggles keep queryCommandState: it knows
+                        // command semantics across mixed-style selections, which
+                        // a single computed-style read does not
                         let isBold = document.queryCommandState('bold');
                         let isItalic = document.queryCommandState('italic');
                         let isUnderline = document.queryCommandState('underline');
                         let isStrikethrough = document.queryCommandState('strikeThrough');
+
                         let alignment = '';
-                        
-                        if (document.queryCommandState('justifyLeft')) alignment = 'left';
-                        if (document.queryCommandState('justifyCenter')) alignment = 'center';
-                        if (document.queryCommandState('justifyRight')) alignment = 'right';
-                        if (document.queryCommandState('justifyFull')) alignment = 'justify';
-                        
-                        let selection = window.getSelection();
+                        let selection = domSelection;
                         let isSuperscript = false;
                         let isSubscript = false;
-                        
+
                         if (selection.rangeCount > 0) {
-                            let range = selection.getRangeAt(0);
-                            let container = range.commonAncestorContainer;
+                            let container = selection.getRangeAt(0).commonAncestorContainer;
                             if (container.nodeType === 3) {
                                 container = container.parentNode;
                             }
-                            let parent = container;
-                            while (parent && parent !== document.body) {
-                                if (parent.tagName === 'SUP') isSuperscript = true;
-                                if (parent.tagName === 'SUB') isSubscript = true;
-                                parent = parent.parentNode;
+
+                            // One computed-style read of the enclosing block
+                            // replaces the four justify* probes, each of which
+                            // re-resolved the selection
+                            const block = container.closest(
+                                'div,p,h1,h2,h3,h4,h5,h6,li,td,th') || container;
+                            const blockStyle = window.getComputedStyle(block);
+                            alignment = blockStyle.textAlign;
+                            if (alignment === 'start') {
+                                alignment = blockStyle.direction === 'rtl' ? 'right' : 'left';
+                            } else if (alignment === 'end') {
+                                alignment = blockStyle.direction === 'rtl' ? 'left' : 'right';
+                            }
+
+                            const scriptEl = container.closest ?
+                                container.closest('sup,sub') : null;
+                            if (scriptEl) {
+                                isSuperscript = scriptEl.tagName === 'SUP';
+                                isSubscript = scriptEl.tagName === 'SUB';
                             }
                         }
-                        
-                        window.webkit.messageHandlers.selectionChanged.postMessage(
-                            JSON.stringify({
-                                bold: isBold,
-                                italic: isItalic,
-                                underline: isUnderline,
-                                strikethrough: isStrikethrough,
-                                superscript: isSuperscript,
-                                subscript: isSubscript,
-                                alignment: alignment
-                            })
-                        );
+
+                        // Pack the whole state into one small integer:
+                        // six toggle bits plus two alignment bits. Python
+                        // decodes it with int() and bit tests instead of
+                        // parsing a JSON object per caret move
+                        const alignIdx = alignment === 'center' ? 1 :
+                                         alignment === 'right' ? 2 :
+                                         alignment === 'justify' ? 3 : 0;
+                        const state = (isBold ? 1 : 0) |
+                                      (isItalic ? 2 : 0) |
+                                      (isUnderline ? 4 : 0) |
+                                      (isStrikethrough ? 8 : 0) |
+                                      (isSuperscript ? 16 : 0) |
+                                      (isSubscript ? 32 : 0) |
+                                      (alignIdx << 6);
+
+                        if (state !== lastSelectionState) {
+                            lastSelectionState = state;
+                            window.webkit.messageHandlers.selectionChanged.postMessage(String(state));
+                        }
+                    }
+
+                    editor.addEventListener('selectionchange', function() {
+                        if (selectionProbeScheduled) return;
+                        selectionProbeScheduled = true;
+                        requestAnimationFrame(() => {
+                            selectionProbeScheduled = false;
+                            probeSelectionState();
+                        });
                     });
                     
                     editor.addEventListener('keydown', function(e) {
                         if (e.key === 'Enter' && !e.shiftKey) {
-                            const selection = window.getSelection();
+                            const selection = domSelection;
                             if (selection.rangeCount > 0) {
                                 const range = selection.getRangeAt(0);
                                 const startNode = range.startContainer;
@@ -1194,7 +1562,7 @@ class Writer(Adw.Application):
                 });
 
                 function setupTableEventHandlers() {
-                    const editor = document.getElementById('editor');
+                    const editor = getEditor();
                     
                     editor.addEventListener('mousedown', function(e) {
                         let tableElement = findParentTable(e.target);
@@ -1208,13 +1576,27 @@ class Writer(Adw.Application):
                         }
                     });
                     
+                    // Mouse samples arrive far faster than frames paint; keep only
+                    // the latest event and apply it once per animation frame
+                    let pendingMouseMove = null;
+                    let mouseMoveRafScheduled = false;
                     document.addEventListener('mousemove', function(e) {
-                        if (isDragging && activeTable) {
-                            moveTable(e);
-                        }
-                        if (isResizing && activeTable) {
-                            resizeTable(e);
-                        }
+                        if (!isDragging && !isResizing) return;
+                        pendingMouseMove = e;
+                        if (mouseMoveRafScheduled) return;
+                        mouseMoveRafScheduled = true;
+                        requestAnimationFrame(() => {
+                            mouseMoveRafScheduled = false;
+                            const ev = pendingMouseMove;
+                            pendingMouseMove = null;
+                            if (!ev) return;
+                            if (isDragging && activeTable) {
+                                moveTable(ev);
+                            }
+                            if (isResizing && activeTable) {
+                                resizeTable(ev);
+                            }
+                        });
                     });
                     
                     document.addEventListener('mouseup', function() {
@@ -1222,7 +1604,7 @@ class Writer(Adw.Application):
                             isDragging = false;
                             isResizing = false;
                             if (activeTable) {
-                                window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                                notifyContentChanged();
                             }
                         }
                     });
@@ -1239,14 +1621,43 @@ class Writer(Adw.Application):
                     });
                 }
                 
+                // Ancestor-table lookups repeat for every mouse event in the same
+                // cell; memoize per element. WeakMap entries vanish with their
+                // keys, so detached nodes cannot leak. The cache is replaced
+                // wholesale when the content version moves, since edits can
+                // reparent nodes
+                let tableAncestorCache = new WeakMap();
+                let tableAncestorCacheVersion = -1;
+
                 function findParentTable(element) {
+                    if (tableAncestorCacheVersion !== contentVersion) {
+                        tableAncestorCache = new WeakMap();
+                        tableAncestorCacheVersion = contentVersion;
+                    }
+
+                    const visited = [];
+                    let table = null;
+
                     while (element && element !== document.body) {
+                        const cached = tableAncestorCache.get(element);
+                        if (cached !== undefined) {
+                            table = cached;
+                            break;
+                        }
                         if (element.tagName === 'TABLE') {
-                            return element;
+                            table = element;
+                            break;
                         }
+                        visited.push(element);
                         element = element.parentNode;
                     }
-                    return null;
+
+                    // Record the answer on every node walked so later queries
+                    // from any descendant resolve in one lookup
+                    for (let i = 0; i < visited.length; i++) {
+                        tableAncestorCache.set(visited[i], table);
+                    }
+                    return table;
                 }
                 
                 function startTableDrag(e, tableElement) {
@@ -1259,26 +1670,55 @@ class Writer(Adw.Application):
                     document.body.style.cursor = 'move';
                 }
                 
+                // Block-level children of the editor, rebuilt only when the
+                // content version moves. moveTable runs per mousemove frame, so
+                // it must not re-filter (and re-flush styles for) every child
+                let cachedBlocks = null;
+                let cachedBlocksVersion = -1;
+
+                function getBlockChildren(editor) {
+                    if (cachedBlocks !== null && cachedBlocksVersion === contentVersion) {
+                        return cachedBlocks;
+                    }
+                    const blocks = [];
+                    for (let child = editor.firstChild; child; child = child.nextSibling) {
+                        if (child.nodeType !== Node.ELEMENT_NODE) continue;
+                        const tag = child.tagName;
+                        // Tag fast path covers everything the editor produces;
+                        // getComputedStyle is the exception, not the rule
+                        if (tag === 'TABLE' || tag === 'DIV' || tag === 'P' ||
+                            tag === 'UL' || tag === 'OL' || tag === 'H1' ||
+                            tag === 'H2' || tag === 'H3' || tag === 'H4' ||
+                            tag === 'H5' || tag === 'H6' ||
+                            window.getComputedStyle(child).display.includes('block')) {
+                            blocks.push(child);
+                        }
+                    }
+                    cachedBlocks = blocks;
+                    cachedBlocksVersion = contentVersion;
+                    return blocks;
+                }
+
                 function moveTable(e) {
                     if (!isDragging || !activeTable) return;
                     const currentY = e.clientY;
                     const deltaY = currentY - dragStartY;
-                    
+
                     if (Math.abs(deltaY) > 30) {
-                        const editor = document.getElementById('editor');
-                        const selection = window.getSelection();
-                        const blocks = Array.from(editor.children).filter(node => {
-                            const style = window.getComputedStyle(node);
-                            return style.display.includes('block') || node.tagName === 'TABLE';
-                        });
+                        const editor = getEditor();
+                        const blocks = getBlockChildren(editor);
                         const tableIndex = blocks.indexOf(activeTable);
-                        
+
                         if (deltaY < 0 && tableIndex > 0) {
                             const targetElement = blocks[tableIndex - 1];
                             editor.insertBefore(activeTable, targetElement);
+                            // Mirror the move in the cache instead of rebuilding
+                            blocks[tableIndex - 1] = activeTable;
+                            blocks[tableIndex] = targetElement;
+                            cachedBlocksVersion = ++contentVersion;
                             dragStartY = currentY;
-                            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-                        } 
+                            notifyContentChanged();
+                        }
                         else if (deltaY > 0 && tableIndex < blocks.length - 1) {
                             const targetElement = blocks[tableIndex + 1];
                             if (targetElement.nextSibling) {
@@ -1286,8 +1726,11 @@ class Writer(Adw.Application):
                             } else {
                                 editor.appendChild(activeTable);
                             }
+                            blocks[tableIndex + 1] = activeTable;
+                            blocks[tableIndex] = targetElement;
+                            cachedBlocksVersion = ++contentVersion;
                             dragStartY = currentY;
-                            window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                            notifyContentChanged();
                         }
                     }
                 }
@@ -1298,50 +1741,75 @@ class Writer(Adw.Application):
                     activeTable = tableElement;
                     dragStartX = e.clientX;
                     dragStartY = e.clientY;
-                    const style = window.getComputedStyle(tableElement);
-                    tableStartX = parseInt(style.width) || tableElement.offsetWidth;
-                    tableStartY = parseInt(style.height) || tableElement.offsetHeight;
+                    lastResizeWidth = -1;
+                    lastResizeHeight = -1;
+                    // One getBoundingClientRect call returns both dimensions in a
+                    // single layout flush, without the style-resolution path that
+                    // getComputedStyle plus offsetWidth/offsetHeight would take
+                    const rect = tableElement.getBoundingClientRect();
+                    tableStartX = rect.width;
+                    tableStartY = rect.height;
                 }
                 
+                let lastResizeWidth = -1;
+                let lastResizeHeight = -1;
+
                 function resizeTable(e) {
                     if (!isResizing || !activeTable) return;
-                    const deltaX = e.clientX - dragStartX;
-                    const deltaY = e.clientY - dragStartY;
-                    activeTable.style.width = (tableStartX + deltaX) + 'px';
-                    activeTable.style.height = (tableStartY + deltaY) + 'px';
+                    const width = Math.round(tableStartX + e.clientX - dragStartX);
+                    const height = Math.round(tableStartY + e.clientY - dragStartY);
+                    // Filter sub-pixel jitter and write both dimensions in one
+                    // style mutation so each tick invalidates layout at most once
+                    if (width === lastResizeWidth && height === lastResizeHeight) return;
+                    lastResizeWidth = width;
+                    lastResizeHeight = height;
+                    activeTable.style.cssText += ';width:' + width + 'px;height:' + height + 'px';
                 }
                 
+                const ALIGNMENT_CLASSES = ['left-align', 'right-align', 'center-align', 'no-wrap'];
+
                 function activateTable(tableElement) {
                     activeTable = tableElement;
                     tableElement.style.marginLeft = '';
                     tableElement.style.marginTop = '';
-                    
-                    const currentClasses = tableElement.className;
-                    const alignmentClasses = ['left-align', 'right-align', 'center-align', 'no-wrap'];
+
                     let currentAlignment = 'no-wrap';
-                    alignmentClasses.forEach(cls => {
-                        if (currentClasses.includes(cls)) {
+                    for (const cls of ALIGNMENT_CLASSES) {
+                        if (tableElement.classList.contains(cls)) {
                             currentAlignment = cls;
+                            break;
                         }
-                    });
-                    
-                    alignmentClasses.forEach(cls => tableElement.classList.remove(cls));
+                    }
+
+                    tableElement.classList.remove(...ALIGNMENT_CLASSES);
                     tableElement.classList.add(currentAlignment);
                     
-                    // Only add resize and move handles
-                    if (!tableElement.querySelector('.table-handle')) {
-                        const resizeHandle = document.createElement('div');
-                        resizeHandle.className = 'table-handle';
-                        tableElement.appendChild(resizeHandle);
+                    // Only add resize and move handles, remembering them on the
+                    // element so teardown needs no querySelector. The adoption
+                    // query covers tables recreated from serialized history
+                    // content, where the expando is gone but a handle survives
+                    if (!tableElement._resizeHandle) {
+                        let resizeHandle = tableElement.querySelector('.table-handle');
+                        if (!resizeHandle) {
+                            resizeHandle = document.createElement('div');
+                            resizeHandle.className = 'table-handle';
+                            tableElement.appendChild(resizeHandle);
+                        }
+                        tableElement._resizeHandle = resizeHandle;
                     }
-                    
-                    if (!tableElement.querySelector('.table-drag-handle')) {
-                        const dragHandle = document.createElement('div');
-                        dragHandle.className = 'table-drag-handle';
-                        dragHandle.innerHTML = '↕';
-                        dragHandle.title = 'Drag to reposition table between paragraphs';
-                        tableElement.appendChild(dragHandle);
+
+                    if (!tableElement._dragHandle) {
+                        let dragHandle = tableElement.querySelector('.table-drag-handle');
+                        if (!dragHandle) {
+                            dragHandle = document.createElement('div');
+                            dragHandle.className = 'table-drag-handle';
+                            dragHandle.innerHTML = '↕';
+                            dragHandle.title = 'Drag to reposition table between paragraphs';
+                            tableElement.appendChild(dragHandle);
+                        }
+                        tableElement._dragHandle = dragHandle;
                     }
+                    tablesWithHandles.add(tableElement);
                 }
                 
                 function addTableRow(tableElement, position) {
@@ -1353,15 +1821,25 @@ class Writer(Adw.Application):
                     
                     const rows = tableElement.rows;
                     if (rows.length > 0) {
+                        // Build the row detached, filling cells with cloned text
+                        // nodes (no HTML parser), then insert it in one operation
+                        const cellCount = rows[0].cells.length;
+                        const blank = document.createTextNode(' ');
+                        const newRow = document.createElement('tr');
+                        for (let i = 0; i < cellCount; i++) {
+                            const cell = document.createElement('td');
+                            cell.appendChild(blank.cloneNode(false));
+                            newRow.appendChild(cell);
+                        }
                         // If position is provided, use it, otherwise append at the end
                         const rowIndex = (position !== undefined) ? position : rows.length;
-                        const newRow = tableElement.insertRow(rowIndex);
-                        for (let i = 0; i < rows[0].cells.length; i++) {
-                            const cell = newRow.insertCell(i);
-                            cell.innerHTML = ' ';
+                        if (rowIndex < rows.length) {
+                            rows[rowIndex].parentNode.insertBefore(newRow, rows[rowIndex]);
+                        } else {
+                            (tableElement.tBodies[0] || tableElement).appendChild(newRow);
                         }
                     }
-                    window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                    notifyContentChanged();
                 }
                 
                 function addTableColumn(tableElement, position) {
@@ -1372,13 +1850,14 @@ class Writer(Adw.Application):
                     if (!tableElement) return;
                     
                     const rows = tableElement.rows;
+                    const blank = document.createTextNode(' ');
                     for (let i = 0; i < rows.length; i++) {
                         // If position is provided, use it, otherwise append at the end
                         const cellIndex = (position !== undefined) ? position : rows[i].cells.length;
                         const cell = rows[i].insertCell(cellIndex);
-                        cell.innerHTML = ' ';
+                        cell.appendChild(blank.cloneNode(false));
                     }
-                    window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                    notifyContentChanged();
                 }
 
                 
@@ -1397,7 +1876,7 @@ class Writer(Adw.Application):
                     
                     // Notify the app
                     window.webkit.messageHandlers.tableDeleted.postMessage('table-deleted');
-                    window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                    notifyContentChanged();
                 }
 
                 function deleteTableRow(tableElement, rowIndex) {
@@ -1415,7 +1894,7 @@ class Writer(Adw.Application):
                             tableElement.deleteRow(indexToDelete);
                         }
                     }
-                    window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                    notifyContentChanged();
                 }
                 
                 function deleteTableColumn(tableElement, colIndex) {
@@ -1429,47 +1908,59 @@ class Writer(Adw.Application):
                     if (rows.length > 0 && rows[0].cells.length > 1) {
                         // If colIndex is provided, delete that column, otherwise delete the last column
                         const indexToDelete = (colIndex !== undefined) ? colIndex : rows[0].cells.length - 1;
-                        
+
+                        // Take the table out of the render tree for the loop:
+                        // with border-collapse every deleteCell re-couples
+                        // borders across the table, so N deletions would
+                        // otherwise mean N layout invalidations
+                        const prevDisplay = tableElement.style.display;
+                        tableElement.style.display = 'none';
                         for (let i = 0; i < rows.length; i++) {
                             if (indexToDelete >= 0 && indexToDelete < rows[i].cells.length) {
                                 rows[i].deleteCell(indexToDelete);
                             }
                         }
+                        tableElement.style.display = prevDisplay;
                     }
-                    window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                    notifyContentChanged();
                 }
                 // Helper function to get the currently selected cell from the current selection
                 function getSelectedTableCell() {
-                    const selection = window.getSelection();
+                    const selection = domSelection;
                     if (selection.rangeCount < 1) return null;
-                    
+
                     let container = selection.getRangeAt(0).startContainer;
-                    
+
                     // If the container is a text node, get its parent
                     if (container.nodeType === 3) {
                         container = container.parentNode;
                     }
-                    
-                    // Find the TD or TH parent
-                    while (container && container.tagName !== 'TD' && container.tagName !== 'TH') {
-                        container = container.parentNode;
-                        // Stop if we reach the table or document body
-                        if (!container || container === activeTable || container === document.body) {
-                            return null;
-                        }
-                    }
-                    
-                    return container; // Returns the TD/TH element or null
+                    if (!container || !container.closest) return null;
+
+                    // The native closest() walk replaces the manual parentNode
+                    // loop and its ad-hoc body check
+                    const cell = container.closest('td, th');
+                    if (!cell) return null;
+                    if (activeTable && !activeTable.contains(cell)) return null;
+                    return cell;
                 }
                 
+                // Only tables activateTable touched can have handles; track
+                // them so teardown never scans the whole document
+                const tablesWithHandles = new Set();
+
                 function deactivateAllTables() {
-                    const tables = document.querySelectorAll('table');
-                    tables.forEach(table => {
-                        const resizeHandle = table.querySelector('.table-handle');
-                        if (resizeHandle) resizeHandle.remove();
-                        const dragHandle = table.querySelector('.table-drag-handle');
-                        if (dragHandle) dragHandle.remove();
+                    tablesWithHandles.forEach(table => {
+                        if (table._resizeHandle) {
+                            table._resizeHandle.remove();
+                            table._resizeHandle = null;
+                        }
+                        if (table._dragHandle) {
+                            table._dragHandle.remove();
+                            table._dragHandle = null;
+                        }
                     });
+                    tablesWithHandles.clear();
                     if (activeTable) {
                         activeTable = null;
                         window.webkit.messageHandlers.tablesDeactivated.postMessage('tables-deactivated');
@@ -1477,20 +1968,32 @@ class Writer(Adw.Application):
                 }
                 
                 function wrapUnwrappedText(element) {
-                    let childNodes = Array.from(element.childNodes);
-                    let textNodesToWrap = [];
-                    for (let i = 0; i < childNodes.length; i++) {
-                        let node = childNodes[i];
+                    // Check before touching anything: the common case is that
+                    // every stray text node is already wrapped
+                    let needsWrap = false;
+                    for (let node = element.firstChild; node; node = node.nextSibling) {
                         if (node.nodeType === Node.TEXT_NODE && node.textContent.trim()) {
-                            textNodesToWrap.push(node);
+                            needsWrap = true;
+                            break;
                         }
                     }
-                    for (let i = 0; i < textNodesToWrap.length; i++) {
-                        let textNode = textNodesToWrap[i];
-                        let wrapper = document.createElement('div');
-                        element.replaceChild(wrapper, textNode);
-                        wrapper.appendChild(textNode);
+                    if (!needsWrap) return;
+
+                    // Rebuild the child list in a detached fragment — wrapping
+                    // stray text nodes in divs as we go — and swap it in with a
+                    // single replaceChildren, so N wraps cost one DOM write
+                    const fragment = document.createDocumentFragment();
+                    let node;
+                    while ((node = element.firstChild) !== null) {
+                        if (node.nodeType === Node.TEXT_NODE && node.textContent.trim()) {
+                            const wrapper = document.createElement('div');
+                            wrapper.appendChild(node);
+                            fragment.appendChild(wrapper);
+                        } else {
+                            fragment.appendChild(node);
+                        }
                     }
+                    element.replaceChildren(fragment);
                 }
                 
                 function setFontFamily(family) {
@@ -1554,12 +2057,34 @@ class Writer(Adw.Application):
                 }
                 
                 function getContent() {
-                    return document.getElementById('editor').innerHTML;
+                    const editor = getEditor();
+                    if (searchResults.length === 0) {
+                        return editor.innerHTML;
+                    }
+                    // An active search has wrapped matches in highlight
+                    // spans; unwrap them in a detached clone so the saved
+                    // markup never carries search state
+                    const clone = editor.cloneNode(true);
+                    const highlights = clone.querySelectorAll('.search-highlight');
+                    for (let i = 0; i < highlights.length; i++) {
+                        highlights[i].replaceWith(
+                            document.createTextNode(highlights[i].textContent));
+                    }
+                    return clone.innerHTML;
                 }
                 
                 function setContent(html) {
+                    // An identical round trip (reloading what is already shown)
+                    // skips the reparse and keeps undo history and selection
+                    if (html === getEditor().innerHTML) return;
+
+                    // Replacing the document reuses the already-parsed editor
+                    // shell; only the per-document state is reset, so New/Open
+                    // never pay the load_html parse cost again
+                    resetDocumentState();
                     if (!html || html.trim() === '') {
-                        document.getElementById('editor').innerHTML = '<div><br></div>';
+                        getEditor().innerHTML = '<div><br></div>';
+                        notifyContentChanged(true);
                         return;
                     }
                     if (!html.trim().startsWith('<div') && 
@@ -1570,21 +2095,27 @@ class Writer(Adw.Application):
                         !html.trim().startsWith('<table')) {
                         html = '<div>' + html + '</div>';
                     }
-                    document.getElementById('editor').innerHTML = html;
-                    setTimeout(() => {
-                        wrapUnwrappedText(document.getElementById('editor'));
+                    getEditor().innerHTML = html;
+                    // The new document's counts are pushed rather than
+                    // polled: Python no longer watches load progress
+                    notifyContentChanged(true);
+                    // Fix up before the first paint of the new document; a
+                    // setTimeout(0) lands after it and can flash unwrapped text
+                    requestAnimationFrame(() => {
+                        wrapUnwrappedText(getEditor());
                         setupTableEventHandlers();
-                    }, 0);
+                    });
                 }
                 
                 function getWordCount() {
-                    let text = document.getElementById('editor').innerText;
-                    let charCount = text.length;
-                    let wordCount = 0;
-                    if (text.trim()) {
-                        wordCount = text.trim().split(/\s+/).filter(Boolean).length;
-                    }
-                    return JSON.stringify({ words: wordCount, chars: charCount });
+                    // contentVersion lets Python skip the label update when
+                    // nothing has changed since the previous poll. Returned
+                    // as a plain object: the JSC bridge hands Python the
+                    // fields directly, with no JSON encode/decode round trip
+                    let text = getEditor().textContent;
+                    return { tick: contentVersion,
+                             words: countWords(text),
+                             chars: text.length };
                 }
                 
                 function setZoom(level) {
@@ -1593,7 +2124,7 @@ class Writer(Adw.Application):
                 }
                 
                 function toggleRTL() {
-                    let editor = document.getElementById('editor');
+                    let editor = getEditor();
                     if (editor.classList.contains('rtl')) {
                         editor.classList.remove('rtl');
                         return false;
@@ -1604,24 +2135,41 @@ class Writer(Adw.Application):
                 }
                 
                 function insertTable(rows, cols) {
-                    let table = '<table border="1" cellspacing="0" cellpadding="5" class="no-wrap" style="border-collapse: collapse;">';
+                    // Build the table as DOM nodes and insert it through the
+                    // selection Range: no markup string, no HTML parse, and
+                    // no execCommand sanitizer pass. Holding the node also
+                    // means no marker attribute or deferred lookup to find
+                    // the table again for activation
+                    const table = document.createElement('table');
+                    table.border = '1';
+                    table.cellSpacing = '0';
+                    table.cellPadding = '5';
+                    table.className = 'no-wrap';
+                    table.style.borderCollapse = 'collapse';
                     for (let i = 0; i < rows; i++) {
-                        table += '<tr>';
+                        const tr = table.insertRow();
                         for (let j = 0; j < cols; j++) {
-                            table += '<td> </td>';
+                            tr.insertCell().appendChild(document.createTextNode(' '));
                         }
-                        table += '</tr>';
                     }
-                    table += '</table><p></p>';
-                    document.execCommand('insertHTML', false, table);
-                    setTimeout(() => {
-                        const tables = document.querySelectorAll('table');
-                        const newTable = tables[tables.length - 1];
-                        if (newTable) {
-                            activateTable(newTable);
-                            window.webkit.messageHandlers.tableClicked.postMessage('table-clicked');
-                        }
-                    }, 10);
+
+                    if (!domSelection.rangeCount) getEditor().focus();
+                    if (!domSelection.rangeCount) return;
+                    const range = domSelection.getRangeAt(0);
+                    range.deleteContents();
+                    range.insertNode(table);
+                    const para = document.createElement('p');
+                    table.after(para);
+                    domSelection.collapse(para, 0);
+
+                    // Range.insertNode fires no input event, so record the
+                    // change the same way the other programmatic edits do
+                    contentVersion++;
+                    queueMicrotask(createHistoryEntry);
+                    notifyContentChanged();
+
+                    activateTable(table);
+                    window.webkit.messageHandlers.tableClicked.postMessage('table-clicked');
                 }
                 
                 function insertImageFromUrl(url) {
@@ -1668,7 +2216,7 @@ class Writer(Adw.Application):
                         document.execCommand('paste', false, null);
                     }
                     setTimeout(() => {
-                        window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                        notifyContentChanged();
                     }, 100);
                 }
                 
@@ -1676,6 +2224,73 @@ class Writer(Adw.Application):
                     document.execCommand('selectAll', false, null);
                 }
                 
+                // Table-edit operations live here in the page, compiled
+                // once with it; toolbar clicks dispatch one-line calls
+                // instead of shipping these bodies on every click
+                function activeTableCell() {
+                    if (!activeTable) return null;
+                    if (domSelection.rangeCount < 1) return null;
+                    const node = domSelection.getRangeAt(0).startContainer;
+                    // closest() only exists on elements; hop up from text nodes
+                    const el = node.nodeType === 1 ? node : node.parentElement;
+                    const cell = el ? el.closest('td, th') : null;
+                    if (!cell || !activeTable.contains(cell)) return null;
+                    return cell;
+                }
+
+                function insertRowAt(offset) {
+                    if (!activeTable) return;
+                    const cell = activeTableCell();
+                    if (!cell) {
+                        // No cell selected: just add to the end
+                        addTableRow(activeTable);
+                        return;
+                    }
+
+                    const row = cell.closest('tr');
+                    if (!row) return;
+
+                    // Insert relative to this row, matching its cell count
+                    const newRow = activeTable.insertRow(row.rowIndex + offset);
+                    for (let i = 0; i < row.cells.length; i++) {
+                        newRow.insertCell(i).innerHTML = ' ';
+                    }
+                    notifyContentChanged();
+                }
+
+                function insertColumnAt(offset) {
+                    if (!activeTable) return;
+                    const cell = activeTableCell();
+                    if (!cell) {
+                        // No cell selected: just add to the end
+                        addTableColumn(activeTable);
+                        return;
+                    }
+
+                    const rows = activeTable.rows;
+                    for (let i = 0; i < rows.length; i++) {
+                        rows[i].insertCell(cell.cellIndex + offset).innerHTML = ' ';
+                    }
+                    notifyContentChanged();
+                }
+
+                function deleteActiveTable() {
+                    if (!activeTable) return;
+                    activeTable.parentNode.removeChild(activeTable);
+                    activeTable = null;
+
+                    // Hide the table toolbar
+                    window.webkit.messageHandlers.tableDeleted.postMessage('table-deleted');
+                    notifyContentChanged();
+                }
+
+                function setTableAlign(cls, width) {
+                    if (!activeTable) return;
+                    activeTable.className = cls;
+                    activeTable.style.width = width;
+                    notifyContentChanged();
+                }
+
                 // Search functions
                 function clearSearch() {
                     searchResults = [];
@@ -1683,90 +2298,181 @@ class Writer(Adw.Application):
                     currentSearchText = "";
                     
                     // Remove all highlighting
-                    let editor = document.getElementById('editor');
+                    let editor = getEditor();
                     let highlights = editor.querySelectorAll('.search-highlight');
                     
                     if (highlights.length) {
+                        // Normalize only the parents that held a highlight;
+                        // editor.normalize() would walk the whole document.
+                        let touchedParents = new Set();
                         for (let i = 0; i < highlights.length; i++) {
                             let highlight = highlights[i];
-                            let textNode = document.createTextNode(highlight.textContent);
-                            highlight.parentNode.replaceChild(textNode, highlight);
+                            let parent = highlight.parentNode;
+                            parent.replaceChild(document.createTextNode(highlight.textContent), highlight);
+                            touchedParents.add(parent);
                         }
-                        editor.normalize();
+                        touchedParents.forEach((parent) => parent.normalize());
+                        contentVersion++;
                         return true;
                     }
                     return false;
                 }
                 
-                function searchAndHighlight(searchText) {
+                function getSearchRegex(pattern, flags) {
+                    // Compile once per (pattern, flags) pair; the scan loop below
+                    // advances via lastIndex instead of rebuilding substrings.
+                    let key = flags + ':' + pattern;
+                    let regex = searchRegexCache.get(key);
+                    if (!regex) {
+                        let escaped = pattern.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+                        regex = new RegExp(escaped, flags);
+                        searchRegexCache.set(key, regex);
+                    }
+                    return regex;
+                }
+
+                // Highlight span cloned per hit; the color comes from the
+                // .search-highlight stylesheet rule, so each clone copies one
+                // attribute and never touches the CSSOM
+                const highlightTemplate = document.createElement('span');
+                highlightTemplate.className = 'search-highlight';
+
+                // The scan stays on the main thread by design: it is a
+                // native indexOf over the cached flat string, and handing
+                // that string to a Worker would structured-clone the same
+                // bytes the scan reads once. The DOM highlighting half
+                // could not leave this thread anyway. Keystroke back-
+                // pressure is handled host-side: Python debounces entry
+                // changes and parks newer queries while one is in flight
+                function searchAndHighlight(searchText, limit) {
                     // First clear any existing search
                     clearSearch();
-                    
+
                     if (!searchText) return 0;
+                    if (!limit) limit = Infinity;
                     currentSearchText = searchText;
-                    
-                    let editor = document.getElementById('editor');
+
                     searchResults = [];
                     searchIndex = -1;
-                    
-                    // Create a TreeWalker to traverse all text nodes in the editor
-                    let walker = document.createTreeWalker(
-                        editor,
-                        NodeFilter.SHOW_TEXT,
-                        null,
-                        false
-                    );
-                    
-                    let matches = [];
-                    let node;
-                    let count = 0;
-                    
-                    // Find all matching text nodes
-                    while ((node = walker.nextNode()) !== null) {
-                        let content = node.textContent;
-                        let index = content.indexOf(searchText);
-                        
-                        while (index !== -1) {
-                            matches.push({
-                                node: node,
-                                index: index
-                            });
-                            index = content.indexOf(searchText, index + 1);
-                            count++;
+
+                    // The scan runs on one flat string: the text nodes
+                    // joined on \x00 so a match can never span two nodes.
+                    // While typing, the text is unchanged and each query
+                    // extends the previous one, so only the previous match
+                    // positions are re-tested — O(matches) per keystroke
+                    // instead of a fresh walk over the whole document
+                    const nodes = getSelectionIndex().nodes;
+                    const texts = new Array(nodes.length);
+                    for (let i = 0; i < nodes.length; i++) {
+                        texts[i] = nodes[i].nodeValue;
+                    }
+                    const flat = texts.join('\x00');
+
+                    // The cache holds every candidate position, overlaps
+                    // included (indexOf advances by one): a longer query's
+                    // match can start inside an overlap the shorter query
+                    // skipped — "aab" in "aaab" begins at offset 1, which
+                    // a non-overlapping scan for "aa" never recorded
+                    let all;
+                    let truncated = false;
+                    if (flat === lastSearchFlat && lastSearchQuery &&
+                        !lastSearchTruncated &&
+                        searchText.startsWith(lastSearchQuery)) {
+                        all = [];
+                        for (const p of lastSearchPositions) {
+                            if (flat.startsWith(searchText, p)) {
+                                all.push(p);
+                            }
+                        }
+                    } else {
+                        // indexOf runs in native code. The cap keeps a 1-2
+                        // character query on a huge document from building
+                        // 100k highlight spans
+                        all = [];
+                        let idx = flat.indexOf(searchText);
+                        while (idx !== -1) {
+                            all.push(idx);
+                            if (all.length >= limit) {
+                                truncated = true;
+                                break;
+                            }
+                            idx = flat.indexOf(searchText, idx + 1);
                         }
                     }
-                    
-                    // Highlight matches from last to first to maintain indices
-                    for (let i = matches.length - 1; i >= 0; i--) {
-                        let match = matches[i];
-                        let node = match.node;
-                        let index = match.index;
-                        
-                        // Split text node at match boundaries
-                        let beforeNode = node.splitText(index);
-                        let matchNode = beforeNode.splitText(searchText.length);
-                        
-                        // Create highlight span
-                        let highlightSpan = document.createElement('span');
-                        highlightSpan.className = 'search-highlight';
-                        highlightSpan.style.backgroundColor = '#FFFF00';
-                        
-                        // Replace text node with highlight span
-                        let parent = beforeNode.parentNode;
-                        parent.replaceChild(highlightSpan, beforeNode);
-                        highlightSpan.appendChild(beforeNode);
-                        
-                        // Store reference to the span
-                        searchResults.push(highlightSpan);
+                    lastSearchFlat = flat;
+                    lastSearchQuery = searchText;
+                    lastSearchPositions = all;
+                    // A truncated position list misses later matches, so the
+                    // next narrowing pass may not start from it
+                    lastSearchTruncated = truncated;
+
+                    // Highlight the non-overlapping subset, matching what
+                    // replaceAll counts
+                    const positions = [];
+                    let lastEnd = -1;
+                    for (const p of all) {
+                        if (p >= lastEnd) {
+                            positions.push(p);
+                            lastEnd = p + searchText.length;
+                        }
                     }
-                    
+                    let count = positions.length;
+
+                    // Map the flat positions back onto their text nodes;
+                    // both lists are in document order, one forward walk
+                    const perNode = [];
+                    let ni = 0, nodeStart = 0, current = null;
+                    for (const p of positions) {
+                        while (p >= nodeStart + texts[ni].length + 1) {
+                            nodeStart += texts[ni].length + 1;
+                            ni++;
+                            current = null;
+                        }
+                        if (current === null) {
+                            current = [nodes[ni], []];
+                            perNode.push(current);
+                        }
+                        current[1].push(p - nodeStart);
+                    }
+
+                    // One fragment build and one replaceWith per matching text
+                    // node, instead of two splitText calls and a re-parent per
+                    // match; spans land in searchResults in document order
+                    for (const [textNode, indices] of perNode) {
+                        const content = textNode.nodeValue;
+                        const fragment = document.createDocumentFragment();
+                        let pos = 0;
+                        for (const idx of indices) {
+                            if (idx < pos) continue;  // overlapping match
+                            if (idx > pos) {
+                                fragment.appendChild(
+                                    document.createTextNode(content.slice(pos, idx)));
+                            }
+                            const span = highlightTemplate.cloneNode(false);
+                            span.appendChild(document.createTextNode(
+                                content.substr(idx, searchText.length)));
+                            fragment.appendChild(span);
+                            searchResults.push(span);
+                            pos = idx + searchText.length;
+                        }
+                        if (pos < content.length) {
+                            fragment.appendChild(document.createTextNode(content.slice(pos)));
+                        }
+                        textNode.replaceWith(fragment);
+                    }
+
+                    // Highlighting splits text nodes, so the selection index is stale
+                    if (perNode.length > 0) contentVersion++;
+
                     // Select first result if any found
                     if (searchResults.length > 0) {
                         searchIndex = 0;
                         selectSearchResult(0);
                     }
-                    
-                    return count;
+
+                    // Negative means "at least this many"; Python shows a
+                    // keep-typing hint instead of a final count
+                    return truncated ? -count : count;
                 }
                 
                 function selectSearchResult(index) {
@@ -1779,18 +2485,20 @@ class Writer(Adw.Application):
                     // Get the highlight span
                     let span = searchResults[index];
                     
-                    // Create a range for the selection
-                    let range = document.createRange();
-                    range.selectNodeContents(span);
-                    
-                    // Apply the selection
-                    let selection = window.getSelection();
-                    selection.removeAllRanges();
-                    selection.addRange(range);
-                    
-                    // Scroll to the selection
-                    span.scrollIntoView({ behavior: 'smooth', block: 'center' });
+                    // One setBaseAndExtent call selects the span's contents
+                    // with a single selection-change notification and no Range
+                    // allocation
+                    domSelection.setBaseAndExtent(span, 0, span, span.childNodes.length);
                     
+                    // Scroll only when the hit is outside the viewport; stepping
+                    // through nearby matches then skips the scroll (and its
+                    // layout flush) entirely. Instant scrolling keeps rapid
+                    // next/previous presses from queueing smooth animations
+                    const rect = span.getBoundingClientRect();
+                    if (rect.top < 0 || rect.bottom > window.innerHeight) {
+                        span.scrollIntoView({ behavior: 'auto', block: 'nearest' });
+                    }
+
                     return true;
                 }
                 
@@ -1819,7 +2527,7 @@ class Writer(Adw.Application):
                
                 // Paragraph and line spacing functions
                 function setParagraphSpacing(spacing) {
-                    let selection = window.getSelection();
+                    let selection = domSelection;
                     if (selection.rangeCount === 0) return false;
                     
                     let range = selection.getRangeAt(0);
@@ -1833,7 +2541,7 @@ class Writer(Adw.Application):
                     // Apply spacing to the paragraph
                     if (container && container.tagName) {
                         container.style.marginBottom = spacing + 'px';
-                        window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                        notifyContentChanged();
                         return true;
                     }
                     
@@ -1841,7 +2549,7 @@ class Writer(Adw.Application):
                 }
                 
                 function setLineSpacing(spacing) {
-                    let selection = window.getSelection();
+                    let selection = domSelection;
                     if (selection.rangeCount === 0) return false;
                     
                     let range = selection.getRangeAt(0);
@@ -1855,55 +2563,410 @@ class Writer(Adw.Application):
                     // Apply line spacing to the paragraph
                     if (container && container.tagName) {
                         container.style.lineHeight = spacing;
-                        window.webkit.messageHandlers.contentChanged.postMessage('changed');
+                        notifyContentChanged();
                         return true;
                     }
                     
                     return false;
                 }
+
+                // Shortest-possible invocation names for hot toolbar
+                // calls; less source per evaluate means less parsing
+                window.W = { p: setParagraphSpacing, l: setLineSpacing,
+                             rtl: toggleRTL };
             </script>
         </head>
         <body>
             <div id="editor" contenteditable="true"></div>
         </body>
         </html>
+"""
+
+# Encode the page once at import time; load_bytes hands WebKit the same
+# GBytes on every editor start instead of re-encoding the string per load
+_EDITOR_HTML_BYTES = GLib.Bytes.new(_EDITOR_HTML.encode("utf-8"))
+
+class Writer(Adw.Application):
+    # Zoom is quantized to 0.1 steps inside these bounds
+    ZOOM_MIN = 0.2
+    ZOOM_MAX = 5.0
+
+    def __init__(self):
+        super().__init__(application_id="io.github.fastrizwaan.Writer",
+                         flags=Gio.ApplicationFlags.FLAGS_NONE)
+        self.connect('activate', self.on_activate)
+        self.current_file = None
+        self._current_basename = None
+        self.modified = False
+        self.recent_files = []
+        self.max_recent_files = 5
+        # One long-lived parameterized action serves every recent-file
+        # entry; each menu item carries its path as the action target
+        open_recent = Gio.SimpleAction.new("open-recent", GLib.VariantType.new("s"))
+        open_recent.connect("activate", lambda a, p: self.open_recent_file(p.get_string()))
+        self.add_action(open_recent)
+        self.create_action("clear_recent", self.on_clear_recent_clicked)
+        self.zoom_level = 1.0
+        self._pending_zoom = 1.0
+        self._zoom_timeout_id = None
+        self._rgba_hex_cache = {}
+        self._last_colors = {}
+        self._pending_font = None
+        self._font_idle_id = None
+        self._find_timeout_id = None
+        self._search_in_flight = False
+        self._search_pending_text = None
+        self._datetime_dialog = None
+        self._datetime_format_widgets = []
+        self._insert_table_dialog = None
+        self._insert_table_row_spinner = None
+        self._insert_table_col_spinner = None
+        self._dt_format_values = {}
+        self._dt_selected = None
+        self._dt_group_anchor = None
+        self._pending_colors = {}
+        self._color_timeout_id = None
+        self._pending_js = []
+        self._js_flush_id = None
+        self._wc_tick = None
+        self._wc_timeout_id = None
+        self._error_dialog = None
+        self._error_label = None
+        self._open_filters = None
+        self._save_filters = None
+        self._current_alignment = 'Left'
+        self._save_dialog = None
+        self._save_dialog_callback = None
+
+    def on_activate(self, app):
+        # Create the main window
+        self.win = Adw.ApplicationWindow(application=app)
+        self.win.set_default_size(900, 700)
+        self.win.set_title("Writer")
+        
+        # Create main layout; keep it detached while the children are
+        # appended so GTK does a single layout pass when it is rooted below
+        self.main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+
+        # Create header bar
+        self.create_header_bar()
+        
+        # Create toolbar
+        self.create_toolbar()
+        
+        # Create editor area
+        self.create_editor()
+        
+        # Create status bar (but don't add it yet - we'll add it after all other elements)
+        self.create_status_bar()
+        
+        # Set up keyboard shortcuts
+        self.setup_keyboard_shortcuts()
+        
+        # Initialize extra features
+        self.initialize_extras()
+        
+        # Now add the status bar last to ensure it's at the bottom
+        self.main_box.append(self.status_bar)
+
+        # Attach the fully built layout in one go
+        self.win.set_content(self.main_box)
+
+        # Load recent file list
+        self.load_recent_files()
+        
+        # Show all
+        self.win.present()
+        
+    def create_header_bar(self):
+        """Create the header bar with file operations"""
+        self.header = Adw.HeaderBar()
+        self.main_box.append(self.header)
+        
+        # File menu
+        file_menu = Gio.Menu.new()
+        file_menu.append("New", "app.new")
+        file_menu.append("Open", "app.open")
+        file_menu.append("Save", "app.save")
+        file_menu.append("Save As", "app.save_as")
+        
+        # Add separator
+        file_menu.append("───────────", None)
+        
+        # Recent files submenu
+        self.recent_menu = Gio.Menu.new()
+        recent_section = Gio.Menu.new()
+        recent_section.append_submenu("Recent Files", self.recent_menu)
+        file_menu.append_section(None, recent_section)
+        
+        # Add Print and Exit options
+        file_menu.append("───────────", None)
+        file_menu.append("Print", "app.print")
+        file_menu.append("Exit", "app.exit")
+        
+        # Create the menu button
+        self.menu_button = Gtk.MenuButton()
+        self.menu_button.set_icon_name("open-menu-symbolic")
+        self.menu_button.set_menu_model(file_menu)
+        self.header.pack_end(self.menu_button)
+        
+        # Actions are registered in one table-driven pass by
+        # setup_keyboard_shortcuts
+
+        # Document title label
+        self.title_label = Gtk.Label(label="Untitled")
+        self.header.set_title_widget(self.title_label)
+        
+        # Create Edit menu
+        self.edit_menu = Gio.Menu.new()
+        self.edit_menu.append("Undo", "app.undo")
+        self.edit_menu.append("Redo", "app.redo")
+        self.edit_menu.append("───────────", None)
+        self.edit_menu.append("Cut", "app.cut")
+        self.edit_menu.append("Copy", "app.copy")
+        self.edit_menu.append("Paste", "app.paste")
+        self.edit_menu.append("───────────", None)
+        self.edit_menu.append("Find", "app.find")
+        self.edit_menu.append("Select All", "app.select_all")
+        
+        # Add Edit menu button to header bar
+        edit_button = Gtk.MenuButton()
+        edit_button.set_label("Edit")
+        edit_button.set_menu_model(self.edit_menu)
+        self.header.pack_start(edit_button)
+        
+        # Create Insert menu
+        self.insert_menu = Gio.Menu.new()
+        self.insert_menu.append("Table...", "app.insert_table")
+        self.insert_menu.append("Image...", "app.insert_image")
+        self.insert_menu.append("Date/Time", "app.insert_datetime")
+        
+        # Add Insert menu button to header bar
+        insert_button = Gtk.MenuButton()
+        insert_button.set_label("Insert")
+        insert_button.set_menu_model(self.insert_menu)
+        self.header.pack_start(insert_button)
+        
+        # Create View menu
+        view_menu = Gio.Menu.new()
+        view_menu.append("Zoom In", "app.zoom_in")
+        view_menu.append("Zoom Out", "app.zoom_out")
+        view_menu.append("Reset Zoom", "app.zoom_reset")
+        view_menu.append("───────────", None)
+        view_menu.append("Toggle RTL Mode", "app.toggle_rtl")
+        
+        # Add View menu button
+        view_button = Gtk.MenuButton()
+        view_button.set_label("View")
+        view_button.set_menu_model(view_menu)
+        self.header.pack_start(view_button)
+        
+        # Create Format menu
+        format_menu = Gio.Menu.new()
+        format_menu.append("Paragraph Spacing...", "app.paragraph_spacing")
+        format_menu.append("Line Spacing...", "app.line_spacing")
+        
+        # Add Format menu button
+        format_button = Gtk.MenuButton()
+        format_button.set_label("Format")
+        format_button.set_menu_model(format_menu)
+        self.header.pack_start(format_button)
+        
+    def create_toolbar(self):
+        """Create the formatting toolbar from the GtkBuilder definition"""
+        # One stylesheet rule draws the group dividers, replacing eight
+        # GtkSeparator widgets (and their render nodes) in the toolbar
+        css = Gtk.CssProvider()
+        css.load_from_string(
+            ".toolbar-group-end { border-right: 1px solid @borders;"
+            " margin-right: 4px; padding-right: 4px; }")
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(), css,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
+
+        # The formatting toggles dispatch through one stateful action group
+        # instead of six Python signal closures; set_state() can then sync
+        # the buttons from selection changes without re-entering the handler
+        self.format_group = Gio.SimpleActionGroup()
+        for name in ("bold", "italic", "underline", "strikethrough",
+                     "superscript", "subscript"):
+            action = Gio.SimpleAction.new_stateful(
+                name, None, GLib.Variant.new_boolean(False))
+            action.connect("change-state", self.on_format_state_change)
+            self.format_group.add_action(action)
+        self.win.insert_action_group("fmt", self.format_group)
+
+        builder = Gtk.Builder(self)
+        builder.add_from_string(_TOOLBAR_UI)
+
+        toolbar = builder.get_object("toolbar")
+        self.main_box.append(toolbar)
+
+        # Keep references to the widgets whose state is driven from Python
+        for widget_id in ("font_button", "bold_button", "italic_button",
+                          "underline_button", "strikethrough_button",
+                          "superscript_button", "subscript_button",
+                          "align_left_button", "align_center_button",
+                          "align_right_button", "align_justify_button",
+                          "text_color_button", "bg_color_button",
+                          "bullet_list_button", "numbered_list_button",
+                          "indent_button", "outdent_button", "rtl_button",
+                          "insert_table_button", "insert_image_button",
+                          "insert_datetime_button", "zoom_button",
+                          "zoom_popover", "zoom_label", "zoom_slider"):
+            setattr(self, widget_id, builder.get_object(widget_id))
+
+        # One shared dialog per picker kind: the buttons only hold a
+        # reference, so nothing heavy is rebuilt on each pick
+        self._font_dialog = Gtk.FontDialog.new()
+        self._color_dialog = Gtk.ColorDialog.new()
+        self.font_button.set_dialog(self._font_dialog)
+        self.text_color_button.set_dialog(self._color_dialog)
+        self.bg_color_button.set_dialog(self._color_dialog)
+
+        # Connect the toggle groups by hand so the numeric handler IDs
+        # are available for blocking programmatic updates; handler_block(id)
+        # is O(1) while the _by_func variants scan the handler list on
+        # every selection change
+        for widget_id, handler in (
+                ("align_left", self.on_align_left_toggled),
+                ("align_center", self.on_align_center_toggled),
+                ("align_right", self.on_align_right_toggled),
+                ("align_justify", self.on_align_justify_toggled),
+                ("bullet_list", self.on_bullet_list_toggled),
+                ("numbered_list", self.on_numbered_list_toggled)):
+            button = getattr(self, widget_id + "_button")
+            setattr(self, "_" + widget_id + "_hid",
+                    button.connect("toggled", handler))
+
+        # Drives the mutual exclusion in _apply_alignment
+        self._align_buttons = (
+            (self.align_left_button, self._align_left_hid),
+            (self.align_center_button, self._align_center_hid),
+            (self.align_right_button, self._align_right_hid),
+            (self.align_justify_button, self._align_justify_hid))
+
+        # Connect the slider by hand so the handler ID is available for
+        # blocking programmatic updates later
+        self.zoom_slider_handler_id = self.zoom_slider.connect(
+            "value-changed", self.on_zoom_slider_changed)
+
+
+    @contextmanager
+    def _blocked(self, obj, handler_id):
+        """Block a signal handler for the duration of a programmatic update
+
+        Guarantees the unblock runs even if the update raises, so a
+        failed set_value cannot leave the handler permanently blocked.
         """
+        obj.handler_block(handler_id)
+        try:
+            yield
+        finally:
+            obj.handler_unblock(handler_id)
+
+    def _apply_zoom(self, level, from_slider=False):
+        """Clamp the zoom level, apply it in the editor and sync the UI"""
+        # Quantize to the 0.1 zoom step, then skip the whole JS/label/status
+        # update when the effective level is unchanged (reset at 100%,
+        # repeats at the clamp caps, slider rounding no-ops)
+        level = max(self.ZOOM_MIN, min(self.ZOOM_MAX, round(level * 10) / 10))
+        if abs(level - self.zoom_level) < 1e-6:
+            return
+        self.zoom_level = level
+        # Call the pre-compiled setZoom with the level as an argument instead
+        # of rebuilding and re-parsing a new script string per invocation
+        args = GLib.Variant('a{sv}',
+                            {'z': GLib.Variant.new_double(self.zoom_level)})
+        self.webview.call_async_javascript_function(
+            "setZoom(z);", -1, args, None, None, None, None)
+
+        # Update zoom label in popover and the status bar
+        percent = int(self.zoom_level * 100)
+        self.zoom_label.set_text(f"{percent}%")
+        self.status_label.set_text(f"Zoom: {percent}%")
+
+        if not from_slider:
+            # Update slider without triggering its callback
+            with self._blocked(self.zoom_slider, self.zoom_slider_handler_id):
+                self.zoom_slider.set_value(self.zoom_level)
+
+    def on_zoom_slider_changed(self, slider):
+        """Handle zoom slider value change, coalescing rapid drag events"""
+        self._pending_zoom = slider.get_value()
+        if self._zoom_timeout_id is None:
+            self._zoom_timeout_id = GLib.timeout_add(30, self._flush_pending_zoom)
+
+    def _flush_pending_zoom(self):
+        """Apply the most recent coalesced slider zoom value"""
+        self._zoom_timeout_id = None
+        self._apply_zoom(self._pending_zoom, from_slider=True)
+        return GLib.SOURCE_REMOVE
+
+    # 3. Update the zoom reset button handler
+    def on_zoom_reset_button_clicked(self, button):
+        """Handle zoom reset button click"""
+        self._apply_zoom(1.0)
+
+        # Close the popover
+        self.zoom_popover.popdown()
+
+
+    # 4. Update the zoom keyboard shortcuts to work with the new zoom control
+    def on_zoom_in(self, action, param):
+        """Handle Zoom In command (keyboard shortcut)"""
+        self._apply_zoom(self.zoom_level + 0.1)
+
+    def on_zoom_out(self, action, param):
+        """Handle Zoom Out command (keyboard shortcut)"""
+        self._apply_zoom(self.zoom_level - 0.1)
+
+    def on_zoom_reset(self, action, param):
+        """Handle Reset Zoom command (keyboard shortcut)"""
+        self._apply_zoom(1.0)
+
+    def create_editor(self):
+        """Create the editor area; the WebView itself is initialized lazily"""
+        # Scrolled window for the editor
+        self.editor_scrolled = Gtk.ScrolledWindow()
+        self.editor_scrolled.set_vexpand(True)
+        self.main_box.append(self.editor_scrolled)
+
+        # Lightweight placeholder so the window can paint right away -
+        # spawning the WebKit process is the heaviest single startup step
+        placeholder = Gtk.Label(label="Loading editor…")
+        self.editor_scrolled.set_child(placeholder)
+
+        # Defer the heavy WebKit initialization until after the first paint
+        GLib.idle_add(self._finalize_editor)
+
+    def _finalize_editor(self):
+        """Create the WebKit WebView and swap it in for the placeholder"""
+        # WebKit WebView for rich text editing
+        self.webview = WebKit.WebView()
+
+        # Enable developer tools for debugging
+        settings = self.webview.get_settings()
+        if hasattr(settings, 'set_enable_developer_extras'):
+            settings.set_enable_developer_extras(True)
+
+        # Set up the WebView for rich text editing
+        self.webview.load_bytes(_EDITOR_HTML_BYTES, "text/html", "UTF-8", None)
+
+        # Connect selection change signals
+        self.webview.connect("load-changed", self.on_load_changed)
 
+        self.editor_scrolled.set_child(self.webview)
+        return GLib.SOURCE_REMOVE
     # 2. Update the on_insert_table_dialog_response method to use our enhanced table functionality
 
     def on_insert_table_dialog_response(self, dialog, rows, cols):
         """Handle table dialog response"""
         js_code = f"insertTable({rows}, {cols});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
         self.show_table_toolbar()  # Show toolbar after insertion
         dialog.force_close()
 
-    def format_zoom_value(self, scale, value):
-        """Format the zoom value as a percentage"""
-        return f"{int(value * 100)}%"
-
-    def on_zoom_in_button_clicked(self, button):
-        """Handle zoom in button click"""
-        self.zoom_level = min(3.0, self.zoom_level + 0.1)
-        js_code = f"setZoom({self.zoom_level});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        
-        # Update slider without triggering its callback
-        self.zoom_slider.handler_block(self.zoom_slider_handler_id)
-        self.zoom_slider.set_value(self.zoom_level)
-        self.zoom_slider.handler_unblock(self.zoom_slider_handler_id)
-
-    def on_zoom_out_button_clicked(self, button):
-        """Handle zoom out button click"""
-        self.zoom_level = max(0.5, self.zoom_level - 0.1)
-        js_code = f"setZoom({self.zoom_level});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        
-        # Update slider without triggering its callback
-        self.zoom_slider.handler_block(self.zoom_slider_handler_id)
-        self.zoom_slider.set_value(self.zoom_level)
-        self.zoom_slider.handler_unblock(self.zoom_slider_handler_id)
-
 
 
 
@@ -1940,36 +3003,51 @@ class Writer(Adw.Application):
         
         # Note: We don't append the status bar to main_box here - it will be added last in on_activate
 
+    # (action name, handler method name, accelerators)
+    _ACTIONS = (
+        ("new", "on_new_clicked", ("<Control>n",)),
+        ("open", "on_open_clicked", ("<Control>o",)),
+        ("save", "on_save_clicked", ("<Control>s",)),
+        ("save_as", "on_save_as_clicked", ("<Control><Shift>s",)),
+        ("print", "on_print_clicked", ("<Control>p",)),
+        ("bold", "on_format_shortcut", ("<Control>b",)),
+        ("italic", "on_format_shortcut", ("<Control>i",)),
+        ("underline", "on_format_shortcut", ("<Control>u",)),
+        ("strikethrough", "on_format_shortcut", ("<Control>k",)),
+        ("find", "on_find_clicked", ("<Control>f",)),
+        ("undo", "on_undo_clicked", ("<Control>z",)),
+        ("redo", "on_redo_clicked", ("<Control><Shift>z",)),
+        ("zoom_in", "on_zoom_in", ("<Control>plus", "<Control>equal")),
+        ("zoom_out", "on_zoom_out", ("<Control>minus",)),
+        ("zoom_reset", "on_zoom_reset", ("<Control>0",)),
+        ("toggle_rtl", "on_toggle_rtl", ("<Control><Shift>r",)),
+        ("insert_datetime", "on_insert_datetime_clicked", None),
+        ("paragraph_spacing", "on_paragraph_spacing_clicked", None),
+        ("line_spacing", "on_line_spacing_clicked", None),
+        ("exit", "on_exit_clicked", ("<Control>q",)),
+    )
+
+    # Detailed accelerator names precomputed at class-definition time so no
+    # string formatting is left on the startup path
+    _ACTION_ACCELS = tuple(
+        ("app.%s" % name, shortcuts)
+        for name, _handler, shortcuts in _ACTIONS if shortcuts
+    )
+
     def setup_keyboard_shortcuts(self):
-        """Set up keyboard shortcuts"""
-        # Add keyboard shortcuts via actions
-        self.create_action("new", self.on_new_clicked, ["<Control>n"])
-        self.create_action("open", self.on_open_clicked, ["<Control>o"])
-        self.create_action("save", self.on_save_clicked, ["<Control>s"])
-        self.create_action("save_as", self.on_save_as_clicked, ["<Control><Shift>s"])
-        self.create_action("print", self.on_print_clicked, ["<Control>p"])
-        #self.create_action("print preview", none, ["none"])
-        self.create_action("bold", self.on_bold_shortcut, ["<Control>b"])
-        self.create_action("italic", self.on_italic_shortcut, ["<Control>i"])
-        self.create_action("underline", self.on_underline_shortcut, ["<Control>u"])
-        self.create_action("strikethrough", self.on_strikethrough_shortcut, ["<Control>k"])
-        self.create_action("find", self.on_find_clicked, ["<Control>f"])
-        self.create_action("undo", self.on_undo_clicked, ["<Control>z"])
-        self.create_action("redo", self.on_redo_clicked, ["<Control><Shift>z"])
-        
-        # New shortcuts for additional features
-        #self.create_action("select_all", self.on_select_all_clicked, ["<Control>a"])
-        #self.create_action("cut", self.on_cut_clicked, ["<Control>x"])
-        #self.create_action("copy", self.on_copy_clicked, ["<Control>c"])
-        #self.create_action("paste", self.on_paste_clicked, ["<Control>v"])
-        self.create_action("zoom_in", self.on_zoom_in, ["<Control>plus", "<Control>equal"])
-        self.create_action("zoom_out", self.on_zoom_out, ["<Control>minus"])
-        self.create_action("zoom_reset", self.on_zoom_reset, ["<Control>0"])
-        self.create_action("toggle_rtl", self.on_toggle_rtl, ["<Control><Shift>r"])
-        self.create_action("insert_datetime", self.on_insert_datetime_clicked)
-        self.create_action("paragraph_spacing", self.on_paragraph_spacing_clicked)
-        self.create_action("line_spacing", self.on_line_spacing_clicked)
-        self.create_action("exit", self.on_exit_clicked, ["<Control>q"])
+        """Register application actions and their shortcuts in one pass"""
+        # Table-driven registration with local aliases replaces 20
+        # back-to-back create_action calls (some of which registered the
+        # same file actions twice)
+        new_action = Gio.SimpleAction.new
+        add_action = self.add_action
+        set_accels = self.set_accels_for_action
+        for name, handler, _shortcuts in self._ACTIONS:
+            action = new_action(name, None)
+            action.connect("activate", getattr(self, handler))
+            add_action(action)
+        for detailed_name, shortcuts in self._ACTION_ACCELS:
+            set_accels(detailed_name, shortcuts)
 
     def create_action(self, name, callback, shortcuts=None):
         """Create a GAction with optional shortcuts"""
@@ -2006,96 +3084,116 @@ class Writer(Adw.Application):
 
     def on_content_changed(self, manager, message):
         """Handle content changes from the editor"""
-        self.modified = True
-        self.update_window_title()
-        self.update_word_count()
+        # The message carries "words:chars", with a ":seed" suffix when a
+        # programmatic load pushed the counts, so the counters can be
+        # updated without a follow-up JS round trip
+        try:
+            words, chars, *seeded = message.get_js_value().to_string().split(':')
+            self.word_count_label.set_text(f"Words: {words}")
+            self.char_count_label.set_text(f"Characters: {chars}")
+        except (AttributeError, ValueError):
+            seeded = ()
+            self.update_word_count()
+
+        # Per-keystroke hot path: the title only changes on the first edit
+        # after a save/open, so skip the rebuild on every later keystroke.
+        # Seeded pushes (open, New, startup) must not dirty the document
+        if not seeded and not self.modified:
+            self.modified = True
+            self.update_window_title()
         
     def on_selection_changed(self, manager, message):
         """Handle selection changes from the editor"""
         try:
-            # Get selection state as JSON
-            js_text = message.get_js_value().to_string()
-            state = json.loads(js_text)
-            
-            # Update toolbar buttons without triggering their callbacks
-            self.bold_button.handler_block_by_func(self.on_bold_toggled)
-            self.italic_button.handler_block_by_func(self.on_italic_toggled)
-            self.underline_button.handler_block_by_func(self.on_underline_toggled)
-            self.strikethrough_button.handler_block_by_func(self.on_strikethrough_toggled)
-            self.superscript_button.handler_block_by_func(self.on_superscript_toggled)
-            self.subscript_button.handler_block_by_func(self.on_subscript_toggled)
-            
-            self.bold_button.set_active(state.get('bold', False))
-            self.italic_button.set_active(state.get('italic', False))
-            self.underline_button.set_active(state.get('underline', False))
-            self.strikethrough_button.set_active(state.get('strikethrough', False))
-            self.superscript_button.set_active(state.get('superscript', False))
-            self.subscript_button.set_active(state.get('subscript', False))
-            
-            self.bold_button.handler_unblock_by_func(self.on_bold_toggled)
-            self.italic_button.handler_unblock_by_func(self.on_italic_toggled)
-            self.underline_button.handler_unblock_by_func(self.on_underline_toggled)
-            self.strikethrough_button.handler_unblock_by_func(self.on_strikethrough_toggled)
-            self.superscript_button.handler_unblock_by_func(self.on_superscript_toggled)
-            self.subscript_button.handler_unblock_by_func(self.on_subscript_toggled)
-            
-            # Update alignment buttons
-            alignment = state.get('alignment', 'left')
-            self.align_left_button.handler_block_by_func(self.on_align_left_toggled)
-            self.align_center_button.handler_block_by_func(self.on_align_center_toggled)
-            self.align_right_button.handler_block_by_func(self.on_align_right_toggled)
-            self.align_justify_button.handler_block_by_func(self.on_align_justify_toggled)
+            # The editor packs the state into one integer: bits 0-5 are the
+            # inline toggles, bits 6-7 the alignment index
+            state = int(message.get_js_value().to_string())
+
+            # Sync the format toggles through the action group; set_state
+            # updates the buttons without re-running the change-state handler
+            lookup = self.format_group.lookup_action
+            for bit, name in ((1, "bold"), (2, "italic"), (4, "underline"),
+                              (8, "strikethrough"), (16, "superscript"),
+                              (32, "subscript")):
+                lookup(name).set_state(
+                    GLib.Variant.new_boolean(bool(state & bit)))
+
+            # Update alignment buttons; the cache keeps _apply_alignment
+            # from re-sending the alignment the caret already has
+            align_idx = (state >> 6) & 3
+            self._current_alignment = ('Left', 'Center',
+                                       'Right', 'Full')[align_idx]
+            self.align_left_button.handler_block(self._align_left_hid)
+            self.align_center_button.handler_block(self._align_center_hid)
+            self.align_right_button.handler_block(self._align_right_hid)
+            self.align_justify_button.handler_block(self._align_justify_hid)
             
-            self.align_left_button.set_active(alignment == 'left')
-            self.align_center_button.set_active(alignment == 'center')
-            self.align_right_button.set_active(alignment == 'right')
-            self.align_justify_button.set_active(alignment == 'justify')
+            self.align_left_button.set_active(align_idx == 0)
+            self.align_center_button.set_active(align_idx == 1)
+            self.align_right_button.set_active(align_idx == 2)
+            self.align_justify_button.set_active(align_idx == 3)
             
-            self.align_left_button.handler_unblock_by_func(self.on_align_left_toggled)
-            self.align_center_button.handler_unblock_by_func(self.on_align_center_toggled)
-            self.align_right_button.handler_unblock_by_func(self.on_align_right_toggled)
-            self.align_justify_button.handler_unblock_by_func(self.on_align_justify_toggled)
+            self.align_left_button.handler_unblock(self._align_left_hid)
+            self.align_center_button.handler_unblock(self._align_center_hid)
+            self.align_right_button.handler_unblock(self._align_right_hid)
+            self.align_justify_button.handler_unblock(self._align_justify_hid)
             
-        except Exception as e:
-            print(f"Error handling selection change: {e}")
-
-    def on_progress_change(self, webview, param):
-        """Handle WebView load progress changes"""
-        progress = webview.get_estimated_load_progress()
-        if progress == 1.0:
-            self.update_word_count()
+        except Exception:
+            log.exception("Error handling selection change")
 
     def update_word_count(self):
-        """Update word and character counts using fixed approach"""
+        """Update word and character counts, coalescing rapid requests"""
+        if self._wc_timeout_id is None:
+            self._wc_timeout_id = GLib.timeout_add(150, self._poll_word_count)
+
+    def _poll_word_count(self):
+        """Ask the editor for the current counts"""
+        self._wc_timeout_id = None
         js_code = "getWordCount();"
+        self._flush_js()
         self.webview.evaluate_javascript(js_code, -1, None, None, None, self.handle_word_count_result)
+        return GLib.SOURCE_REMOVE
 
     def handle_word_count_result(self, webview, result, user_data=None):
-        """Handle word count JavaScript result with fixed approach"""
+        """Handle word count JavaScript result"""
         try:
             js_result = webview.evaluate_javascript_finish(result)
-            if js_result and not js_result.is_null():
-                # The JavaScript now returns a pre-formatted JSON string
-                json_str = js_result.to_string()
-                # Remove any surrounding quotes if present
-                if json_str.startswith('"') and json_str.endswith('"'):
-                    json_str = json_str[1:-1].replace('\\"', '"')
-                
-                counts = json.loads(json_str)
-                
-                self.word_count_label.set_text(f"Words: {counts['words']}")
-                self.char_count_label.set_text(f"Characters: {counts['chars']}")
-        except Exception as e:
-            print(f"Error getting word count: {e}")
+            if js_result and js_result.is_object():
+                # Read the fields straight off the JSCValue; stringifying
+                # in JS and json.loads-ing here would serialize the same
+                # three integers twice
+                tick = js_result.object_get_property('tick').to_int32()
+
+                # Unchanged document since the last poll: labels are
+                # already correct
+                if tick == self._wc_tick:
+                    return
+                self._wc_tick = tick
+
+                words = js_result.object_get_property('words').to_int32()
+                chars = js_result.object_get_property('chars').to_int32()
+                self.word_count_label.set_text(f"Words: {words}")
+                self.char_count_label.set_text(f"Characters: {chars}")
+        except Exception:
+            log.exception("Error getting word count")
             # Fallback values if counting fails
             self.word_count_label.set_text("Words: --")
             self.char_count_label.set_text("Characters: --")
 
+    def _set_current_file(self, path):
+        """Track the active file along with its display name
+
+        The basename feeds the window title and the save status text on
+        every state transition; splitting the path once here avoids
+        re-scanning the string each time.
+        """
+        self.current_file = path
+        self._current_basename = os.path.basename(path) if path else None
+
     def update_window_title(self):
         """Update window title to show document name and modified status"""
         if self.current_file:
-            filename = os.path.basename(self.current_file)
-            title = f"{filename}{' *' if self.modified else ''}"
+            title = f"{self._current_basename}{' *' if self.modified else ''}"
             self.title_label.set_text(title)
         else:
             self.title_label.set_text(f"Untitled{' *' if self.modified else ''}")
@@ -2107,11 +3205,20 @@ class Writer(Adw.Application):
         else:
             self.do_new_file()
 
+    def _set_content(self, content):
+        """Queue a setContent call with the payload safely quoted
+
+        json.dumps produces a valid JS string literal in one C-level
+        pass; hand-escaping a template literal missed backslashes and
+        ${...} interpolations, either of which could break out of the
+        script for documents that contain them.
+        """
+        self._queue_js("setContent(" + json.dumps(content) + ");")
+
     def do_new_file(self):
         """Create a new document"""
-        js_code = "setContent('');"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        self.current_file = None
+        self._set_content('')
+        self._set_current_file(None)
         self.modified = False
         self.update_window_title()
         self.status_label.set_text("New document created")
@@ -2123,31 +3230,56 @@ class Writer(Adw.Application):
         else:
             self.do_open_file()
 
+    def _get_open_filters(self):
+        """Filter list shared by every open dialog, built on first use"""
+        if self._open_filters is None:
+            filter_html = Gtk.FileFilter()
+            filter_html.set_name("HTML files")
+            filter_html.add_pattern("*.html")
+            filter_html.add_pattern("*.htm")
+
+            filter_txt = Gtk.FileFilter()
+            filter_txt.set_name("Text files")
+            filter_txt.add_pattern("*.txt")
+
+            filter_all = Gtk.FileFilter()
+            filter_all.set_name("All files")
+            filter_all.add_pattern("*")
+
+            self._open_filters = Gio.ListStore.new(Gtk.FileFilter)
+            self._open_filters.append(filter_html)
+            self._open_filters.append(filter_txt)
+            self._open_filters.append(filter_all)
+        return self._open_filters
+
+    def _get_save_filters(self):
+        """Filter list shared by every save dialog, built on first use"""
+        if self._save_filters is None:
+            filter_html = Gtk.FileFilter()
+            filter_html.set_name("HTML files")
+            filter_html.add_pattern("*.html")
+
+            filter_txt = Gtk.FileFilter()
+            filter_txt.set_name("Text files")
+            filter_txt.add_pattern("*.txt")
+
+            self._save_filters = Gio.ListStore.new(Gtk.FileFilter)
+            self._save_filters.append(filter_html)
+            self._save_filters.append(filter_txt)
+        return self._save_filters
+
+    def _present_save_as(self, on_response):
+        """Show the Save As dialog with the shared filter list"""
+        dialog = Gtk.FileDialog()
+        dialog.set_title("Save Document")
+        dialog.set_filters(self._get_save_filters())
+        dialog.save(self.win, None, on_response)
+
     def do_open_file(self):
         """Show open file dialog"""
         dialog = Gtk.FileDialog()
         dialog.set_title("Open Document")
-        
-        filter_html = Gtk.FileFilter()
-        filter_html.set_name("HTML files")
-        filter_html.add_pattern("*.html")
-        filter_html.add_pattern("*.htm")
-        
-        filter_txt = Gtk.FileFilter()
-        filter_txt.set_name("Text files")
-        filter_txt.add_pattern("*.txt")
-        
-        filter_all = Gtk.FileFilter()
-        filter_all.set_name("All files")
-        filter_all.add_pattern("*")
-        
-        # Create filters and set
-        filter_list = Gio.ListStore.new(Gtk.FileFilter)
-        filter_list.append(filter_html)
-        filter_list.append(filter_txt)
-        filter_list.append(filter_all)
-        
-        dialog.set_filters(filter_list)
+        dialog.set_filters(self._get_open_filters())
         dialog.open(self.win, None, self.on_open_response)
 
     def on_open_response(self, dialog, result):
@@ -2161,37 +3293,62 @@ class Writer(Adw.Application):
             if e.domain != 'gtk-dialog-error-quark' or e.code != 2:
                 self.show_error_dialog(f"Error opening file: {e}")
 
+    def _extract_body(self, content):
+        """Return the <body> markup of a full HTML document
+
+        Accepts the raw bytes so the lxml path can parse the file
+        without an intermediate decoded copy of the whole document.
+        """
+        if _lxml_html is not None:
+            # libxml2 tokenizes in C and tolerates broken markup, where
+            # the regex alternative backtracks in Python bytecode and
+            # copies the whole body substring through a match object
+            try:
+                body = _lxml_html.fromstring(content).find('.//body')
+            except Exception:
+                body = None
+            if body is not None:
+                parts = [body.text or '']
+                parts.extend(_lxml_html.tostring(child, encoding='unicode')
+                             for child in body)
+                return ''.join(parts).strip()
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        body_match = _BODY_RE.search(content)
+        if body_match:
+            return body_match.group(1).strip()
+        return content
+
     def load_file(self, filepath):
         """Load file content into editor"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
+            # Keep as few full copies of the document alive as possible:
+            # HTML detection runs on the raw bytes (no lowercased copy),
+            # the lxml path parses the bytes directly, and each copy is
+            # dropped as soon as the next stage has consumed it
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+
             # Determine if the content is HTML
-            is_html = content.strip().startswith("<") and (
-                "<html" in content.lower() or 
-                "<body" in content.lower() or 
-                "<div" in content.lower()
-            )
-            
+            is_html = raw[:64].lstrip()[:1] == b"<" and \
+                _HTML_HINT_RE.search(raw) is not None
+
             if is_html:
                 # Extract body content if it's a full HTML document
-                body_match = re.search(r'<body[^>]*>(.*?)</body>', content, re.DOTALL | re.IGNORECASE)
-                if body_match:
-                    content = body_match.group(1).strip()
+                content = self._extract_body(raw)
             else:
                 # Convert plain text to HTML
-                content = content.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-                content = content.replace("\n", "<br>")
-            
+                content = raw.decode('utf-8').translate(_HTML_ESCAPE)
+            del raw
+
             # Set the content in the editor
-            js_code = f"setContent(`{content.replace('`', '\\`')}`);"
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+            self._set_content(content)
+            del content
             
-            self.current_file = filepath
+            self._set_current_file(filepath)
             self.modified = False
             self.update_window_title()
-            self.status_label.set_text(f"Opened {os.path.basename(filepath)}")
+            self.status_label.set_text(f"Opened {self._current_basename}")
             
             # Add to recent files
             self.add_to_recent_files(filepath)
@@ -2208,68 +3365,89 @@ class Writer(Adw.Application):
 
     def on_save_as_clicked(self, action, param):
         """Handle Save As command"""
-        dialog = Gtk.FileDialog()
-        dialog.set_title("Save Document")
-        
-        filter_html = Gtk.FileFilter()
-        filter_html.set_name("HTML files")
-        filter_html.add_pattern("*.html")
-        
-        filter_txt = Gtk.FileFilter()
-        filter_txt.set_name("Text files")
-        filter_txt.add_pattern("*.txt")
-        
-        # Create filters and set
-        filter_list = Gio.ListStore.new(Gtk.FileFilter)
-        filter_list.append(filter_html)
-        filter_list.append(filter_txt)
-        
-        dialog.set_filters(filter_list)
-        dialog.save(self.win, None, self.on_save_response)
+        self._present_save_as(self.on_save_response)
 
-    def on_save_response(self, dialog, result):
-        """Handle save file dialog response with better error handling"""
+    def _finish_save_dialog(self, dialog, result):
+        """Resolve a save dialog to a target path, defaulting to .html
+
+        Returns None when the dialog was cancelled.
+        """
         try:
             file = dialog.save_finish(result)
-            if file:
-                filepath = file.get_path()
-                
-                # Add extension if missing
-                if not os.path.splitext(filepath)[1]:
-                    filepath += ".html"
-                
-                self.save_file(filepath)
         except GLib.Error as e:
             if e.domain != 'gtk-dialog-error-quark' or e.code != 2:
                 self.show_error_dialog(f"Error saving file: {e}")
+            return None
+        if not file:
+            return None
+        filepath = file.get_path()
+        # Add extension if missing
+        if not os.path.splitext(filepath)[1]:
+            filepath += ".html"
+        return filepath
+
+    def on_save_response(self, dialog, result):
+        """Handle save file dialog response with better error handling"""
+        filepath = self._finish_save_dialog(dialog, result)
+        if filepath:
+            self.save_file(filepath)
 
     def save_file(self, filepath):
         """Save editor content to file"""
+        # A clean document re-saved to its own path would serialize the
+        # whole editor over the WebKit pipe and rewrite identical bytes;
+        # the modified flag already tracks edits, so skip the round trip
+        if not self.modified and filepath == self.current_file:
+            self.status_label.set_text(
+                f"Saved to {self._current_basename}")
+            return
         js_code = "getContent();"
+        self._flush_js()
         self.webview.evaluate_javascript(js_code, -1, None, None, None, 
                                          lambda webview, result: self.on_get_content_for_save(
                                              webview, result, filepath))
 
+    def _html_to_text(self, content):
+        """Flatten editor HTML to plain text for the .txt export"""
+        if _lxml_html is not None:
+            # text_content walks the parsed tree once in C and resolves
+            # every entity, where the fallback strips tags with a regex
+            # and then unescapes in a second pass
+            try:
+                plain_text = _lxml_html.fromstring(content).text_content()
+            except Exception:
+                plain_text = None
+            if plain_text is not None:
+                return plain_text.replace('\xa0', ' ')
+        plain_text = _STRIP_TAGS_RE.sub('', content)
+        return html.unescape(plain_text).replace('\xa0', ' ')
+
     def on_get_content_for_save(self, webview, result, filepath):
         """Handle content retrieval for saving"""
         try:
             js_result = webview.evaluate_javascript_finish(result)
             if js_result and not js_result.is_null():
                 content = js_result.to_string()
-                
-                # Check file extension to determine save format
-                ext = os.path.splitext(filepath)[1].lower()
-                
-                if ext == '.txt':
-                    # Convert HTML to plain text (simple approach)
-                    plain_text = re.sub(r'<[^>]+>', '', content)
-                    plain_text = plain_text.replace('&lt;', '<').replace('&gt;', '>')
-                    plain_text = plain_text.replace('&amp;', '&').replace('&nbsp;', ' ')
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(plain_text)
-                else:
-                    # Save as HTML
-                    html_template = f"""<!DOCTYPE html>
+                # Conversion and the disk write run on a worker thread so
+                # a large export cannot stall the main loop; completion
+                # hops back via idle_add before touching any widget
+                threading.Thread(target=self._write_document,
+                                 args=(content, filepath),
+                                 daemon=True).start()
+        except Exception as e:
+            self.show_error_dialog(f"Error saving file: {e}")
+
+    def _write_document(self, content, filepath):
+        """Convert and write a document on a worker thread"""
+        try:
+            # Check file extension to determine save format
+            ext = os.path.splitext(filepath)[1].lower()
+
+            if ext == '.txt':
+                payload = self._html_to_text(content).encode('utf-8')
+            else:
+                # Save as HTML
+                payload = f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -2279,21 +3457,28 @@ class Writer(Adw.Application):
 {content}
 </body>
 </html>
-"""
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(html_template)
-                
-                self.current_file = filepath
-                self.modified = False
-                self.update_window_title()
-                self.status_label.set_text(f"Saved to {os.path.basename(filepath)}")
-                
-                # Add to recent files
-                self.add_to_recent_files(filepath)
-                
+""".encode('utf-8')
+
+            # One encode, one write: binary mode skips the text layer's
+            # newline translation and chunked encoding
+            with open(filepath, 'wb') as f:
+                f.write(payload)
         except Exception as e:
-            self.show_error_dialog(f"Error saving file: {e}")
-    
+            GLib.idle_add(self.show_error_dialog, f"Error saving file: {e}")
+            return
+        GLib.idle_add(self._on_save_complete, filepath)
+
+    def _on_save_complete(self, filepath):
+        """Update the UI after a background save finished"""
+        self._set_current_file(filepath)
+        self.modified = False
+        self.update_window_title()
+        self.status_label.set_text(f"Saved to {self._current_basename}")
+
+        # Add to recent files
+        self.add_to_recent_files(filepath)
+        return GLib.SOURCE_REMOVE
+
     def on_print_clicked(self, action, param):
         """Handle Print command"""
         print_op = WebKit.PrintOperation.new(self.webview)
@@ -2308,7 +3493,14 @@ class Writer(Adw.Application):
 
     def show_save_dialog_before_action(self, callback):
         """Show save confirmation dialog before proceeding with action"""
-        
+        # The widget tree is built once and reused; between invocations
+        # only the pending callback changes, which the button handlers
+        # read at click time
+        self._save_dialog_callback = callback
+        if self._save_dialog is not None:
+            self._save_dialog.present(self.win)
+            return
+
         # Create a dialog using the newer API
         dialog = Adw.Dialog.new()
         dialog.set_title("Save changes?")
@@ -2346,19 +3538,26 @@ class Writer(Adw.Application):
         # Discard button
         discard_button = Gtk.Button(label="Discard")
         discard_button.add_css_class("destructive-action")
-        discard_button.connect("clicked", lambda btn: self.on_save_dialog_discard(dialog, callback))
+        discard_button.connect(
+            "clicked",
+            lambda btn: self.on_save_dialog_discard(
+                dialog, self._save_dialog_callback))
         button_box.append(discard_button)
         
         # Save button
         save_button = Gtk.Button(label="Save")
         save_button.add_css_class("suggested-action")
-        save_button.connect("clicked", lambda btn: self.on_save_dialog_save(dialog, callback))
+        save_button.connect(
+            "clicked",
+            lambda btn: self.on_save_dialog_save(
+                dialog, self._save_dialog_callback))
         button_box.append(save_button)
         
         content_box.append(button_box)
         
         # Set the content and present
         dialog.set_child(content_box)  # Changed from set_content to set_child
+        self._save_dialog = dialog
         dialog.present(self.win)
         
 
@@ -2373,26 +3572,9 @@ class Writer(Adw.Application):
             # Need to show Save As dialog
             dialog.close()
             
-            save_dialog = Gtk.FileDialog()
-            save_dialog.set_title("Save Document")
-            
-            filter_html = Gtk.FileFilter()
-            filter_html.set_name("HTML files")
-            filter_html.add_pattern("*.html")
-            
-            filter_txt = Gtk.FileFilter()
-            filter_txt.set_name("Text files")
-            filter_txt.add_pattern("*.txt")
-            
-            # Create filters and set
-            filter_list = Gio.ListStore.new(Gtk.FileFilter)
-            filter_list.append(filter_html)
-            filter_list.append(filter_txt)
-            
-            save_dialog.set_filters(filter_list)
-            save_dialog.save(self.win, None, 
-                            lambda dialog, result: self.on_save_before_action_response(
-                                dialog, result, callback))
+            self._present_save_as(
+                lambda dialog, result: self.on_save_before_action_response(
+                    dialog, result, callback))
 
     def on_save_dialog_discard(self, dialog, callback):
         """Handle discard button click in save dialog"""
@@ -2401,26 +3583,21 @@ class Writer(Adw.Application):
         callback()       
          
     def on_save_before_action_response(self, dialog, result, callback):
-        """Handle save file dialog response before executing another action with better error handling"""
-        try:
-            file = dialog.save_finish(result)
-            if file:
-                filepath = file.get_path()
-                
-                # Add extension if missing
-                if not os.path.splitext(filepath)[1]:
-                    filepath += ".html"
-                
-                self.save_file(filepath)
-                self.modified = False
-                callback()
-        except GLib.Error as e:
-            if e.domain != 'gtk-dialog-error-quark' or e.code != 2:
-                self.show_error_dialog(f"Error saving file: {e}")
+        """Handle save file dialog response before executing another action"""
+        filepath = self._finish_save_dialog(dialog, result)
+        if filepath:
+            self.save_file(filepath)
+            self.modified = False
+            callback()
 
     def show_error_dialog(self, message):
         """Show error message dialog using modern API"""
-        
+        # Reuse the dialog across errors; only the message label changes
+        if self._error_dialog is not None:
+            self._error_label.set_label(message)
+            self._error_dialog.present(self.win)
+            return
+
         # Create a dialog using the newer API
         dialog = Adw.Dialog.new()
         dialog.set_title("Error")
@@ -2459,13 +3636,25 @@ class Writer(Adw.Application):
         
         # Set the content and present
         dialog.set_child(content_box)  # Changed from set_content to set_child
+        self._error_dialog = dialog
+        self._error_label = message_label
         dialog.present(self.win)
         
     # Formatting command handlers
 
     def on_font_changed(self, button, param):
-        """Handle font change with improved style application"""
+        """Coalesce font changes; only the newest pending pick is applied"""
         font_desc = button.get_font_desc()
+        if font_desc:
+            self._pending_font = font_desc
+            if self._font_idle_id is None:
+                self._font_idle_id = GLib.idle_add(self._flush_pending_font)
+
+    def _flush_pending_font(self):
+        """Apply the most recent pending font pick"""
+        self._font_idle_id = None
+        font_desc = self._pending_font
+        self._pending_font = None
         if font_desc:
             # Extract font properties
             family = font_desc.get_family()
@@ -2473,267 +3662,203 @@ class Writer(Adw.Application):
             weight = font_desc.get_weight()
             style = font_desc.get_style()
             
-            # Set font family
-            js_code = f"setFontFamily('{family}');"
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-            
-            # Set font size (convert Pango size to HTML size)
+            # One script covers family, size and the two conditional
+            # toggles; json.dumps quotes the family name safely
             html_size = min(7, max(1, int(size / 3)))
-            js_code = f"setFontSize({html_size});"
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-            
-            # Apply bold if font weight is sufficiently bold
             is_bold = weight >= Pango.Weight.BOLD
+            is_italic = style == Pango.Style.ITALIC or style == Pango.Style.OBLIQUE
             js_code = """
             (function() {
-                // Get current selection state
-                let isBold = document.queryCommandState('bold');
-                
-                // Only toggle if different from current state
-                if (isBold !== %s) {
+                setFontFamily(%s);
+                setFontSize(%d);
+                // Only toggle when different from the current state
+                if (document.queryCommandState('bold') !== %s) {
                     document.execCommand('bold', false, null);
                 }
-                return true;
-            })();
-            """ % ('true' if is_bold else 'false')
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-            
-            # Update the bold button state without triggering the callback
-            self.bold_button.handler_block_by_func(self.on_bold_toggled)
-            self.bold_button.set_active(is_bold)
-            self.bold_button.handler_unblock_by_func(self.on_bold_toggled)
-            
-            # Similar handling for italic
-            is_italic = style == Pango.Style.ITALIC or style == Pango.Style.OBLIQUE
-            js_code = """
-            (function() {
-                // Get current selection state
-                let isItalic = document.queryCommandState('italic');
-                
-                // Only toggle if different from current state
-                if (isItalic !== %s) {
+                if (document.queryCommandState('italic') !== %s) {
                     document.execCommand('italic', false, null);
                 }
-                return true;
             })();
-            """ % ('true' if is_italic else 'false')
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-            
-            # Update the italic button state
-            self.italic_button.handler_block_by_func(self.on_italic_toggled)
-            self.italic_button.set_active(is_italic)
-            self.italic_button.handler_unblock_by_func(self.on_italic_toggled)
-
-    def on_bold_toggled(self, button):
-        """Handle bold button toggle"""
-        js_code = "setBold();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-
-    def on_italic_toggled(self, button):
-        """Handle italic button toggle"""
-        js_code = "setItalic();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-
-    def on_underline_toggled(self, button):
-        """Handle underline button toggle"""
-        js_code = "setUnderline();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        
-    def on_strikethrough_toggled(self, button):
-        """Handle strikethrough button toggle"""
-        js_code = "setStrikethrough();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        
-    def on_superscript_toggled(self, button):
-        """Handle superscript button toggle"""
-        js_code = "setSuperscript();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        # Ensure subscript is turned off
-        if button.get_active():
-            self.subscript_button.handler_block_by_func(self.on_subscript_toggled)
-            self.subscript_button.set_active(False)
-            self.subscript_button.handler_unblock_by_func(self.on_subscript_toggled)
-        
-    def on_subscript_toggled(self, button):
-        """Handle subscript button toggle"""
-        js_code = "setSubscript();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-        # Ensure superscript is turned off
-        if button.get_active():
-            self.superscript_button.handler_block_by_func(self.on_superscript_toggled)
-            self.superscript_button.set_active(False)
-            self.superscript_button.handler_unblock_by_func(self.on_superscript_toggled)
+            """ % (json.dumps(family), html_size,
+                   'true' if is_bold else 'false',
+                   'true' if is_italic else 'false')
+            self._queue_js(js_code)
+
+            # Update the toggle states without re-running their handlers
+            self.format_group.lookup_action("bold").set_state(
+                GLib.Variant.new_boolean(is_bold))
+            self.format_group.lookup_action("italic").set_state(
+                GLib.Variant.new_boolean(is_italic))
+        return GLib.SOURCE_REMOVE
+
+    def on_format_state_change(self, action, value):
+        """Apply a formatting toggle routed through the fmt action group"""
+        action.set_state(value)
+        name = action.get_name()
+        js_code = f"set{name.capitalize()}();"
+        self._queue_js(js_code)
+
+        # Superscript and subscript are mutually exclusive; set_state on the
+        # counterpart updates its button without re-running this handler
+        if value.get_boolean():
+            if name == "superscript":
+                self.format_group.lookup_action("subscript").set_state(
+                    GLib.Variant.new_boolean(False))
+            elif name == "subscript":
+                self.format_group.lookup_action("superscript").set_state(
+                    GLib.Variant.new_boolean(False))
 
     def on_align_left_toggled(self, button):
         """Handle align left button toggle"""
         if button.get_active():
-            js_code = "setAlignment('Left');"
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-            
-            # Uncheck other alignment buttons
-            self.align_center_button.handler_block_by_func(self.on_align_center_toggled)
-            self.align_right_button.handler_block_by_func(self.on_align_right_toggled)
-            self.align_justify_button.handler_block_by_func(self.on_align_justify_toggled)
-            
-            self.align_center_button.set_active(False)
-            self.align_right_button.set_active(False)
-            self.align_justify_button.set_active(False)
-            
-            self.align_center_button.handler_unblock_by_func(self.on_align_center_toggled)
-            self.align_right_button.handler_unblock_by_func(self.on_align_right_toggled)
-            self.align_justify_button.handler_unblock_by_func(self.on_align_justify_toggled)
-            
+            self._apply_alignment('Left', button)
+
     def on_align_center_toggled(self, button):
         """Handle align center button toggle"""
         if button.get_active():
-            js_code = "setAlignment('Center');"
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-            
-            # Uncheck other alignment buttons
-            self.align_left_button.handler_block_by_func(self.on_align_left_toggled)
-            self.align_right_button.handler_block_by_func(self.on_align_right_toggled)
-            self.align_justify_button.handler_block_by_func(self.on_align_justify_toggled)
-            
-            self.align_left_button.set_active(False)
-            self.align_right_button.set_active(False)
-            self.align_justify_button.set_active(False)
-            
-            self.align_left_button.handler_unblock_by_func(self.on_align_left_toggled)
-            self.align_right_button.handler_unblock_by_func(self.on_align_right_toggled)
-            self.align_justify_button.handler_unblock_by_func(self.on_align_justify_toggled)
+            self._apply_alignment('Center', button)
 
     def on_align_right_toggled(self, button):
         """Handle align right button toggle"""
         if button.get_active():
-            js_code = "setAlignment('Right');"
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-            
-            # Uncheck other alignment buttons
-            self.align_left_button.handler_block_by_func(self.on_align_left_toggled)
-            self.align_center_button.handler_block_by_func(self.on_align_center_toggled)
-            self.align_justify_button.handler_block_by_func(self.on_align_justify_toggled)
-            
-            self.align_left_button.set_active(False)
-            self.align_center_button.set_active(False)
-            self.align_justify_button.set_active(False)
-            
-            self.align_left_button.handler_unblock_by_func(self.on_align_left_toggled)
-            self.align_center_button.handler_unblock_by_func(self.on_align_center_toggled)
-            self.align_justify_button.handler_unblock_by_func(self.on_align_justify_toggled)
+            self._apply_alignment('Right', button)
 
     def on_align_justify_toggled(self, button):
         """Handle align justify button toggle"""
         if button.get_active():
-            js_code = "setAlignment('Full');"
+            self._apply_alignment('Full', button)
+
+    def _apply_alignment(self, command, active_button):
+        """Queue the alignment command and untoggle the sibling buttons"""
+        # Re-activating the current alignment (e.g. the selection probe
+        # syncing the buttons) has nothing to do in the editor
+        if command == self._current_alignment:
+            return
+        self._current_alignment = command
+        self._queue_js(f"setAlignment('{command}');")
+        for button, hid in self._align_buttons:
+            if button is not active_button:
+                with self._blocked(button, hid):
+                    button.set_active(False)
+
+    def _queue_js(self, js_code):
+        """Queue fire-and-forget JS; one IPC round trip per main-loop iteration
+
+        Each evaluate_javascript call crosses into the WebKit process on
+        its own. Handlers that fire several statements back to back (list
+        toggles, table edits) now collect them here and an idle callback
+        sends the batch joined into a single script.
+
+        This is also the no-result path: the flush passes a None callback,
+        so no JSCValue is marshalled back into Python for scripts nobody
+        reads. Call evaluate_javascript directly (after _flush_js) only
+        when the result is actually consumed.
+        """
+        self._pending_js.append(js_code)
+        if self._js_flush_id is None:
+            self._js_flush_id = GLib.idle_add(self._flush_js)
+
+    def _flush_js(self):
+        """Send any queued JS statements as one script"""
+        self._js_flush_id = None
+        if self._pending_js:
+            # Function scope keeps the batch from leaking bindings into
+            # the page's global scope across flushes
+            js_code = "(function() {\n" + "\n".join(self._pending_js) + "\n})();"
+            self._pending_js = []
             self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-            
-            # Uncheck other alignment buttons
-            self.align_left_button.handler_block_by_func(self.on_align_left_toggled)
-            self.align_center_button.handler_block_by_func(self.on_align_center_toggled)
-            self.align_right_button.handler_block_by_func(self.on_align_right_toggled)
-            
-            self.align_left_button.set_active(False)
-            self.align_center_button.set_active(False)
-            self.align_right_button.set_active(False)
-            
-            self.align_left_button.handler_unblock_by_func(self.on_align_left_toggled)
-            self.align_center_button.handler_unblock_by_func(self.on_align_center_toggled)
-            self.align_right_button.handler_unblock_by_func(self.on_align_right_toggled)
-            
-    def on_text_color_changed(self, button):
+        return GLib.SOURCE_REMOVE
+
+    def _rgba_to_hex(self, rgba):
+        """Convert a Gdk.RGBA to a CSS hex string, caching repeated picks"""
+        key = (int(rgba.red * 255), int(rgba.green * 255), int(rgba.blue * 255))
+        hex_color = self._rgba_hex_cache.get(key)
+        if hex_color is None:
+            if len(self._rgba_hex_cache) >= 32:
+                self._rgba_hex_cache.clear()
+            # bytes.hex() formats all three channels in one C call
+            hex_color = "#" + bytes(key).hex()
+            self._rgba_hex_cache[key] = hex_color
+        return hex_color
+
+    def _queue_color_js(self, js_func, rgba):
+        """Coalesce color picks so dragging through a picker fires one JS call"""
+        hex_color = self._rgba_to_hex(rgba)
+        # notify::rgba also fires on programmatic sets; re-sending the
+        # color that was last applied would be a wasted WebKit call
+        if self._last_colors.get(js_func) == hex_color:
+            return
+        # Keyed by function so a text pick and a background pick inside
+        # the same window both survive; per function, the newest wins
+        self._pending_colors[js_func] = hex_color
+        if self._color_timeout_id is None:
+            self._color_timeout_id = GLib.timeout_add(30, self._flush_pending_color)
+
+    def _flush_pending_color(self):
+        """Apply the most recent pending pick of each color function"""
+        self._color_timeout_id = None
+        pending = self._pending_colors
+        self._pending_colors = {}
+        for js_func, hex_color in pending.items():
+            self._last_colors[js_func] = hex_color
+            self._queue_js(f"{js_func}('{hex_color}');")
+        return GLib.SOURCE_REMOVE
+
+    def on_text_color_changed(self, button, pspec=None):
         """Handle text color change"""
-        # Use the RGBA property directly
-        rgba = button.get_rgba()  # Still works but is deprecated
-        
-        # Alternative approach that's future-proof:
-        # color = button.get_color()
-        # rgba = Gdk.RGBA()
-        # rgba.red = color.red / 65535.0
-        # rgba.green = color.green / 65535.0
-        # rgba.blue = color.blue / 65535.0
-        # rgba.alpha = 1.0
-        
-        hex_color = f"#{int(rgba.red * 255):02x}{int(rgba.green * 255):02x}{int(rgba.blue * 255):02x}"
-        js_code = f"setTextColor('{hex_color}');"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-
-    # Apply the same fix to the on_bg_color_changed method
-    def on_bg_color_changed(self, button):
+        self._queue_color_js("setTextColor", button.get_rgba())
+
+    def on_bg_color_changed(self, button, pspec=None):
         """Handle background color change"""
-        rgba = button.get_rgba()  # Still works but is deprecated
-        
-        # Alternative approach that's future-proof:
-        # color = button.get_color()
-        # rgba = Gdk.RGBA()
-        # rgba.red = color.red / 65535.0
-        # rgba.green = color.green / 65535.0
-        # rgba.blue = color.blue / 65535.0
-        # rgba.alpha = 1.0
-        
-        hex_color = f"#{int(rgba.red * 255):02x}{int(rgba.green * 255):02x}{int(rgba.blue * 255):02x}"
-        js_code = f"setBackgroundColor('{hex_color}');"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_color_js("setBackgroundColor", button.get_rgba())
         
     def on_bullet_list_toggled(self, button):
         """Handle bullet list button toggle"""
         js_code = "insertBulletList();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
         
         # Uncheck numbered list button
         if button.get_active():
-            self.numbered_list_button.handler_block_by_func(self.on_numbered_list_toggled)
-            self.numbered_list_button.set_active(False)
-            self.numbered_list_button.handler_unblock_by_func(self.on_numbered_list_toggled)
+            with self._blocked(self.numbered_list_button,
+                               self._numbered_list_hid):
+                self.numbered_list_button.set_active(False)
 
     def on_numbered_list_toggled(self, button):
         """Handle numbered list button toggle"""
         js_code = "insertNumberedList();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
         
         # Uncheck bullet list button
         if button.get_active():
-            self.bullet_list_button.handler_block_by_func(self.on_bullet_list_toggled)
-            self.bullet_list_button.set_active(False)
-            self.bullet_list_button.handler_unblock_by_func(self.on_bullet_list_toggled)
+            with self._blocked(self.bullet_list_button,
+                               self._bullet_list_hid):
+                self.bullet_list_button.set_active(False)
 
     def on_indent_clicked(self, button):
         """Handle indent button click"""
         js_code = "increaseIndent();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
 
     def on_outdent_clicked(self, button):
         """Handle outdent button click"""
         js_code = "decreaseIndent();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
 
     # Keyboard shortcut handlers
     
-    def on_bold_shortcut(self, action, param):
-        """Handle Ctrl+B shortcut"""
-        self.bold_button.set_active(not self.bold_button.get_active())
-        
-    def on_italic_shortcut(self, action, param):
-        """Handle Ctrl+I shortcut"""
-        self.italic_button.set_active(not self.italic_button.get_active())
-        
-    def on_underline_shortcut(self, action, param):
-        """Handle Ctrl+U shortcut"""
-        self.underline_button.set_active(not self.underline_button.get_active())
-        
-    def on_strikethrough_shortcut(self, action, param):
-        """Handle Ctrl+K shortcut"""
-        self.strikethrough_button.set_active(not self.strikethrough_button.get_active())
+    def on_format_shortcut(self, action, param):
+        """Route a formatting shortcut to its fmt action
+
+        The app-level action names (bold/italic/underline/strikethrough)
+        match the fmt group's, so one handler serves all four rows of
+        _ACTIONS instead of four copies differing only in the name.
+        """
+        self.format_group.lookup_action(action.get_name()).activate(None)
         
     def on_undo_clicked(self, action, param):
-        """Handle Undo command using custom implementation with debug output"""
-        js_code = """
-        (function() {
-            console.log("Python-triggered undo", editorHistory.length, historyIndex);
-            debugHistory();
-            return customUndo();
-        })();
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, 
+        """Handle Undo command using custom implementation"""
+        self._flush_js()
+        self.webview.evaluate_javascript(_JS_UNDO, -1, None, None, None, 
                                         lambda webview, result: self.handle_undo_result(webview, result))
         
     def handle_undo_result(self, webview, result):
@@ -2746,20 +3871,14 @@ class Writer(Adw.Application):
                     self.status_label.set_text("Undo completed")
                 else:
                     self.status_label.set_text("Nothing to undo")
-        except Exception as e:
-            print(f"Error handling undo result: {e}")
+        except Exception:
+            log.exception("Error handling undo result")
             self.status_label.set_text("Undo error")
 
     def on_redo_clicked(self, action, param):
-        """Handle Redo command using custom implementation with debug output"""
-        js_code = """
-        (function() {
-            console.log("Python-triggered redo", editorHistory.length, historyIndex);
-            debugHistory();
-            return customRedo();
-        })();
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None,
+        """Handle Redo command using custom implementation"""
+        self._flush_js()
+        self.webview.evaluate_javascript(_JS_REDO, -1, None, None, None,
                                         lambda webview, result: self.handle_redo_result(webview, result))
 
     def handle_redo_result(self, webview, result):
@@ -2772,14 +3891,15 @@ class Writer(Adw.Application):
                     self.status_label.set_text("Redo completed")
                 else:
                     self.status_label.set_text("Nothing to redo")
-        except Exception as e:
-            print(f"Error handling redo result: {e}")
+        except Exception:
+            log.exception("Error handling redo result")
             self.status_label.set_text("Redo error")
         
     # RTL support
     def on_rtl_toggled(self, button):
         """Handle RTL button toggle"""
-        js_code = "toggleRTL();"
+        js_code = "W.rtl()"
+        self._flush_js()
         self.webview.evaluate_javascript(js_code, -1, None, None, None, 
                                         lambda webview, result: self.on_rtl_toggled_result(
                                             webview, result, button))
@@ -2794,16 +3914,70 @@ class Writer(Adw.Application):
                     self.status_label.set_text("Right-to-left mode enabled")
                 else:
                     self.status_label.set_text("Left-to-right mode enabled")
-        except Exception as e:
-            print(f"Error toggling RTL: {e}")
+        except Exception:
+            log.exception("Error toggling RTL")
     
     def on_toggle_rtl(self, action, param):
         """Handle keyboard shortcut for RTL toggle"""
         self.rtl_button.set_active(not self.rtl_button.get_active())
     
     # Date and time insertion
-    def on_insert_datetime_clicked(self, action, param):
+    def _current_datetime_formats(self):
+        """Return the three preview format lists for the current moment"""
+        # One component unpack replaces a strftime call per format entry
+        now = datetime.datetime.now()
+        y, mo, d = now.year, now.month, now.day
+        h, mi, s = now.hour, now.minute, now.second
+        month_abbr = _MONTH_ABBR[mo]
+        month_full = _MONTH_FULL[mo]
+        wday = now.weekday()
+        h12 = h % 12 or 12
+        ampm = "AM" if h < 12 else "PM"
+
+        date_formats = [
+            {"name": "Short", "format": f"{mo:02}/{d:02}/{y}", "type": "date_short"},
+            {"name": "Medium", "format": f"{month_abbr} {d:02}, {y}", "type": "date_medium"},
+            {"name": "Long", "format": f"{month_full} {d:02}, {y}", "type": "date_long"},
+            {"name": "Full", "format": f"{_WDAY_FULL[wday]}, {month_full} {d:02}, {y}", "type": "date_full"},
+            {"name": "ISO", "format": f"{y}-{mo:02}-{d:02}", "type": "date_iso"},
+            {"name": "European", "format": f"{d:02}/{mo:02}/{y}", "type": "date_euro"},
+        ]
+
+        time_formats = [
+            {"name": "12-hour", "format": f"{h12:02}:{mi:02} {ampm}", "type": "time_12"},
+            {"name": "24-hour", "format": f"{h:02}:{mi:02}", "type": "time_24"},
+            {"name": "12h with seconds", "format": f"{h12:02}:{mi:02}:{s:02} {ampm}", "type": "time_12_sec"},
+            {"name": "24h with seconds", "format": f"{h:02}:{mi:02}:{s:02}", "type": "time_24_sec"},
+        ]
+
+        datetime_formats = [
+            {"name": "Short", "format": f"{mo:02}/{d:02}/{y} {h12:02}:{mi:02} {ampm}", "type": "datetime_short"},
+            {"name": "Medium", "format": f"{month_abbr} {d:02}, {y} {h:02}:{mi:02}", "type": "datetime_medium"},
+            {"name": "Long", "format": f"{month_full} {d:02}, {y} at {h12:02}:{mi:02} {ampm}", "type": "datetime_long"},
+            {"name": "ISO", "format": f"{y}-{mo:02}-{d:02} {h:02}:{mi:02}:{s:02}", "type": "datetime_iso"},
+            {"name": "RFC", "format": f"{_WDAY_ABBR[wday]}, {d:02} {month_abbr} {y} {h:02}:{mi:02}:{s:02}", "type": "datetime_rfc"},
+        ]
+        return date_formats, time_formats, datetime_formats
+
+    def on_insert_datetime_clicked(self, *args):
         """Show enhanced dialog to select date/time format with three-column layout in a scrolled window"""
+        date_formats, time_formats, datetime_formats = \
+            self._current_datetime_formats()
+
+        # The ~45-widget tree is built once; re-opening only refreshes
+        # the previews with the current time and clears the selection
+        if self._datetime_dialog is not None:
+            formats = date_formats + time_formats + datetime_formats
+            for (button, preview), fmt in zip(self._datetime_format_widgets,
+                                              formats):
+                self._dt_format_values[fmt["type"]] = fmt["format"]
+                button.set_tooltip_text(fmt["format"])
+                button.set_active(False)
+                preview.set_text(fmt["format"])
+            self._dt_selected = None
+            self._datetime_dialog.present(self.win)
+            return
+
         dialog = Adw.Dialog()
         dialog.set_title("Insert Date Time")
         
@@ -2814,9 +3988,6 @@ class Writer(Adw.Application):
         content_box.set_margin_start(24)
         content_box.set_margin_end(24)
         
-        # Get current date and time for preview
-        now = datetime.datetime.now()
-        
         # Create a scrolled window to contain the grid
         scrolled_window = Gtk.ScrolledWindow()
         # Set dimensions to show at least 4 items vertically without scrolling
@@ -2825,7 +3996,7 @@ class Writer(Adw.Application):
         scrolled_window.set_min_content_width(600)
         scrolled_window.set_vexpand(True)
         scrolled_window.set_hexpand(True)
-        
+
         # Create a grid layout for the three columns
         format_grid = Gtk.Grid()
         format_grid.set_row_spacing(6)
@@ -2835,147 +4006,25 @@ class Writer(Adw.Application):
         format_grid.set_margin_bottom(6)
         format_grid.set_margin_start(6)
         format_grid.set_margin_end(6)
-        
-        # Create headers for each column
-        date_header = Gtk.Label()
-        date_header.set_markup("<b>Date</b>")
-        date_header.set_halign(Gtk.Align.CENTER)
-        date_header.add_css_class("title-4")
-        date_header.set_margin_bottom(6)
-        
-        time_header = Gtk.Label()
-        time_header.set_markup("<b>Time</b>")
-        time_header.set_halign(Gtk.Align.CENTER)
-        time_header.add_css_class("title-4")
-        time_header.set_margin_bottom(6)
-        
-        datetime_header = Gtk.Label()
-        datetime_header.set_markup("<b>Date &amp; Time</b>")
-        datetime_header.set_halign(Gtk.Align.CENTER)
-        datetime_header.add_css_class("title-4")
-        datetime_header.set_margin_bottom(6)
-        
-        # Add headers to the grid
-        format_grid.attach(date_header, 0, 0, 1, 1)
-        format_grid.attach(time_header, 1, 0, 1, 1)
-        format_grid.attach(datetime_header, 2, 0, 1, 1)
-        
-        # Define format options
-        date_formats = [
-            {"name": "Short", "format": now.strftime("%m/%d/%Y"), "type": "date_short"},
-            {"name": "Medium", "format": now.strftime("%b %d, %Y"), "type": "date_medium"},
-            {"name": "Long", "format": now.strftime("%B %d, %Y"), "type": "date_long"},
-            {"name": "Full", "format": now.strftime("%A, %B %d, %Y"), "type": "date_full"},
-            {"name": "ISO", "format": now.strftime("%Y-%m-%d"), "type": "date_iso"},
-            {"name": "European", "format": now.strftime("%d/%m/%Y"), "type": "date_euro"},
-        ]
-        
-        time_formats = [
-            {"name": "12-hour", "format": now.strftime("%I:%M %p"), "type": "time_12"},
-            {"name": "24-hour", "format": now.strftime("%H:%M"), "type": "time_24"},
-            {"name": "12h with seconds", "format": now.strftime("%I:%M:%S %p"), "type": "time_12_sec"},
-            {"name": "24h with seconds", "format": now.strftime("%H:%M:%S"), "type": "time_24_sec"},
-        ]
-        
-        datetime_formats = [
-            {"name": "Short", "format": now.strftime("%m/%d/%Y %I:%M %p"), "type": "datetime_short"},
-            {"name": "Medium", "format": now.strftime("%b %d, %Y %H:%M"), "type": "datetime_medium"},
-            {"name": "Long", "format": now.strftime("%B %d, %Y at %I:%M %p"), "type": "datetime_long"},
-            {"name": "ISO", "format": now.strftime("%Y-%m-%d %H:%M:%S"), "type": "datetime_iso"},
-            {"name": "RFC", "format": now.strftime("%a, %d %b %Y %H:%M:%S"), "type": "datetime_rfc"},
-        ]
-        
-        # Store all format buttons to access the selected one later
-        self.format_buttons = []
-        
-        # Create Date format buttons (column 0)
-        for i, fmt in enumerate(date_formats):
-            button = Gtk.ToggleButton(label=fmt["name"])
-            button.format_type = fmt["type"]
-            button.format_value = fmt["format"]
-            
-            # Add tooltip showing the format preview
-            button.set_tooltip_text(fmt["format"])
-            
-            # Add to button group for radio button behavior
-            if self.format_buttons:
-                button.set_group(self.format_buttons[0])
-            
-            self.format_buttons.append(button)
-            
-            # Create a box to arrange the button and preview
-            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-            box.set_margin_top(2)
-            box.set_margin_bottom(2)
-            
-            # Make button wider to better display text
-            button.set_hexpand(True)
-            button.set_size_request(-1, 36)  # Width: default, Height: 36px
-            box.append(button)
-            
-            # Add small preview label
-            preview = Gtk.Label(label=fmt["format"])
-            preview.add_css_class("caption")
-            preview.add_css_class("dim-label")
-            preview.set_margin_top(2)
-            box.append(preview)
-            
-            # Add to grid
-            format_grid.attach(box, 0, i+1, 1, 1)
-        
-        # Create Time format buttons (column 1)
-        for i, fmt in enumerate(time_formats):
-            button = Gtk.ToggleButton(label=fmt["name"])
-            button.format_type = fmt["type"]
-            button.format_value = fmt["format"]
-            
-            # Add tooltip
-            button.set_tooltip_text(fmt["format"])
-            
-            # Add to button group
-            button.set_group(self.format_buttons[0])
-            self.format_buttons.append(button)
-            
-            # Create a box to arrange the button and preview
-            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-            box.append(button)
-            
-            # Add small preview label
-            preview = Gtk.Label(label=fmt["format"])
-            preview.add_css_class("caption")
-            preview.add_css_class("dim-label")
-            box.append(preview)
-            
-            # Add to grid
-            format_grid.attach(box, 1, i+1, 1, 1)
-        
-        # No need for placeholders since we now have exactly 4 items in each category
-        
-        # Create Date & Time format buttons (column 2)
-        for i, fmt in enumerate(datetime_formats):
-            button = Gtk.ToggleButton(label=fmt["name"])
-            button.format_type = fmt["type"]
-            button.format_value = fmt["format"]
-            
-            # Add tooltip
-            button.set_tooltip_text(fmt["format"])
-            
-            # Add to button group
-            button.set_group(self.format_buttons[0])
-            self.format_buttons.append(button)
-            
-            # Create a box to arrange the button and preview
-            box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-            box.append(button)
-            
-            # Add small preview label
-            preview = Gtk.Label(label=fmt["format"])
-            preview.add_css_class("caption")
-            preview.add_css_class("dim-label")
-            box.append(preview)
-            
-            # Add to grid
-            format_grid.attach(box, 2, i+1, 1, 1)
+
+        # Column headers on row 0; the format cells start below them
+        for col, title in enumerate(("Date", "Time", "Date &amp; Time")):
+            header = Gtk.Label()
+            header.set_markup("<b>%s</b>" % title)
+            header.set_halign(Gtk.Align.CENTER)
+            header.add_css_class("title-4")
+            header.set_margin_bottom(6)
+            format_grid.attach(header, col, 0, 1, 1)
+
+        self._datetime_format_widgets = []
+
+        # One data-driven pass builds all three columns; a single cell
+        # builder keeps the constructor call sites monomorphic instead
+        # of three copy-pasted loops
+        for col, col_formats in enumerate(
+                (date_formats, time_formats, datetime_formats)):
+            for row, fmt in enumerate(col_formats):
+                self._add_format_cell(format_grid, col, row, fmt)
         
         # Add grid to scrolled window
         scrolled_window.set_child(format_grid)
@@ -3010,441 +4059,299 @@ class Writer(Adw.Application):
         dialog_content.append(clamp)
         
         # Connect the content to the dialog
-        dialog.connect("closed", lambda d: None)  # Ensure proper cleanup
         dialog.set_child(dialog_content)
         
-        # Present the dialog
+        # Present the dialog, keeping it for future opens
+        self._datetime_dialog = dialog
         dialog.present(self.win)
 
+    def _add_format_cell(self, grid, col, row, fmt):
+        """Build one format toggle plus preview pair and attach it"""
+        button = Gtk.ToggleButton(label=fmt["name"])
+        self._dt_format_values[fmt["type"]] = fmt["format"]
+        button.connect("toggled", self._on_dt_format_toggled, fmt["type"])
+
+        # Tooltip shows the format preview
+        button.set_tooltip_text(fmt["format"])
+
+        # One radio group across all three columns; the first toggle
+        # anchors it, no list of members is kept
+        if self._dt_group_anchor is None:
+            self._dt_group_anchor = button
+        else:
+            button.set_group(self._dt_group_anchor)
+
+        button.set_hexpand(True)
+        button.set_size_request(-1, 36)  # Width: default, Height: 36px
+        button.set_margin_top(2)
+
+        # Inscription skips content-driven size negotiation, so the
+        # previews cost no pango measure during dialog resizes
+        preview = Gtk.Inscription.new(fmt["format"])
+        preview.set_min_chars(20)
+        preview.set_nat_chars(26)
+        preview.set_text_overflow(Gtk.InscriptionOverflow.ELLIPSIZE_END)
+        preview.set_xalign(0.5)
+        preview.add_css_class("caption")
+        preview.add_css_class("dim-label")
+        preview.set_margin_top(2)
+        preview.set_margin_bottom(2)
+
+        self._datetime_format_widgets.append((button, preview))
+
+        # Attach directly on two grid rows; a wrapping box per entry
+        # would add 15 more widgets to measure on every resize
+        grid.attach(button, col, 2*row+1, 1, 1)
+        grid.attach(preview, col, 2*row+2, 1, 1)
+
+    def _on_dt_format_toggled(self, button, key):
+        """Track the active format key as the radio group changes"""
+        if button.get_active():
+            self._dt_selected = key
+
     def insert_selected_datetime_format(self, dialog):
         """Insert date/time with the selected format"""
-        # Check if any format button is selected
-        selected_button = None
-        for button in self.format_buttons:
-            if button.get_active():
-                selected_button = button
-                break
-        
-        if selected_button:
-            # Get the pre-formatted value directly from the button
-            formatted_date = selected_button.format_value
-            
-            # Insert the formatted date at the current cursor position
-            js_code = f"""
-            (function() {{
-                document.execCommand('insertText', false, `{formatted_date}`);
-                return true;
-            }})();
-            """
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-            dialog.force_close()
-        else:
-            # No selection - show a message
-            self.show_error_dialog("Please select a date/time format")
-        
-    # Paragraph spacing
-    def on_paragraph_spacing_clicked(self, action, param):
-        """Show dialog to adjust paragraph spacing for individual or all paragraphs"""
-        dialog = Adw.Dialog()
-        dialog.set_title("Paragraph Spacing")
-        
-        # Create main content box
-        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=20)
-        content_box.set_margin_top(24)
-        content_box.set_margin_bottom(24)
-        content_box.set_margin_start(24)
-        content_box.set_margin_end(24)
-        
-        # Create spacing selection
-        header = Gtk.Label()
-        header.set_markup("<b>Paragraph Spacing Options:</b>")
-        header.set_halign(Gtk.Align.START)
-        content_box.append(header)
-        
-        # Radio buttons for scope selection
-        scope_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
-        scope_box.set_margin_top(12)
-        scope_box.set_margin_bottom(12)
-        
-        scope_label = Gtk.Label(label="Apply to:")
-        scope_label.set_halign(Gtk.Align.START)
-        scope_box.append(scope_label)
-        
-        # Create radio buttons
-        current_radio = Gtk.CheckButton(label="Current paragraph only")
-        current_radio.set_active(True)
-        scope_box.append(current_radio)
-        
-        all_radio = Gtk.CheckButton(label="All paragraphs")
-        all_radio.set_group(current_radio)
-        scope_box.append(all_radio)
-        
-        content_box.append(scope_box)
-        
-        # Spacing slider
-        spacing_label = Gtk.Label(label="Spacing value:")
-        spacing_label.set_halign(Gtk.Align.START)
-        content_box.append(spacing_label)
-        
-        adjustment = Gtk.Adjustment.new(10, 0, 50, 1, 5, 0)
-        spacing_scale = Gtk.Scale(orientation=Gtk.Orientation.HORIZONTAL, adjustment=adjustment)
-        spacing_scale.set_hexpand(True)
-        spacing_scale.set_digits(0)
-        spacing_scale.set_draw_value(True)
-        spacing_scale.add_mark(0, Gtk.PositionType.BOTTOM, "None")
-        spacing_scale.add_mark(10, Gtk.PositionType.BOTTOM, "Default")
-        spacing_scale.add_mark(30, Gtk.PositionType.BOTTOM, "Wide")
-        content_box.append(spacing_scale)
-        
-        # Preset buttons
-        presets_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
-        presets_box.set_homogeneous(True)
-        presets_box.set_margin_top(12)
-        
-        none_button = Gtk.Button(label="None")
-        none_button.connect("clicked", lambda btn: spacing_scale.set_value(0))
-        presets_box.append(none_button)
-        
-        small_button = Gtk.Button(label="Small")
-        small_button.connect("clicked", lambda btn: spacing_scale.set_value(5))
-        presets_box.append(small_button)
-        
-        medium_button = Gtk.Button(label="Medium") 
-        medium_button.connect("clicked", lambda btn: spacing_scale.set_value(15))
-        presets_box.append(medium_button)
-        
-        large_button = Gtk.Button(label="Large")
-        large_button.connect("clicked", lambda btn: spacing_scale.set_value(30))
-        presets_box.append(large_button)
-        
-        content_box.append(presets_box)
-        
-        # Button box
-        button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
-        button_box.set_halign(Gtk.Align.END)
-        button_box.set_margin_top(24)
-        
-        # Cancel button
-        cancel_button = Gtk.Button(label="Cancel")
-        cancel_button.connect("clicked", lambda btn: dialog.force_close())
-        button_box.append(cancel_button)
-        
-        # Apply button
-        apply_button = Gtk.Button(label="Apply")
-        apply_button.add_css_class("suggested-action")
-        apply_button.connect("clicked", lambda btn: self.apply_paragraph_spacing(
-            dialog, spacing_scale.get_value(), current_radio.get_active()))
-        button_box.append(apply_button)
-        
-        content_box.append(button_box)
-        
-        # Create a clamp to hold the content
-        clamp = Adw.Clamp()
-        clamp.set_child(content_box)
-        
-        # Set up the dialog content
-        dialog_content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        dialog_content.append(clamp)
-        
-        # Connect the content to the dialog
-        dialog.connect("closed", lambda d: None)  # Ensure proper cleanup
-        dialog.set_child(dialog_content)
+        # The toggled handler tracked the selection; no button scan here
+        formatted_date = self._dt_format_values.get(self._dt_selected)
+
+        if formatted_date is not None:
+            # Insert the formatted date at the current cursor position;
+            # json.dumps yields a plain JS string literal, so the text
+            # can never escape into the script the way a raw backtick
+            # or ${ would inside a template literal
+            js_code = ("document.execCommand('insertText', false, "
+                       + json.dumps(formatted_date) + ");")
+            self._queue_js(js_code)
+            dialog.force_close()
+        else:
+            # No selection - show a message
+            self.show_error_dialog("Please select a date/time format")
         
-        # Present the dialog
+    # Paragraph spacing
+    def on_paragraph_spacing_clicked(self, action, param):
+        """Show dialog to adjust paragraph spacing for individual or all paragraphs"""
+        # The body is declared in _PARA_SPACING_UI; one builder parse in
+        # C replaces the widget-by-widget construction it used to do here
+        builder = Gtk.Builder.new_from_string(_PARA_SPACING_UI, -1)
+        dialog = Adw.Dialog()
+        dialog.set_title("Paragraph Spacing")
+        dialog.set_child(builder.get_object("dialog_content"))
+
+        spacing_scale = builder.get_object("spacing_scale")
+        current_radio = builder.get_object("current_radio")
+        for name, value in (("preset_none", 0), ("preset_small", 5),
+                            ("preset_medium", 15), ("preset_large", 30)):
+            builder.get_object(name).connect(
+                "clicked", lambda btn, v=value: spacing_scale.set_value(v))
+        builder.get_object("cancel_button").connect(
+            "clicked", lambda btn: dialog.force_close())
+        builder.get_object("apply_button").connect(
+            "clicked", lambda btn: self.apply_paragraph_spacing(
+                dialog, spacing_scale.get_value(), current_radio.get_active()))
+
         dialog.present(self.win)
 
     def apply_paragraph_spacing(self, dialog, spacing, current_only):
         """Apply paragraph spacing to the current paragraph or all paragraphs"""
         if current_only:
             # Apply spacing to the current paragraph only
-            js_code = f"setParagraphSpacing({int(spacing)});"
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+            js_code = f"W.p({int(spacing)});"
+            self._queue_js(js_code)
         else:
-            # Apply spacing to all paragraphs
+            # One shared rule covers every paragraph; rewriting N inline
+            # styles would invalidate style per element instead of once
             js_code = f"""
             (function() {{
-                // First ensure all direct text content is wrapped
-                wrapUnwrappedText(document.getElementById('editor'));
-                
-                // Target both p tags and div tags as paragraphs
-                let paragraphs = document.getElementById('editor').querySelectorAll('p, div');
-                
-                // Apply to all paragraphs
-                for (let i = 0; i < paragraphs.length; i++) {{
-                    paragraphs[i].style.marginBottom = {int(spacing)} + 'px';
+                // The single remaining DOM pass: wrap stray text nodes so
+                // the sheet rule below covers them too
+                wrapUnwrappedText(getEditor());
+
+                let style = document.getElementById('writer-para-spacing');
+                if (!style) {{
+                    style = document.createElement('style');
+                    style.id = 'writer-para-spacing';
+                    document.head.appendChild(style);
                 }}
-                
+                style.textContent =
+                    '#editor p, #editor div {{ margin-bottom: {int(spacing)}px; }}';
+
                 return true;
             }})();
             """
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+            self._queue_js(js_code)
         
         dialog.force_close()
 
     def on_context_menu(self, web_view, context_menu, event, hit_test_result):
         """Handle context menu creation for the editor"""
-        # Add paragraph spacing submenu
-        spacing_menu = context_menu.append_new_submenu(WebKit.ContextMenuItem.new_with_label("Paragraph Spacing"))
-        
-        # Add spacing options
-        none_item = WebKit.ContextMenuItem.new_with_label("None")
-        none_item.connect("activate", lambda item: self.apply_quick_paragraph_spacing(0))
-        spacing_menu.append(none_item)
-        
-        small_item = WebKit.ContextMenuItem.new_with_label("Small (5px)")
-        small_item.connect("activate", lambda item: self.apply_quick_paragraph_spacing(5))
-        spacing_menu.append(small_item)
-        
-        medium_item = WebKit.ContextMenuItem.new_with_label("Medium (15px)")
-        medium_item.connect("activate", lambda item: self.apply_quick_paragraph_spacing(15))
-        spacing_menu.append(medium_item)
-        
-        large_item = WebKit.ContextMenuItem.new_with_label("Large (30px)")
-        large_item.connect("activate", lambda item: self.apply_quick_paragraph_spacing(30))
-        spacing_menu.append(large_item)
-        
-        # Add separator
-        spacing_menu.append(WebKit.ContextMenuItem.new_separator())
-        
-        # Add custom spacing option
-        custom_item = WebKit.ContextMenuItem.new_with_label("Custom...")
-        custom_item.connect("activate", lambda item: self.on_paragraph_spacing_clicked(None, None))
-        spacing_menu.append(custom_item)
-        
-        # Add line spacing submenu
-        line_spacing_menu = context_menu.append_new_submenu(WebKit.ContextMenuItem.new_with_label("Line Spacing"))
-        
-        # Add line spacing options
-        single_item = WebKit.ContextMenuItem.new_with_label("Single (1.0)")
-        single_item.connect("activate", lambda item: self.apply_quick_line_spacing(1.0))
-        line_spacing_menu.append(single_item)
-        
-        one_half_item = WebKit.ContextMenuItem.new_with_label("1.5 lines")
-        one_half_item.connect("activate", lambda item: self.apply_quick_line_spacing(1.5))
-        line_spacing_menu.append(one_half_item)
-        
-        double_item = WebKit.ContextMenuItem.new_with_label("Double (2.0)")
-        double_item.connect("activate", lambda item: self.apply_quick_line_spacing(2.0))
-        line_spacing_menu.append(double_item)
-        
-        # Add separator
-        line_spacing_menu.append(WebKit.ContextMenuItem.new_separator())
-        
-        # Add custom spacing option
-        custom_item = WebKit.ContextMenuItem.new_with_label("Custom...")
-        custom_item.connect("activate", lambda item: self.on_line_spacing_clicked(None, None))
-        line_spacing_menu.append(custom_item)
-        
+        # WebKit consumes the item wrappers per menu, but the actions and
+        # Python handlers behind them were connected once at startup
+        spacing_menu = context_menu.append_new_submenu(
+            WebKit.ContextMenuItem.new_with_label("Paragraph Spacing"))
+        self._append_ctx_items(spacing_menu, self._para_ctx_spec)
+
+        line_spacing_menu = context_menu.append_new_submenu(
+            WebKit.ContextMenuItem.new_with_label("Line Spacing"))
+        self._append_ctx_items(line_spacing_menu, self._line_ctx_spec)
+
         # Allow the context menu to show
         return False
 
     def apply_quick_paragraph_spacing(self, spacing):
         """Apply spacing to the current paragraph through context menu"""
-        js_code = f"setParagraphSpacing({spacing});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        js_code = f"W.p({spacing});"
+        self._queue_js(js_code)
     
     # Line spacing
     def on_line_spacing_clicked(self, action, param):
         """Show dialog to adjust line spacing for individual or all paragraphs"""
+        # Declared in _LINE_SPACING_UI; see on_paragraph_spacing_clicked
+        builder = Gtk.Builder.new_from_string(_LINE_SPACING_UI, -1)
         dialog = Adw.Dialog()
         dialog.set_title("Line Spacing")
-        
-        # Create main content box
-        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=20)
-        content_box.set_margin_top(24)
-        content_box.set_margin_bottom(24)
-        content_box.set_margin_start(24)
-        content_box.set_margin_end(24)
-        
-        # Create spacing selection
-        header = Gtk.Label()
-        header.set_markup("<b>Line Spacing Options:</b>")
-        header.set_halign(Gtk.Align.START)
-        content_box.append(header)
-        
-        # Radio buttons for scope selection
-        scope_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
-        scope_box.set_margin_top(12)
-        scope_box.set_margin_bottom(12)
-        
-        scope_label = Gtk.Label(label="Apply to:")
-        scope_label.set_halign(Gtk.Align.START)
-        scope_box.append(scope_label)
-        
-        # Create radio buttons
-        current_radio = Gtk.CheckButton(label="Current paragraph only")
-        current_radio.set_active(True)
-        scope_box.append(current_radio)
-        
-        all_radio = Gtk.CheckButton(label="All paragraphs")
-        all_radio.set_group(current_radio)
-        scope_box.append(all_radio)
-        
-        content_box.append(scope_box)
-        
-        # Preset buttons
-        presets_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
-        presets_label = Gtk.Label(label="Common spacing:")
-        presets_label.set_halign(Gtk.Align.START)
-        presets_box.append(presets_label)
-        
-        buttons_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
-        buttons_box.set_homogeneous(True)
-        
-        single_button = Gtk.Button(label="Single (1.0)")
-        single_button.connect("clicked", lambda btn: self.apply_line_spacing(
-            dialog, 1.0, current_radio.get_active()))
-        buttons_box.append(single_button)
-        
-        one_half_button = Gtk.Button(label="1.5 lines")
-        one_half_button.connect("clicked", lambda btn: self.apply_line_spacing(
-            dialog, 1.5, current_radio.get_active()))
-        buttons_box.append(one_half_button)
-        
-        double_button = Gtk.Button(label="Double (2.0)")
-        double_button.connect("clicked", lambda btn: self.apply_line_spacing(
-            dialog, 2.0, current_radio.get_active()))
-        buttons_box.append(double_button)
-        
-        presets_box.append(buttons_box)
-        content_box.append(presets_box)
-        
-        # Custom spacing section
-        custom_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
-        custom_box.set_margin_top(8)
-        
-        custom_label = Gtk.Label(label="Custom spacing:")
-        custom_label.set_halign(Gtk.Align.START)
-        custom_box.append(custom_label)
-        
-        # Add slider for custom spacing
-        adjustment = Gtk.Adjustment.new(1.0, 0.8, 3.0, 0.1, 0.2, 0)
-        spacing_scale = Gtk.Scale(orientation=Gtk.Orientation.HORIZONTAL, adjustment=adjustment)
-        spacing_scale.set_hexpand(True)
-        spacing_scale.set_digits(1)
-        spacing_scale.set_draw_value(True)
-        spacing_scale.add_mark(1.0, Gtk.PositionType.BOTTOM, "1.0")
-        spacing_scale.add_mark(1.5, Gtk.PositionType.BOTTOM, "1.5")
-        spacing_scale.add_mark(2.0, Gtk.PositionType.BOTTOM, "2.0")
-        custom_box.append(spacing_scale)
-        
-        # Apply custom button
-        custom_apply_button = Gtk.Button(label="Apply Custom Value")
-        custom_apply_button.connect("clicked", lambda btn: self.apply_line_spacing(
-            dialog, spacing_scale.get_value(), current_radio.get_active()))
-        custom_apply_button.set_margin_top(8)
-        custom_box.append(custom_apply_button)
-        
-        content_box.append(custom_box)
-        
-        # Button box
-        button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
-        button_box.set_halign(Gtk.Align.END)
-        button_box.set_margin_top(24)
-        
-        # Cancel button
-        cancel_button = Gtk.Button(label="Cancel")
-        cancel_button.connect("clicked", lambda btn: dialog.force_close())
-        button_box.append(cancel_button)
-        
-        content_box.append(button_box)
-        
-        # Create a clamp to hold the content
-        clamp = Adw.Clamp()
-        clamp.set_child(content_box)
-        
-        # Set up the dialog content
-        dialog_content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        dialog_content.append(clamp)
-        
-        # Connect the content to the dialog
-        dialog.connect("closed", lambda d: None)  # Ensure proper cleanup
-        dialog.set_child(dialog_content)
-        
-        # Present the dialog
+        dialog.set_child(builder.get_object("dialog_content"))
+
+        spacing_scale = builder.get_object("spacing_scale")
+        current_radio = builder.get_object("current_radio")
+        for name, value in (("preset_single", 1.0), ("preset_one_half", 1.5),
+                            ("preset_double", 2.0)):
+            builder.get_object(name).connect(
+                "clicked", lambda btn, v=value: self.apply_line_spacing(
+                    dialog, v, current_radio.get_active()))
+        builder.get_object("custom_apply_button").connect(
+            "clicked", lambda btn: self.apply_line_spacing(
+                dialog, spacing_scale.get_value(), current_radio.get_active()))
+        builder.get_object("cancel_button").connect(
+            "clicked", lambda btn: dialog.force_close())
+
         dialog.present(self.win)
 
     def apply_line_spacing(self, dialog, spacing, current_only):
         """Apply line spacing to the current paragraph or all paragraphs"""
         if current_only:
             # Apply spacing to the current paragraph only
-            js_code = f"setLineSpacing({spacing});"
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+            js_code = f"W.l({spacing});"
+            self._queue_js(js_code)
         else:
-            # Apply spacing to all paragraphs
+            # One shared rule covers every paragraph; rewriting N inline
+            # styles would invalidate style per element instead of once
             js_code = f"""
             (function() {{
-                // First ensure all direct text content is wrapped
-                wrapUnwrappedText(document.getElementById('editor'));
-                
-                // Target both p tags and div tags as paragraphs
-                let paragraphs = document.getElementById('editor').querySelectorAll('p, div');
-                
-                // Apply to all paragraphs
-                for (let i = 0; i < paragraphs.length; i++) {{
-                    paragraphs[i].style.lineHeight = {spacing};
+                // The single remaining DOM pass: wrap stray text nodes so
+                // the sheet rule below covers them too
+                wrapUnwrappedText(getEditor());
+
+                let style = document.getElementById('writer-line-spacing');
+                if (!style) {{
+                    style = document.createElement('style');
+                    style.id = 'writer-line-spacing';
+                    document.head.appendChild(style);
                 }}
-                
+                style.textContent =
+                    '#editor p, #editor div {{ line-height: {spacing}; }}';
+
                 return true;
             }})();
             """
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+            self._queue_js(js_code)
         
         dialog.force_close()
 
     def apply_quick_line_spacing(self, spacing):
         """Apply line spacing to the current paragraph through context menu"""
-        js_code = f"setLineSpacing({spacing});"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        js_code = f"W.l({spacing});"
+        self._queue_js(js_code)
 
        
     # Recent files management
+    def _recent_files_path(self):
+        """Return the path of the newline-delimited recent-files store"""
+        return os.path.join(GLib.get_user_config_dir(), "writer", "recent-files")
+
     def load_recent_files(self):
-        """Load recent files from settings"""
-        # In a real app, you would load from GSettings or a config file
-        # For this example, we'll just use an empty list initially
+        """Load recent files from the newline-delimited store"""
+        import mmap
+        # A flat newline-delimited file needs no JSON parse on the startup
+        # path; mmap hands the page cache straight to the line scan
+        self.recent_files = []
+        try:
+            with open(self._recent_files_path(), 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+                    self.recent_files = [
+                        line.decode('utf-8')
+                        for line in mm.read().splitlines() if line
+                    ][:self.max_recent_files]
+        except (OSError, ValueError):
+            # No store yet, or an empty/unreadable one
+            pass
         self.update_recent_files_menu()
+
+    def save_recent_files(self):
+        """Write the recent files store; only called when the list changes"""
+        path = self._recent_files_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                for filepath in self.recent_files:
+                    f.write(filepath + '\n')
+        except OSError:
+            log.exception("Error saving recent files")
     
+    def _recent_menu_item(self, filepath):
+        """Build a menu item targeting the shared open-recent action"""
+        item = Gio.MenuItem.new(_basename(filepath), None)
+        item.set_action_and_target_value(
+            "app.open-recent", GLib.Variant.new_string(filepath))
+        return item
+
+    def _append_recent_menu_tail(self):
+        """Add the separator and clear entry below the file items"""
+        self.recent_menu.append("───────────", None)
+        self.recent_menu.append("Clear Recent Files", "app.clear_recent")
+
     def update_recent_files_menu(self):
-        """Update the recent files menu"""
+        """Rebuild the recent files menu; startup and pruning only
+
+        Ordinary opens go through the incremental path in
+        add_to_recent_files instead of clearing and refilling the menu.
+        """
         # Clear existing items
         while self.recent_menu.get_n_items() > 0:
             self.recent_menu.remove(0)
         
         # Add recent files to menu
-        for i, filepath in enumerate(self.recent_files):
-            filename = os.path.basename(filepath)
-            action_name = f"recent_{i}"
-            
-            # Create action for this file
-            action = Gio.SimpleAction.new(action_name, None)
-            action.connect("activate", lambda a, p, path=filepath: self.open_recent_file(path))
-            self.add_action(action)
-            
-            # Add menu item
-            self.recent_menu.append(filename, f"app.{action_name}")
-        
+        for filepath in self.recent_files:
+            self.recent_menu.append_item(self._recent_menu_item(filepath))
+
         # Add a "Clear Recent Files" option if there are files
         if self.recent_files:
-            self.recent_menu.append("───────────", None)
-            self.create_action("clear_recent", self.on_clear_recent_clicked)
-            self.recent_menu.append("Clear Recent Files", "app.clear_recent")
+            self._append_recent_menu_tail()
     
     def add_to_recent_files(self, filepath):
         """Add a file to the recent files list"""
-        # Remove if already exists
+        if self.recent_files and self.recent_files[0] == filepath:
+            # Already the newest entry; nothing moves, nothing to persist
+            return
+
         if filepath in self.recent_files:
-            self.recent_files.remove(filepath)
-        
-        # Add to beginning of list
-        self.recent_files.insert(0, filepath)
-        
-        # Limit to max number of recent files
-        if len(self.recent_files) > self.max_recent_files:
-            self.recent_files = self.recent_files[:self.max_recent_files]
-        
-        # Update menu
-        self.update_recent_files_menu()
+            # Move the entry to the front: one menu remove plus one
+            # prepend instead of clearing and refilling every item
+            index = self.recent_files.index(filepath)
+            self.recent_files.pop(index)
+            self.recent_menu.remove(index)
+            self.recent_files.insert(0, filepath)
+            self.recent_menu.prepend_item(self._recent_menu_item(filepath))
+        else:
+            was_empty = not self.recent_files
+            self.recent_files.insert(0, filepath)
+            self.recent_menu.prepend_item(self._recent_menu_item(filepath))
+            if was_empty:
+                self._append_recent_menu_tail()
+            if len(self.recent_files) > self.max_recent_files:
+                self.recent_files.pop()
+                self.recent_menu.remove(len(self.recent_files))
+
+        self.save_recent_files()
     
     def open_recent_file(self, filepath):
         """Open a file from the recent files list"""
@@ -3458,11 +4365,13 @@ class Writer(Adw.Application):
             self.show_error_dialog(f"File no longer exists: {filepath}")
             self.recent_files.remove(filepath)
             self.update_recent_files_menu()
+            self.save_recent_files()
     
     def on_clear_recent_clicked(self, action, param):
         """Clear the recent files list"""
         self.recent_files = []
         self.update_recent_files_menu()
+        self.save_recent_files()
         
     # Advanced Features
     def initialize_extras(self):
@@ -3477,6 +4386,45 @@ class Writer(Adw.Application):
         self.create_action("insert_table", self.on_insert_table_clicked)
         self.create_action("insert_image", self.on_insert_image_clicked)
 
+        # Context-menu entries: the actions and their handlers are bound
+        # once here; on_context_menu only wraps them in menu items
+        self._para_ctx_spec = self._make_ctx_spec("ctx-para", [
+            ("None", lambda: self.apply_quick_paragraph_spacing(0)),
+            ("Small (5px)", lambda: self.apply_quick_paragraph_spacing(5)),
+            ("Medium (15px)", lambda: self.apply_quick_paragraph_spacing(15)),
+            ("Large (30px)", lambda: self.apply_quick_paragraph_spacing(30)),
+            (None, None),
+            ("Custom...", lambda: self.on_paragraph_spacing_clicked(None, None)),
+        ])
+        self._line_ctx_spec = self._make_ctx_spec("ctx-line", [
+            ("Single (1.0)", lambda: self.apply_quick_line_spacing(1.0)),
+            ("1.5 lines", lambda: self.apply_quick_line_spacing(1.5)),
+            ("Double (2.0)", lambda: self.apply_quick_line_spacing(2.0)),
+            (None, None),
+            ("Custom...", lambda: self.on_line_spacing_clicked(None, None)),
+        ])
+
+    def _make_ctx_spec(self, prefix, entries):
+        """Bind context-menu labels to long-lived unregistered actions"""
+        spec = []
+        for i, (label, callback) in enumerate(entries):
+            if label is None:
+                spec.append((None, None))
+                continue
+            action = Gio.SimpleAction.new(f"{prefix}-{i}", None)
+            action.connect("activate", lambda a, p, cb=callback: cb())
+            spec.append((label, action))
+        return spec
+
+    def _append_ctx_items(self, submenu, spec):
+        """Fill a WebKit submenu from a prebuilt (label, action) spec"""
+        for label, ctx_action in spec:
+            if label is None:
+                submenu.append(WebKit.ContextMenuItem.new_separator())
+            else:
+                submenu.append(
+                    WebKit.ContextMenuItem.new_from_gaction(ctx_action, label, None))
+
     def add_find_replace_functionality(self):
         """Add find and replace functionality to the editor using Gtk.SearchEntry"""
         # Create a modern search bar
@@ -3595,17 +4543,47 @@ class Writer(Adw.Application):
         self.find_bar.set_visible(False)
         # Clear any highlighting
         js_code = "clearSearch();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
         
     def on_find_text_changed(self, entry):
-        """Handle find text changes"""
+        """Handle find text changes, debounced to one search per pause"""
         search_text = entry.get_text()
-        if search_text:
-            js_code = f"""
-            searchAndHighlight("{search_text.replace('"', '\\"')}");
-            """
-            self.webview.evaluate_javascript(js_code, -1, None, None, None, 
-                                            lambda webview, result: self.on_search_result(webview, result))
+        if not search_text:
+            # Clearing the entry must beat a pending dispatch: cancel the
+            # timer so stale text cannot re-highlight an empty query, drop
+            # any parked text, and remove the highlights from the page
+            if self._find_timeout_id is not None:
+                GLib.source_remove(self._find_timeout_id)
+                self._find_timeout_id = None
+            self._search_pending_text = None
+            self._queue_js("clearSearch();")
+            return
+        # Restart the timer on every keystroke so a typing burst costs
+        # a single highlight pass over the document
+        if self._find_timeout_id is not None:
+            GLib.source_remove(self._find_timeout_id)
+        self._find_timeout_id = GLib.timeout_add(
+            150, self._dispatch_search, search_text)
+
+    def _dispatch_search(self, search_text):
+        """Send the search, or park it while one is still in flight"""
+        self._find_timeout_id = None
+        if self._search_in_flight:
+            # on_search_result re-dispatches the newest parked text once
+            # the current pass reports back
+            self._search_pending_text = search_text
+            return GLib.SOURCE_REMOVE
+        self._search_in_flight = True
+        # Very short queries match almost everywhere on big documents;
+        # cap them so the page never builds an unbounded span set
+        limit = 500 if len(search_text) < 3 else 0
+        # json.dumps covers backslashes and quotes alike; the old
+        # quote-only escape broke on a backslash in the search text
+        js_code = (f"searchAndHighlight({json.dumps(search_text)}, {limit});")
+        self._flush_js()
+        self.webview.evaluate_javascript(js_code, -1, None, None, None, 
+                                        lambda webview, result: self.on_search_result(webview, result))
+        return GLib.SOURCE_REMOVE
 
     def on_search_result(self, webview, result):
         """Handle search result"""
@@ -3613,31 +4591,43 @@ class Writer(Adw.Application):
             js_result = webview.evaluate_javascript_finish(result)
             if js_result and not js_result.is_null():
                 count = js_result.to_int32()
-                if count > 0:
+                if count < 0:
+                    # Capped short query; the count is a lower bound
+                    self.status_label.set_text(
+                        f"Showing first {-count} matches — keep typing")
+                elif count > 0:
                     self.status_label.set_text(f"Found {count} matches")
                 else:
                     self.status_label.set_text("No matches found")
         except Exception as e:
-            print(f"Error in search: {e}")
-            self.status_label.set_text("Search error")
+            # Lazy %-args: nothing is formatted unless a handler wants
+            # WARNING. These can fire in bursts while the webview tears
+            # down mid-keystroke, when the label may already be gone
+            log.warning("Error in search: %s", e)
+            if self.status_label.get_realized():
+                self.status_label.set_text("Search error")
+        finally:
+            self._search_in_flight = False
+            pending = self._search_pending_text
+            if pending is not None:
+                self._search_pending_text = None
+                self._dispatch_search(pending)
 
     def on_find_next_clicked(self, button):
         """Move to next search result"""
         js_code = "findNext();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
 
     def on_find_previous_clicked(self, button):
         """Move to previous search result"""
         js_code = "findPrevious();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
 
     def on_replace_clicked(self, button):
         """Replace current selection with replace text"""
         replace_text = self.replace_entry.get_text()
-        js_code = f"""
-        replaceSelection("{replace_text.replace('"', '\\"')}");
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        js_code = "replaceSelection(" + json.dumps(replace_text) + ");"
+        self._queue_js(js_code)
 
     def on_replace_all_clicked(self, button):
         """Replace all instances of search text with replace text"""
@@ -3647,9 +4637,9 @@ class Writer(Adw.Application):
         if not search_text:
             return
         
-        js_code = f"""
-        replaceAll("{search_text.replace('"', '\\"')}", "{replace_text.replace('"', '\\"')}");
-        """
+        js_code = ("replaceAll(" + json.dumps(search_text) + ", "
+                   + json.dumps(replace_text) + ");")
+        self._flush_js()
         self.webview.evaluate_javascript(js_code, -1, None, None, None, 
                                         lambda webview, result: self.on_replace_all_result(webview, result))
 
@@ -3661,90 +4651,107 @@ class Writer(Adw.Application):
                count = js_result.to_int32()
                self.status_label.set_text(f"Replaced {count} occurrences")
        except Exception as e:
-           print(f"Error in replace all: {e}")
-           self.status_label.set_text("Replace error")
-
-    def on_insert_table_clicked(self, action, param):
-       """Show dialog to insert table using modern Adw.Dialog API"""
-       # Create a dialog using the newer API
-       dialog = Adw.Dialog()
-       dialog.set_title("Insert Table")
-       
-       # Create main content box
-       content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=20)
-       content_box.set_margin_top(24)
-       content_box.set_margin_bottom(24)
-       content_box.set_margin_start(24)
-       content_box.set_margin_end(24)
-       
-       # Add a header label
-       header = Gtk.Label()
-       header.set_markup("<b>Choose table dimensions</b>")
-       header.set_halign(Gtk.Align.START)
-       content_box.append(header)
-       
-       # Create settings grid
-       settings_grid = Gtk.Grid()
-       settings_grid.set_column_spacing(12)
-       settings_grid.set_row_spacing(12)
-       
-       # Add row settings
-       row_label = Gtk.Label(label="Rows:")
-       row_label.set_halign(Gtk.Align.START)
-       settings_grid.attach(row_label, 0, 0, 1, 1)
-       
-       row_adjustment = Gtk.Adjustment.new(3, 1, 20, 1, 5, 0)
-       row_spinner = Gtk.SpinButton()
-       row_spinner.set_adjustment(row_adjustment)
-       settings_grid.attach(row_spinner, 1, 0, 1, 1)
-       
-       # Add column settings
-       col_label = Gtk.Label(label="Columns:")
-       col_label.set_halign(Gtk.Align.START)
-       settings_grid.attach(col_label, 0, 1, 1, 1)
-       
-       col_adjustment = Gtk.Adjustment.new(3, 1, 10, 1, 5, 0)
-       col_spinner = Gtk.SpinButton()
-       col_spinner.set_adjustment(col_adjustment)
-       settings_grid.attach(col_spinner, 1, 1, 1, 1)
-       
-       content_box.append(settings_grid)
-       
-       # Button box
-       button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
-       button_box.set_halign(Gtk.Align.END)
-       button_box.set_margin_top(12)
-       
-       # Cancel button
-       cancel_button = Gtk.Button(label="Cancel")
-       cancel_button.connect("clicked", lambda btn: dialog.force_close())
-       button_box.append(cancel_button)
-       
-       # Insert button
-       insert_button = Gtk.Button(label="Insert")
-       insert_button.add_css_class("suggested-action")
-       insert_button.connect("clicked", lambda btn: self.on_insert_table_dialog_response(
-           dialog, row_spinner.get_value_as_int(), col_spinner.get_value_as_int()))
-       button_box.append(insert_button)
-       
-       content_box.append(button_box)
-       
-       # Create a clamp to hold the content
-       clamp = Adw.Clamp()
-       clamp.set_child(content_box)
-       
-       # Set up the dialog content using a box
-       dialog_content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-       dialog_content.append(clamp)
-       
-       # Connect the content to the dialog
-       dialog.connect("closed", lambda d: None)  # Ensure proper cleanup
-       dialog.set_child(dialog_content)
-       
-       # Present the dialog
-       dialog.present(self.win)
+           log.warning("Error in replace all: %s", e)
+           if self.status_label.get_realized():
+               self.status_label.set_text("Replace error")
 
-    def on_insert_image_clicked(self, action, param):
+    def on_insert_table_clicked(self, *args):
+        """Show dialog to insert table using modern Adw.Dialog API"""
+        # Built once and kept, like the datetime and error dialogs;
+        # re-opening only resets the spinners to their defaults
+        if self._insert_table_dialog is not None:
+            self._insert_table_row_spinner.set_value(3)
+            self._insert_table_col_spinner.set_value(3)
+            self._insert_table_dialog.present(self.win)
+            return
+
+        dialog = Adw.Dialog()
+        dialog.set_title("Insert Table")
+        
+        # Create main content box
+        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=20)
+        content_box.set_margin_top(24)
+        content_box.set_margin_bottom(24)
+        content_box.set_margin_start(24)
+        content_box.set_margin_end(24)
+        
+        # Add a header label
+        header = Gtk.Label()
+        header.set_markup("<b>Choose table dimensions</b>")
+        header.set_halign(Gtk.Align.START)
+        content_box.append(header)
+        
+        # Create settings grid
+        settings_grid = Gtk.Grid()
+        settings_grid.set_column_spacing(12)
+        settings_grid.set_row_spacing(12)
+        
+        # Add row settings
+        row_label = Gtk.Label(label="Rows:")
+        row_label.set_halign(Gtk.Align.START)
+        settings_grid.attach(row_label, 0, 0, 1, 1)
+        
+        row_adjustment = Gtk.Adjustment.new(3, 1, 20, 1, 5, 0)
+        row_spinner = Gtk.SpinButton()
+        row_spinner.set_adjustment(row_adjustment)
+        settings_grid.attach(row_spinner, 1, 0, 1, 1)
+        
+        # Add column settings
+        col_label = Gtk.Label(label="Columns:")
+        col_label.set_halign(Gtk.Align.START)
+        settings_grid.attach(col_label, 0, 1, 1, 1)
+        
+        col_adjustment = Gtk.Adjustment.new(3, 1, 10, 1, 5, 0)
+        col_spinner = Gtk.SpinButton()
+        col_spinner.set_adjustment(col_adjustment)
+        settings_grid.attach(col_spinner, 1, 1, 1, 1)
+        
+        content_box.append(settings_grid)
+        
+        # Button box
+        button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        button_box.set_halign(Gtk.Align.END)
+        button_box.set_margin_top(12)
+        
+        # Cancel button
+        cancel_button = Gtk.Button(label="Cancel")
+        cancel_button.connect("clicked", lambda btn: dialog.force_close())
+        button_box.append(cancel_button)
+        
+        # Insert button; a bound method instead of a closure over the
+        # local widgets, since dialog and spinners now live on self
+        insert_button = Gtk.Button(label="Insert")
+        insert_button.add_css_class("suggested-action")
+        insert_button.connect("clicked", self._on_insert_table_confirm)
+        button_box.append(insert_button)
+        
+        content_box.append(button_box)
+        
+        # Create a clamp to hold the content
+        clamp = Adw.Clamp()
+        clamp.set_child(content_box)
+        
+        # Set up the dialog content using a box
+        dialog_content = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        dialog_content.append(clamp)
+        
+        # Connect the content to the dialog
+        dialog.set_child(dialog_content)
+        
+        # Present the dialog, keeping it for future opens
+        self._insert_table_dialog = dialog
+        self._insert_table_row_spinner = row_spinner
+        self._insert_table_col_spinner = col_spinner
+        dialog.present(self.win)
+
+    def _on_insert_table_confirm(self, button):
+        """Insert a table with the dimensions from the cached spinners"""
+        self.on_insert_table_dialog_response(
+            self._insert_table_dialog,
+            self._insert_table_row_spinner.get_value_as_int(),
+            self._insert_table_col_spinner.get_value_as_int())
+
+    def on_insert_image_clicked(self, *args):
         """Show dialog to insert image"""
         dialog = Gtk.FileDialog()
         dialog.set_title("Select Image")
@@ -3768,26 +4775,13 @@ class Writer(Adw.Application):
         try:
             file = dialog.open_finish(result)
             if file:
-                filepath = file.get_path()
-                
-                # For simplicity, we'll use a data URL to embed the image
-                with open(filepath, 'rb') as f:
-                    data = f.read()
-                
-                mime_type, _ = mimetypes.guess_type(filepath)
-                if not mime_type:
-                    mime_type = 'image/png'  # Default to png
-                
-                data_url = f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
-                
-                # Insert image at current cursor position
-                js_code = f"""
-                (function() {{
-                    document.execCommand('insertImage', false, '{data_url}');
-                    return true;
-                }})();
-                """
-                self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+                # Reading and base64-encoding a large image can take tens
+                # of ms, so it runs off the main loop like document saves
+                threading.Thread(
+                    target=self._encode_image,
+                    args=(file.get_path(),),
+                    daemon=True,
+                ).start()
         except GLib.Error as e:
             if e.domain != 'gtk-dialog-error-quark' or e.code != 2:
                 self.show_error_dialog(f"Error inserting image: {e}")
@@ -3795,6 +4789,40 @@ class Writer(Adw.Application):
             # Handle other non-dialog errors
             self.show_error_dialog(f"Error inserting image: {e}")
 
+    def _encode_image(self, filepath):
+        """Worker-thread half of image insertion: read and encode"""
+        import base64
+        try:
+            # For simplicity, we use a data URL to embed the image
+            with open(filepath, 'rb') as f:
+                data = f.read()
+
+            ext = os.path.splitext(filepath)[1].lower()
+            mime_type = _IMG_MIME.get(ext, 'image/png')
+
+            data_url = f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+            del data
+        except OSError as e:
+            GLib.idle_add(self.show_error_dialog,
+                          f"Error inserting image: {e}")
+            return
+
+        # Hop back to the main loop to talk to the WebView
+        GLib.idle_add(self._insert_image_data_url, data_url)
+
+    def _insert_image_data_url(self, data_url):
+        """Main-loop half of image insertion: hand the URL to the page"""
+        # Insert image at current cursor position. The data URL
+        # travels as a function argument, so a multi-MB image is
+        # marshalled as a plain string value instead of being
+        # quoted into — and parsed out of — JS source text
+        self._flush_js()
+        self.webview.call_async_javascript_function(
+            "document.execCommand('insertImage', false, url);", -1,
+            GLib.Variant('a{sv}', {'url': GLib.Variant('s', data_url)}),
+            None, None, None, None)
+        return GLib.SOURCE_REMOVE
+
     #  Table toolbar
     def on_table_clicked(self, manager, message):
         """Handle table click event from editor"""
@@ -3809,93 +4837,60 @@ class Writer(Adw.Application):
         self.table_toolbar.set_margin_top(5)
         self.table_toolbar.set_margin_bottom(5)
         
-        # Table operations label
-        table_label = Gtk.Label(label="Table:")
-        table_label.set_margin_end(10)
-        self.table_toolbar.append(table_label)
-        
-        # Add Row Above button
-        add_row_above_button = Gtk.Button(icon_name="table-add-row-above-symbolic")
-        add_row_above_button.set_tooltip_text("Add row above")
-        add_row_above_button.connect("clicked", self.on_add_row_above_clicked)
-        self.table_toolbar.append(add_row_above_button)
-        
-        # Add Row Below button
-        add_row_below_button = Gtk.Button(icon_name="table-add-row-below-symbolic")
-        add_row_below_button.set_tooltip_text("Add row below")
-        add_row_below_button.connect("clicked", self.on_add_row_below_clicked)
-        self.table_toolbar.append(add_row_below_button)
-        
-        # Add Column Before button
-        add_col_before_button = Gtk.Button(icon_name="table-add-column-before-symbolic")
-        add_col_before_button.set_tooltip_text("Add column before")
-        add_col_before_button.connect("clicked", self.on_add_column_before_clicked)
-        self.table_toolbar.append(add_col_before_button)
-        
-        # Add Column After button
-        add_col_after_button = Gtk.Button(icon_name="table-add-column-after-symbolic")
-        add_col_after_button.set_tooltip_text("Add column after")
-        add_col_after_button.connect("clicked", self.on_add_column_after_clicked)
-        self.table_toolbar.append(add_col_after_button)
-        
-        # Small separator
-        separator1 = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        separator1.set_margin_start(5)
-        separator1.set_margin_end(5)
-        self.table_toolbar.append(separator1)
-        
-        # Delete Row button
-        del_row_button = Gtk.Button(icon_name="table-delete-row-symbolic")
-        del_row_button.set_tooltip_text("Delete row")
-        del_row_button.connect("clicked", self.on_delete_row_clicked)
-        self.table_toolbar.append(del_row_button)
-        
-        # Delete Column button
-        del_col_button = Gtk.Button(icon_name="table-delete-column-symbolic")
-        del_col_button.set_tooltip_text("Delete column")
-        del_col_button.connect("clicked", self.on_delete_column_clicked)
-        self.table_toolbar.append(del_col_button)
-        
-        # Delete Table button
-        del_table_button = Gtk.Button(icon_name="table-delete-symbolic")
-        del_table_button.set_tooltip_text("Delete table")
-        del_table_button.connect("clicked", self.on_delete_table_clicked)
-        self.table_toolbar.append(del_table_button)
-        
-        # Separator
-        separator2 = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
-        separator2.set_margin_start(10)
-        separator2.set_margin_end(10)
-        self.table_toolbar.append(separator2)
-        
-        # Alignment options
-        align_label = Gtk.Label(label="Align:")
-        align_label.set_margin_end(5)
-        self.table_toolbar.append(align_label)
-        
-        # Left alignment
-        align_left_button = Gtk.Button(icon_name="table-align-left-symbolic")
-        align_left_button.set_tooltip_text("Align Left (text wraps around right)")
-        align_left_button.connect("clicked", self.on_table_align_left)
-        self.table_toolbar.append(align_left_button)
-        
-        # Center alignment
-        align_center_button = Gtk.Button(icon_name="table-align-horizontal-centre-symbolic")
-        align_center_button.set_tooltip_text("Center (no text wrap)")
-        align_center_button.connect("clicked", self.on_table_align_center)
-        self.table_toolbar.append(align_center_button)
-        
-        # Right alignment
-        align_right_button = Gtk.Button(icon_name="table-align-right-symbolic")
-        align_right_button.set_tooltip_text("Align Right (text wraps around left)")
-        align_right_button.connect("clicked", self.on_table_align_right)
-        self.table_toolbar.append(align_right_button)
-        
-        # Full width (no wrap)
-        full_width_button = Gtk.Button(icon_name="table-align-full-width-symbolic")
-        full_width_button.set_tooltip_text("Full Width (no text wrap)")
-        full_width_button.connect("clicked", self.on_table_full_width)
-        self.table_toolbar.append(full_width_button)
+        # (label, label margin, separator margin, buttons): each button
+        # is an icon/tooltip/handler triple, so a new operation costs
+        # one tuple here instead of four lines of construction
+        # boilerplate
+        groups = (
+            ("Table:", 10, 0, (
+                ("table-add-row-above-symbolic", "Add row above",
+                 self.on_add_row_above_clicked),
+                ("table-add-row-below-symbolic", "Add row below",
+                 self.on_add_row_below_clicked),
+                ("table-add-column-before-symbolic", "Add column before",
+                 self.on_add_column_before_clicked),
+                ("table-add-column-after-symbolic", "Add column after",
+                 self.on_add_column_after_clicked),
+            )),
+            (None, 0, 5, (
+                ("table-delete-row-symbolic", "Delete row",
+                 self.on_delete_row_clicked),
+                ("table-delete-column-symbolic", "Delete column",
+                 self.on_delete_column_clicked),
+                ("table-delete-symbolic", "Delete table",
+                 self.on_delete_table_clicked),
+            )),
+            ("Align:", 5, 10, (
+                ("table-align-left-symbolic",
+                 "Align Left (text wraps around right)",
+                 self.on_table_align_left),
+                ("table-align-horizontal-centre-symbolic",
+                 "Center (no text wrap)",
+                 self.on_table_align_center),
+                ("table-align-right-symbolic",
+                 "Align Right (text wraps around left)",
+                 self.on_table_align_right),
+                ("table-align-full-width-symbolic",
+                 "Full Width (no text wrap)",
+                 self.on_table_full_width),
+            )),
+        )
+
+        for label_text, label_margin, sep_margin, buttons in groups:
+            if sep_margin:
+                separator = Gtk.Separator(orientation=Gtk.Orientation.VERTICAL)
+                separator.set_margin_start(sep_margin)
+                separator.set_margin_end(sep_margin)
+                self.table_toolbar.append(separator)
+            if label_text:
+                label = Gtk.Label(label=label_text)
+                label.set_margin_end(label_margin)
+                self.table_toolbar.append(label)
+            for icon, tooltip, callback in buttons:
+                button = Gtk.Button(icon_name=icon)
+                button.set_tooltip_text(tooltip)
+                button.connect("clicked", callback)
+                self.table_toolbar.append(button)
         
         # Spacer
         spacer = Gtk.Box()
@@ -3916,267 +4911,53 @@ class Writer(Adw.Application):
     # Now add the new table operation methods
     def on_add_row_above_clicked(self, button):
         """Add a row above the current row in the active table"""
-        js_code = """
-        (function() {
-            if (!activeTable) return;
-            
-            // Get the current row index
-            let selection = window.getSelection();
-            if (selection.rangeCount < 1) return;
-            
-            let range = selection.getRangeAt(0);
-            let cell = range.startContainer;
-            
-            // Find the TD/TH parent
-            while (cell && cell.tagName !== 'TD' && cell.tagName !== 'TH' && cell !== activeTable) {
-                cell = cell.parentNode;
-            }
-            
-            if (!cell || (cell.tagName !== 'TD' && cell.tagName !== 'TH')) {
-                // If no cell is selected, just add to the end
-                addTableRow(activeTable);
-                return;
-            }
-            
-            // Find the TR parent
-            let row = cell;
-            while (row && row.tagName !== 'TR') {
-                row = row.parentNode;
-            }
-            
-            if (!row) return;
-            
-            // Find the row index
-            let rowIndex = row.rowIndex;
-            
-            // Insert a new row above this one
-            let newRow = activeTable.insertRow(rowIndex);
-            
-            // Add cells matching the selected row
-            for (let i = 0; i < row.cells.length; i++) {
-                let newCell = newRow.insertCell(i);
-                newCell.innerHTML = ' ';
-            }
-            
-            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-        })();
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js("insertRowAt(0);")
 
     def on_add_row_below_clicked(self, button):
         """Add a row below the current row in the active table"""
-        js_code = """
-        (function() {
-            if (!activeTable) return;
-            
-            // Get the current row index
-            let selection = window.getSelection();
-            if (selection.rangeCount < 1) return;
-            
-            let range = selection.getRangeAt(0);
-            let cell = range.startContainer;
-            
-            // Find the TD/TH parent
-            while (cell && cell.tagName !== 'TD' && cell.tagName !== 'TH' && cell !== activeTable) {
-                cell = cell.parentNode;
-            }
-            
-            if (!cell || (cell.tagName !== 'TD' && cell.tagName !== 'TH')) {
-                // If no cell is selected, just add to the end
-                addTableRow(activeTable);
-                return;
-            }
-            
-            // Find the TR parent
-            let row = cell;
-            while (row && row.tagName !== 'TR') {
-                row = row.parentNode;
-            }
-            
-            if (!row) return;
-            
-            // Find the row index
-            let rowIndex = row.rowIndex;
-            
-            // Insert a new row below this one
-            let newRow = activeTable.insertRow(rowIndex + 1);
-            
-            // Add cells matching the selected row
-            for (let i = 0; i < row.cells.length; i++) {
-                let newCell = newRow.insertCell(i);
-                newCell.innerHTML = ' ';
-            }
-            
-            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-        })();
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js("insertRowAt(1);")
 
     def on_add_column_before_clicked(self, button):
         """Add a column before the current column in the active table"""
-        js_code = """
-        (function() {
-            if (!activeTable) return;
-            
-            // Get the current cell index
-            let selection = window.getSelection();
-            if (selection.rangeCount < 1) return;
-            
-            let range = selection.getRangeAt(0);
-            let cell = range.startContainer;
-            
-            // Find the TD/TH parent
-            while (cell && cell.tagName !== 'TD' && cell.tagName !== 'TH' && cell !== activeTable) {
-                cell = cell.parentNode;
-            }
-            
-            if (!cell || (cell.tagName !== 'TD' && cell.tagName !== 'TH')) {
-                // If no cell is selected, just add to the end
-                addTableColumn(activeTable);
-                return;
-            }
-            
-            // Find the cell index
-            let cellIndex = cell.cellIndex;
-            
-            // Add a column before the current one
-            const rows = activeTable.rows;
-            for (let i = 0; i < rows.length; i++) {
-                const newCell = rows[i].insertCell(cellIndex);
-                newCell.innerHTML = ' ';
-            }
-            
-            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-        })();
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js("insertColumnAt(0);")
 
     def on_add_column_after_clicked(self, button):
         """Add a column after the current column in the active table"""
-        js_code = """
-        (function() {
-            if (!activeTable) return;
-            
-            // Get the current cell index
-            let selection = window.getSelection();
-            if (selection.rangeCount < 1) return;
-            
-            let range = selection.getRangeAt(0);
-            let cell = range.startContainer;
-            
-            // Find the TD/TH parent
-            while (cell && cell.tagName !== 'TD' && cell.tagName !== 'TH' && cell !== activeTable) {
-                cell = cell.parentNode;
-            }
-            
-            if (!cell || (cell.tagName !== 'TD' && cell.tagName !== 'TH')) {
-                // If no cell is selected, just add to the end
-                addTableColumn(activeTable);
-                return;
-            }
-            
-            // Find the cell index
-            let cellIndex = cell.cellIndex;
-            
-            // Add a column after the current one
-            const rows = activeTable.rows;
-            for (let i = 0; i < rows.length; i++) {
-                const newCell = rows[i].insertCell(cellIndex + 1);
-                newCell.innerHTML = ' ';
-            }
-            
-            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-        })();
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js("insertColumnAt(1);")
 
     def on_delete_table_clicked(self, button):
         """Delete the entire table"""
-        js_code = """
-        (function() {
-            if (!activeTable) return;
-            
-            // Remove the table
-            activeTable.parentNode.removeChild(activeTable);
-            
-            // Clear active table reference
-            activeTable = null;
-            
-            // Hide the table toolbar
-            window.webkit.messageHandlers.tableDeleted.postMessage('table-deleted');
-            
-            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-        })();
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js("deleteActiveTable();")
         
         # Hide the table toolbar since table was deleted
         self.table_toolbar.set_visible(False)
 
-    # Add handlers for the table toolbar buttons
-    def on_add_row_clicked(self, button):
-        """Add a row to the active table"""
-        js_code = "addTableRow(activeTable);"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
-
-    def on_add_column_clicked(self, button):
-        """Add a column to the active table"""
-        js_code = "addTableColumn(activeTable);"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
 
     def on_delete_row_clicked(self, button):
         """Delete a row from the active table"""
         js_code = "deleteTableRow(activeTable);"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
 
     def on_delete_column_clicked(self, button):
         """Delete a column from the active table"""
         js_code = "deleteTableColumn(activeTable);"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
 
     def on_table_align_left(self, button):
         """Align table to the left with text wrapping around right"""
-        js_code = """
-        if (activeTable) {
-            activeTable.className = 'left-align';
-            activeTable.style.width = 'auto';
-            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-        }
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(_JS_TABLE_ALIGN_LEFT)
 
     def on_table_align_center(self, button):
         """Align table to the center with no text wrapping"""
-        js_code = """
-        if (activeTable) {
-            activeTable.className = 'center-align';
-            activeTable.style.width = 'auto';
-            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-        }
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(_JS_TABLE_ALIGN_CENTER)
 
     def on_table_align_right(self, button):
         """Align table to the right with text wrapping around left"""
-        js_code = """
-        if (activeTable) {
-            activeTable.className = 'right-align';
-            activeTable.style.width = 'auto';
-            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-        }
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(_JS_TABLE_ALIGN_RIGHT)
 
     def on_table_full_width(self, button):
         """Make table full width with no text wrapping"""
-        js_code = """
-        if (activeTable) {
-            activeTable.className = 'no-wrap';
-            activeTable.style.width = '100%';
-            window.webkit.messageHandlers.contentChanged.postMessage('changed');
-        }
-        """
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(_JS_TABLE_FULL_WIDTH)
 
     def on_close_table_toolbar_clicked(self, button):
         """Hide the table toolbar and deactivate tables"""
@@ -4185,7 +4966,7 @@ class Writer(Adw.Application):
         self.table_toolbar.set_visible(False)
         
         js_code = "deactivateAllTables();"
-        self.webview.evaluate_javascript(js_code, -1, None, None, None, None)
+        self._queue_js(js_code)
 
     # Now let's create a function to show the table toolbar when a table is clicked
     def show_table_toolbar(self):
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Minify the embedded editor HTML in src/writer.py before packaging.
+
+The _EDITOR_HTML constant ships with generous indentation, blank lines
+and // comments that cost bytes over the in-process pipe to WebKit and
+tokens in the JS parser. This tool rewrites the constant in place with
+a conservative line-based minification: it never joins lines (JS
+semicolon insertion stays intact) and never renames identifiers, so the
+result is the same program with the padding removed.
+
+Run from the repository root at build/packaging time, not at runtime:
+
+    python3 tools/build_editor_html.py          # rewrite src/writer.py
+    python3 tools/build_editor_html.py --check  # report savings only
+"""
+
+import re
+import sys
+
+SOURCE = "src/writer.py"
+MARKER = '_EDITOR_HTML = r"""'
+
+
+def minify(html):
+    """Strip comments, blank lines and indentation, keeping one line per line"""
+    # CSS/JS block comments never span code on the same line in this blob
+    html = re.sub(r"/\*.*?\*/", "", html, flags=re.S)
+    html = re.sub(r"<!--.*?-->", "", html, flags=re.S)
+
+    lines = []
+    for line in html.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("//"):
+            continue
+        lines.append(stripped)
+    return "\n".join(lines)
+
+
+def main():
+    with open(SOURCE, encoding="utf-8") as f:
+        source = f.read()
+
+    start = source.index(MARKER) + len(MARKER)
+    end = source.index('"""', start)
+    original = source[start:end]
+    minified = minify(original)
+
+    if '"""' in minified:
+        sys.exit("error: minified blob would break the raw string literal")
+
+    saved = len(original) - len(minified)
+    print("editor HTML: %d -> %d bytes (%.0f%% smaller)"
+          % (len(original), len(minified), 100.0 * saved / len(original)))
+
+    if "--check" in sys.argv[1:]:
+        return
+
+    with open(SOURCE, "w", encoding="utf-8") as f:
+        f.write(source[:start] + "\n" + minified + "\n" + source[end:])
+
+
+if __name__ == "__main__":
+    main()